@@ -8,17 +8,19 @@ from models.data_models import TransfermarktTeam, TransfermarktPlayer, Transferm
 from config.database import DATABASE_URL
 from sqlalchemy import create_engine
 from google_sheets_logger import log_payment
+from utils.json_cache import json_cache
 
 app = Flask(__name__)
 
 app.register_blueprint(paypal_bp)
 
 def load_json_data(filename):
+    """Parsed data file, read-only and shared between requests until the file changes"""
     path = os.path.join(os.path.dirname(__file__), 'data', filename)
-    if not os.path.exists(path):
+    try:
+        return json_cache.load(path)
+    except FileNotFoundError:
         return None
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
 
 @app.route('/api/odds-realtime')
 def api_odds_realtime():
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Backfill Crawler
+Scrapy crawler mode for ComprehensiveDataCollector: fetches the source pages
+concurrently (AutoThrottle, per-domain limits, on-disk HTTP cache), parses them
+with the collector's process_*_match methods and writes comprehensive_matches
+in batches.
+
+    python backfill_crawler.py                                  # every configured league page
+    python backfill_crawler.py --source soccerway --source bdfutbol
+    python backfill_crawler.py --urls-file seasons.json         # extra pages, e.g. past seasons
+
+The URLs file is a JSON list of {"source": ..., "league": ..., "url": ...}.
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+from typing import Dict, List, Optional
+from loguru import logger
+import scrapy
+from scrapy.crawler import CrawlerProcess
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import BACKFILL_CRAWLER_CONFIG
+from comprehensive_data_collector import ComprehensiveDataCollector
+
+class ComprehensiveBackfillSpider(scrapy.Spider):
+    """Crawls league pages of the comprehensive sources and yields one item per match"""
+    name = 'comprehensive_backfill'
+
+    def __init__(self, sources: Optional[List[str]] = None, urls_file: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.collector = ComprehensiveDataCollector()
+        self.targets = [
+            {'source': source, 'league': league['name'], 'url': league['url']}
+            for source, config in self.collector.SOURCES.items()
+            if not sources or source in sources
+            for league in config['leagues']
+        ]
+        if urls_file:
+            with open(urls_file, encoding='utf-8') as f:
+                extra = json.load(f)
+            for target in extra:
+                if target['source'] not in self.collector.SOURCES:
+                    raise ValueError(f"Unknown source in {urls_file}: {target['source']}")
+            self.targets.extend(t for t in extra if not sources or t['source'] in sources)
+        self.pages = 0
+        self.failed_pages = 0
+
+    def start_requests(self):
+        for target in self.targets:
+            yield scrapy.Request(
+                target['url'],
+                callback=self.parse_matches,
+                errback=self.on_error,
+                cb_kwargs={'source': target['source'], 'league': target['league']}
+            )
+
+    def parse_matches(self, response, source: str, league: str):
+        self.pages += 1
+        try:
+            records = self.collector.extract_matches(source, response.body, league)
+        except Exception as e:
+            logger.error(f"Error parsing {response.url}: {e}")
+            return
+        logger.info(f"{source} {league}: {len(records)} matches from {response.url}")
+        yield from records
+
+    def on_error(self, failure):
+        self.failed_pages += 1
+        logger.error(f"Error fetching {failure.request.url}: {failure.value}")
+
+class ComprehensiveMatchPipeline:
+    """Feeds match items to the collector's batched writer (one upsert per batch)"""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.start_time = time.perf_counter()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.settings.getint('BACKFILL_BATCH_SIZE'))
+
+    def open_spider(self, spider):
+        spider.collector.create_comprehensive_matches_table()
+        spider.collector.match_writer.batch_size = self.batch_size
+
+    def process_item(self, item, spider):
+        spider.collector.match_writer.add(item)
+        return item
+
+    def close_spider(self, spider):
+        writer = spider.collector.match_writer
+        writer.flush()
+        elapsed = time.perf_counter() - self.start_time
+        logger.info(f"Backfill finished: {spider.pages} pages ({spider.failed_pages} failed), "
+                    f"{writer.rows_written} matches stored in {writer.flushes} batches ({writer.rows_lost} lost), "
+                    f"{elapsed:.1f}s")
+
+def crawler_settings(config: Dict = BACKFILL_CRAWLER_CONFIG) -> Dict:
+    return {
+        'USER_AGENT': ComprehensiveDataCollector.USER_AGENT,
+        'CONCURRENT_REQUESTS': config['concurrent_requests'],
+        'CONCURRENT_REQUESTS_PER_DOMAIN': config['concurrent_requests_per_domain'],
+        'DOWNLOAD_TIMEOUT': 10,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': config['autothrottle_start_delay'],
+        'AUTOTHROTTLE_MAX_DELAY': config['autothrottle_max_delay'],
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': config['autothrottle_target_concurrency'],
+        'HTTPCACHE_ENABLED': True,
+        'HTTPCACHE_DIR': config['http_cache_dir'],
+        'HTTPCACHE_EXPIRATION_SECS': config['http_cache_expiration'],
+        'HTTPCACHE_IGNORE_HTTP_CODES': [429, 500, 502, 503, 504],
+        'RETRY_HTTP_CODES': [429, 500, 502, 503, 504],
+        'ITEM_PIPELINES': {f'{__name__}.ComprehensiveMatchPipeline': 300},
+        'BACKFILL_BATCH_SIZE': config['batch_size'],
+        'LOG_LEVEL': 'INFO',
+    }
+
+def main():
+    """Run the backfill crawl"""
+    parser = argparse.ArgumentParser(description='Backfill comprehensive_matches with a Scrapy crawl')
+    parser.add_argument('--source', action='append', choices=sorted(ComprehensiveDataCollector.SOURCES),
+                        help='only crawl this source (repeatable)')
+    parser.add_argument('--urls-file', help='JSON list of extra {source, league, url} pages to crawl')
+    args = parser.parse_args()
+
+    process = CrawlerProcess(crawler_settings())
+    process.crawl(ComprehensiveBackfillSpider, sources=args.source, urls_file=args.urls_file)
+    process.start()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Collector Benchmark Script
+Times a full DataCollector.collect_all_data run against recorded cassettes.
+
+    python benchmark_collector.py --record   # hit the live sites once and record responses
+    python benchmark_collector.py            # replay offline: no network, no sleeps
+"""
+
+import sys
+import os
+import time
+import argparse
+from loguru import logger
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scrapers.cassette import cassette
+from data_collector import DataCollector
+
+def main():
+    """Run one collection in record or replay mode and print timings"""
+    parser = argparse.ArgumentParser(description='Benchmark a full data collection run')
+    parser.add_argument('--record', action='store_true', help='record live responses instead of replaying')
+    parser.add_argument('--days-back', type=int, default=7)
+    parser.add_argument('--days-forward', type=int, default=7)
+    parser.add_argument('--runs', type=int, default=1, help='number of timed runs (replay only)')
+    args = parser.parse_args()
+
+    cassette.mode = 'record' if args.record else 'replay'
+    runs = 1 if args.record else args.runs
+    logger.info(f"Benchmarking collection in {cassette.mode} mode ({runs} run(s))")
+
+    timings = []
+    for _ in range(runs):
+        collector = DataCollector()
+        try:
+            start_time = time.perf_counter()
+            data = collector.collect_all_data(days_back=args.days_back, days_forward=args.days_forward)
+            timings.append(time.perf_counter() - start_time)
+        finally:
+            collector.cleanup()
+
+    print("\n" + "="*50)
+    print("COLLECTION BENCHMARK")
+    print("="*50)
+    print(f"Mode: {cassette.mode}")
+    print(f"Runs: {len(timings)}")
+    print(f"Best: {min(timings):.3f}s")
+    print(f"Mean: {sum(timings) / len(timings):.3f}s")
+    print(f"Matches: {len(data['matches'])}, teams: {len(data['teams'])}, "
+          f"H2H: {len(data['h2h_records'])}, odds: {len(data['odds'])}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
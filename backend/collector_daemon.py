@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Collector Daemon
+Keeps the shared dataset fresh by refreshing every source on its own
+DATA_SOURCES['update_frequency'] cadence.
+
+    python collector_daemon.py
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from loguru import logger
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import DATA_SOURCES, DAEMON_CONFIG
+from data_collector import DataCollector
+from utils.http_client import http_client
+
+class CollectorDaemon:
+    """Per-source refresh scheduler around a DataCollector.
+
+    A source whose previous refresh is still running is skipped for that
+    slot instead of being started twice. After every refresh the merged
+    dataset is revalidated and saved on a worker thread, so readers see each
+    source's update as soon as it lands.
+    """
+
+    def __init__(self, collector: Optional[DataCollector] = None, config: Dict = DAEMON_CONFIG):
+        self.collector = collector or DataCollector()
+        self.config = config
+        self.sources = {
+            name: source_config['update_frequency']
+            for name, source_config in DATA_SOURCES.items()
+            if source_config['enabled'] and name in self.collector.scrapers
+        }
+        self.next_due = {name: 0.0 for name in self.sources}
+        self.running: Dict[str, asyncio.Task] = {}
+        self.skipped_runs = {name: 0 for name in self.sources}
+        self._stop: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def _refresh(self, source_name: str):
+        """Refresh one source and publish the updated dataset"""
+        collected = await self.collector.collect_source_async(
+            source_name,
+            days_back=self.config['days_back'],
+            days_forward=self.config['days_forward'],
+            refresh_days_back=self.config['refresh_days_back']
+        )
+        if not collected:
+            return
+        try:
+            # Validation and saving are CPU and disk bound; keep them off the event loop
+            await asyncio.to_thread(self.collector._process_collected_data)
+        except Exception as e:
+            logger.error(f"Error publishing data after refreshing {source_name}: {e}")
+
+    def _schedule_due_sources(self):
+        """Start every source whose slot has come up and that is not still running"""
+        now = time.monotonic()
+        for source_name, frequency in self.sources.items():
+            if now < self.next_due[source_name]:
+                continue
+            self.next_due[source_name] = now + frequency
+            task = self.running.get(source_name)
+            if task and not task.done():
+                self.skipped_runs[source_name] += 1
+                logger.warning(f"{source_name}: previous refresh still running, skipping this slot")
+                continue
+            self.running[source_name] = asyncio.create_task(self._refresh(source_name))
+
+    async def run_async(self):
+        """Run the scheduler until stop() is called"""
+        self._stop = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        logger.info("Collector daemon started: " + ", ".join(
+            f"{name} every {frequency}s" for name, frequency in self.sources.items()
+        ))
+        try:
+            while not self._stop.is_set():
+                self._schedule_due_sources()
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=self.config['tick'])
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            pending = [task for task in self.running.values() if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            await http_client.close_async()
+            logger.info("Collector daemon stopped")
+
+    def run(self):
+        """Blocking entry point"""
+        asyncio.run(self.run_async())
+
+    def start(self):
+        """Run the daemon on a background thread"""
+        self._thread = threading.Thread(target=self.run, name='collector-daemon', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the scheduler to finish; in-flight refreshes are cancelled"""
+        if self._loop and self._stop:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread:
+            self._thread.join()
+
+    def get_status(self) -> Dict:
+        """Scheduling state of every source"""
+        now = time.monotonic()
+        return {
+            source_name: {
+                'update_frequency': frequency,
+                'running': bool(self.running.get(source_name) and not self.running[source_name].done()),
+                'next_run_in': max(0.0, self.next_due[source_name] - now),
+                'skipped_runs': self.skipped_runs[source_name],
+                'last_update': self.collector.last_update.get(source_name)
+            }
+            for source_name, frequency in self.sources.items()
+        }
+
+def main():
+    """Run the daemon in the foreground until interrupted"""
+    daemon = CollectorDaemon()
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        logger.info("Collector daemon interrupted")
+    finally:
+        daemon.collector.cleanup()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
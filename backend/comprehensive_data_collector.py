@@ -19,203 +19,237 @@ import re
 from bs4 import BeautifulSoup
 import random
 
-class ComprehensiveDataCollector:
-    def __init__(self):
-        self.engine = create_engine(DATABASE_URL)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        
-    def collect_from_whoscored(self):
-        """Collect data from WhoScored"""
-        logger.info("Collecting data from WhoScored...")
+class BatchedMatchWriter:
+    """Buffers comprehensive_matches rows and upserts them in bulk.
+
+    Each flush is a single multi-row INSERT ... ON CONFLICT DO UPDATE on the
+    (home_team, away_team, match_date, league) unique index, so a batch costs
+    one round trip instead of a SELECT plus UPDATE/INSERT per match. Repeated
+    matches inside a buffer are collapsed (last one wins) and a missing
+    match_date is stored as '' so it can take part in the unique key. If a
+    batch fails, its rows are written one at a time so only the bad rows are
+    lost (counted in rows_lost).
+    """
+
+    COLUMNS = ('home_team', 'away_team', 'home_score', 'away_score', 'match_date', 'league', 'source')
+    # Postgres allows 65535 bind parameters per statement
+    MAX_ROWS_PER_STATEMENT = 5000
+
+    def __init__(self, engine, batch_size=500):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.buffer = {}
+        self.rows_written = 0
+        self.rows_lost = 0
+        self.flushes = 0
+
+    def add(self, record):
+        row = {column: record.get(column) for column in self.COLUMNS}
+        if row['match_date'] is None:
+            row['match_date'] = ''
+        self.buffer[(row['home_team'], row['away_team'], row['match_date'], row['league'])] = row
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, records):
+        for record in records:
+            self.add(record)
+
+    def _upsert(self, conn, rows):
+        values = []
+        params = {}
+        for i, row in enumerate(rows):
+            values.append("(" + ", ".join(f":{column}_{i}" for column in self.COLUMNS) + ", NOW(), NOW())")
+            params.update({f"{column}_{i}": row[column] for column in self.COLUMNS})
+        conn.execute(text(f"""
+            INSERT INTO comprehensive_matches
+            ({", ".join(self.COLUMNS)}, created_at, updated_at)
+            VALUES {", ".join(values)}
+            ON CONFLICT (home_team, away_team, match_date, league) DO UPDATE
+            SET home_score = EXCLUDED.home_score, away_score = EXCLUDED.away_score,
+                source = EXCLUDED.source, updated_at = NOW()
+        """), params)
+
+    def flush(self):
+        """Write the buffered rows; returns how many were written"""
+        if not self.buffer:
+            return 0
+        rows = list(self.buffer.values())
+        self.buffer = {}
+        start_time = time.perf_counter()
         try:
-            # WhoScored API endpoints for various leagues
-            leagues = [
-                {'name': 'La Liga', 'id': 'spain/primera-division'},
-                {'name': 'Premier League', 'id': 'england/premier-league'},
-                {'name': 'Bundesliga', 'id': 'germany/bundesliga'},
-                {'name': 'Serie A', 'id': 'italy/serie-a'},
-                {'name': 'Ligue 1', 'id': 'france/ligue-1'},
-                {'name': 'Ecuador LigaPro', 'id': 'ecuador/liga-pro'}
-            ]
-            
-            for league in leagues:
-                try:
-                    url = f"https://www.whoscored.com/Regions/252/Tournaments/2/{league['id']}"
-                    response = self.session.get(url, timeout=10)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Extract match data
-                        matches = soup.find_all('div', class_='match-centre')
-                        for match in matches:
-                            self.process_whoscored_match(match, league['name'])
-                            
-                    time.sleep(random.uniform(1, 3))  # Be respectful
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting from WhoScored {league['name']}: {e}")
-                    
+            with self.engine.begin() as conn:
+                for i in range(0, len(rows), self.MAX_ROWS_PER_STATEMENT):
+                    self._upsert(conn, rows[i:i + self.MAX_ROWS_PER_STATEMENT])
+            written = len(rows)
         except Exception as e:
-            logger.error(f"Error collecting from WhoScored: {e}")
-    
-    def collect_from_bdfutbol(self):
-        """Collect data from BDFutbol"""
-        logger.info("Collecting data from BDFutbol...")
-        try:
-            # BDFutbol has good Spanish football data
-            leagues = [
+            logger.error(f"Error storing {len(rows)} matches in one batch, retrying them one by one: {e}")
+            written = self._write_rows_one_by_one(rows)
+        elapsed = time.perf_counter() - start_time
+        self.rows_written += written
+        self.flushes += 1
+        logger.info(f"Stored {written} matches in {elapsed:.2f}s ({written / max(elapsed, 1e-6):.0f} rows/s)")
+        return written
+
+    def _write_rows_one_by_one(self, rows):
+        """Write each row in its own transaction, so one bad row only loses itself"""
+        written = 0
+        for row in rows:
+            try:
+                with self.engine.begin() as conn:
+                    self._upsert(conn, [row])
+                written += 1
+            except Exception as e:
+                logger.error(f"Error storing match {row['home_team']} vs {row['away_team']} "
+                             f"({row['match_date']}): {e}")
+        lost = len(rows) - written
+        if lost:
+            self.rows_lost += lost
+            logger.warning(f"Lost {lost} of {len(rows)} matches in this batch ({self.rows_lost} so far)")
+        return written
+
+class ComprehensiveDataCollector:
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+    # Pages crawled per source: where the match rows are and which process_* method parses them
+    SOURCES = {
+        'whoscored': {
+            'label': 'WhoScored',
+            'rows': ('div', 'match-centre'),
+            'process': 'process_whoscored_match',
+            'delay': (1, 3),
+            'leagues': [
+                {'name': 'La Liga', 'url': 'https://www.whoscored.com/Regions/252/Tournaments/2/spain/primera-division'},
+                {'name': 'Premier League', 'url': 'https://www.whoscored.com/Regions/252/Tournaments/2/england/premier-league'},
+                {'name': 'Bundesliga', 'url': 'https://www.whoscored.com/Regions/252/Tournaments/2/germany/bundesliga'},
+                {'name': 'Serie A', 'url': 'https://www.whoscored.com/Regions/252/Tournaments/2/italy/serie-a'},
+                {'name': 'Ligue 1', 'url': 'https://www.whoscored.com/Regions/252/Tournaments/2/france/ligue-1'},
+                {'name': 'Ecuador LigaPro', 'url': 'https://www.whoscored.com/Regions/252/Tournaments/2/ecuador/liga-pro'}
+            ]
+        },
+        'bdfutbol': {
+            'label': 'BDFutbol',
+            'rows': None,  # every table row except the header
+            'process': 'process_bdfutbol_match',
+            'delay': (1, 2),
+            'leagues': [
                 {'name': 'La Liga', 'url': 'https://www.bdfutbol.com/es/t/t.html'},
                 {'name': 'Segunda', 'url': 'https://www.bdfutbol.com/es/t/t2.html'},
                 {'name': 'Copa del Rey', 'url': 'https://www.bdfutbol.com/es/t/tc.html'}
             ]
-            
-            for league in leagues:
-                try:
-                    response = self.session.get(league['url'], timeout=10)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Extract match data from tables
-                        tables = soup.find_all('table')
-                        for table in tables:
-                            rows = table.find_all('tr')
-                            for row in rows[1:]:  # Skip header
-                                self.process_bdfutbol_match(row, league['name'])
-                                
-                    time.sleep(random.uniform(1, 2))
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting from BDFutbol {league['name']}: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error collecting from BDFutbol: {e}")
-    
-    def collect_from_soccerway(self):
-        """Collect data from Soccerway"""
-        logger.info("Collecting data from Soccerway...")
-        try:
-            # Soccerway has comprehensive international data
-            leagues = [
+        },
+        'soccerway': {
+            'label': 'Soccerway',
+            'rows': ('tr', 'match'),
+            'process': 'process_soccerway_match',
+            'delay': (1, 3),
+            'leagues': [
                 {'name': 'La Liga', 'url': 'https://int.soccerway.com/national/spain/primera-division/20232024/regular-season/r'},
                 {'name': 'Premier League', 'url': 'https://int.soccerway.com/national/england/premier-league/20232024/regular-season/r'},
                 {'name': 'Ecuador LigaPro', 'url': 'https://int.soccerway.com/national/ecuador/liga-pro/2024/regular-season/r'}
             ]
-            
-            for league in leagues:
-                try:
-                    response = self.session.get(league['url'], timeout=10)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Extract match data
-                        matches = soup.find_all('tr', class_='match')
-                        for match in matches:
-                            self.process_soccerway_match(match, league['name'])
-                            
-                    time.sleep(random.uniform(1, 3))
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting from Soccerway {league['name']}: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error collecting from Soccerway: {e}")
-    
-    def collect_from_resultados_futbol(self):
-        """Collect data from Resultados-Futbol"""
-        logger.info("Collecting data from Resultados-Futbol...")
-        try:
-            # Resultados-Futbol has good Spanish and international data
-            leagues = [
+        },
+        'resultados-futbol': {
+            'label': 'Resultados-Futbol',
+            'rows': ('div', 'match'),
+            'process': 'process_resultados_match',
+            'delay': (1, 2),
+            'leagues': [
                 {'name': 'La Liga', 'url': 'https://www.resultados-futbol.com/primera'},
                 {'name': 'Ecuador LigaPro', 'url': 'https://www.resultados-futbol.com/ecuador/liga-pro'}
             ]
-            
-            for league in leagues:
-                try:
-                    response = self.session.get(league['url'], timeout=10)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Extract match data
-                        matches = soup.find_all('div', class_='match')
-                        for match in matches:
-                            self.process_resultados_match(match, league['name'])
-                            
-                    time.sleep(random.uniform(1, 2))
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting from Resultados-Futbol {league['name']}: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error collecting from Resultados-Futbol: {e}")
-    
-    def collect_from_footballdatabase(self):
-        """Collect data from FootballDatabase"""
-        logger.info("Collecting data from FootballDatabase...")
-        try:
-            # FootballDatabase has historical and current data
-            leagues = [
+        },
+        'footballdatabase': {
+            'label': 'FootballDatabase',
+            'rows': ('tr', 'match'),
+            'process': 'process_footballdatabase_match',
+            'delay': (1, 2),
+            'leagues': [
                 {'name': 'La Liga', 'url': 'https://footballdatabase.com/league-spain/primera-division'},
                 {'name': 'Ecuador LigaPro', 'url': 'https://footballdatabase.com/league-ecuador/liga-pro'}
             ]
-            
-            for league in leagues:
-                try:
-                    response = self.session.get(league['url'], timeout=10)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Extract match data
-                        matches = soup.find_all('tr', class_='match')
-                        for match in matches:
-                            self.process_footballdatabase_match(match, league['name'])
-                            
-                    time.sleep(random.uniform(1, 2))
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting from FootballDatabase {league['name']}: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error collecting from FootballDatabase: {e}")
-    
-    def collect_from_fcstats(self):
-        """Collect data from FCStats"""
-        logger.info("Collecting data from FCStats...")
-        try:
-            # FCStats has detailed statistics
-            leagues = [
+        },
+        'fcstats': {
+            'label': 'FCStats',
+            'rows': ('div', 'match'),
+            'process': 'process_fcstats_match',
+            'delay': (1, 2),
+            'leagues': [
                 {'name': 'La Liga', 'url': 'https://fcstats.com/league/Spain/La_Liga'},
                 {'name': 'Ecuador LigaPro', 'url': 'https://fcstats.com/league/Ecuador/LigaPro'}
             ]
-            
-            for league in leagues:
-                try:
-                    response = self.session.get(league['url'], timeout=10)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Extract match data
-                        matches = soup.find_all('div', class_='match')
-                        for match in matches:
-                            self.process_fcstats_match(match, league['name'])
-                            
-                    time.sleep(random.uniform(1, 2))
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting from FCStats {league['name']}: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error collecting from FCStats: {e}")
-    
+        }
+    }
+
+    def __init__(self):
+        self.engine = create_engine(DATABASE_URL)
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': self.USER_AGENT
+        })
+        self.match_writer = BatchedMatchWriter(self.engine)
+        # When set, store_match_data hands each parsed match to this callable instead of the database
+        self.match_sink = None
+        
+    def extract_matches(self, source, content, league):
+        """Parse one page of a source and return its matches instead of storing them"""
+        config = self.SOURCES[source]
+        soup = BeautifulSoup(content, 'html.parser')
+        if config['rows'] is None:
+            elements = [row for table in soup.find_all('table') for row in table.find_all('tr')[1:]]
+        else:
+            tag, css_class = config['rows']
+            elements = soup.find_all(tag, class_=css_class)
+        records = []
+        previous_sink, self.match_sink = self.match_sink, records.append
+        try:
+            process = getattr(self, config['process'])
+            for element in elements:
+                process(element, league)
+        finally:
+            self.match_sink = previous_sink
+        return records
+
+    def collect_from_source(self, source):
+        """Collect every configured league page of a source, one page at a time"""
+        config = self.SOURCES[source]
+        logger.info(f"Collecting data from {config['label']}...")
+        for league in config['leagues']:
+            try:
+                response = self.session.get(league['url'], timeout=10)
+
+                if response.status_code == 200:
+                    self.store_match_batch(self.extract_matches(source, response.content, league['name']))
+
+                time.sleep(random.uniform(*config['delay']))  # Be respectful
+
+            except Exception as e:
+                logger.error(f"Error collecting from {config['label']} {league['name']}: {e}")
+
+    def collect_from_whoscored(self):
+        """Collect data from WhoScored"""
+        self.collect_from_source('whoscored')
+
+    def collect_from_bdfutbol(self):
+        """Collect data from BDFutbol"""
+        self.collect_from_source('bdfutbol')
+
+    def collect_from_soccerway(self):
+        """Collect data from Soccerway"""
+        self.collect_from_source('soccerway')
+
+    def collect_from_resultados_futbol(self):
+        """Collect data from Resultados-Futbol"""
+        self.collect_from_source('resultados-futbol')
+
+    def collect_from_footballdatabase(self):
+        """Collect data from FootballDatabase"""
+        self.collect_from_source('footballdatabase')
+
+    def collect_from_fcstats(self):
+        """Collect data from FCStats"""
+        self.collect_from_source('fcstats')
+
     def process_whoscored_match(self, match_element, league):
         """Process a match from WhoScored"""
         try:
@@ -379,65 +413,30 @@ class ComprehensiveDataCollector:
     
     def store_match_data(self, home_team, away_team, home_score, away_score, 
                         match_date, league, source):
-        """Store match data in the database"""
-        try:
-            with self.engine.connect() as conn:
-                # Check if match already exists
-                result = conn.execute(text("""
-                    SELECT id FROM comprehensive_matches 
-                    WHERE home_team = :home_team AND away_team = :away_team 
-                    AND match_date = :match_date AND league = :league
-                """), {
-                    'home_team': home_team,
-                    'away_team': away_team,
-                    'match_date': match_date,
-                    'league': league
-                })
-                
-                if result.fetchone():
-                    # Update existing match
-                    conn.execute(text("""
-                        UPDATE comprehensive_matches 
-                        SET home_score = :home_score, away_score = :away_score,
-                            source = :source, updated_at = NOW()
-                        WHERE home_team = :home_team AND away_team = :away_team 
-                        AND match_date = :match_date AND league = :league
-                    """), {
-                        'home_score': home_score,
-                        'away_score': away_score,
-                        'source': source,
-                        'home_team': home_team,
-                        'away_team': away_team,
-                        'match_date': match_date,
-                        'league': league
-                    })
-                else:
-                    # Insert new match
-                    conn.execute(text("""
-                        INSERT INTO comprehensive_matches 
-                        (home_team, away_team, home_score, away_score, match_date, 
-                         league, source, created_at, updated_at)
-                        VALUES (:home_team, :away_team, :home_score, :away_score, 
-                                :match_date, :league, :source, NOW(), NOW())
-                    """), {
-                        'home_team': home_team,
-                        'away_team': away_team,
-                        'home_score': home_score,
-                        'away_score': away_score,
-                        'match_date': match_date,
-                        'league': league,
-                        'source': source
-                    })
-                
-                logger.info(f"Stored match: {home_team} vs {away_team} ({league}) from {source}")
-                
-        except Exception as e:
-            logger.error(f"Error storing match data: {e}")
-    
+        """Buffer match data for the database (written by the batched writer)"""
+        record = {
+            'home_team': home_team,
+            'away_team': away_team,
+            'home_score': home_score,
+            'away_score': away_score,
+            'match_date': match_date,
+            'league': league,
+            'source': source
+        }
+        if self.match_sink is not None:
+            self.match_sink(record)
+            return
+        self.match_writer.add(record)
+
+    def store_match_batch(self, records):
+        """Store many matches with one upsert per batch; returns the rows written"""
+        self.match_writer.add_many(records)
+        return self.match_writer.flush()
+
     def create_comprehensive_matches_table(self):
         """Create the comprehensive_matches table if it doesn't exist"""
         try:
-            with self.engine.connect() as conn:
+            with self.engine.begin() as conn:
                 conn.execute(text("""
                     CREATE TABLE IF NOT EXISTS comprehensive_matches (
                         id SERIAL PRIMARY KEY,
@@ -445,7 +444,7 @@ class ComprehensiveDataCollector:
                         away_team VARCHAR(255) NOT NULL,
                         home_score INTEGER,
                         away_score INTEGER,
-                        match_date VARCHAR(100),
+                        match_date VARCHAR(100) NOT NULL DEFAULT '',
                         league VARCHAR(255) NOT NULL,
                         source VARCHAR(100) NOT NULL,
                         created_at TIMESTAMP DEFAULT NOW(),
@@ -453,6 +452,25 @@ class ComprehensiveDataCollector:
                     )
                 """))
                 
+                # Matches without a date share '' so the unique key below can match them
+                conn.execute(text("""
+                    UPDATE comprehensive_matches SET match_date = '' WHERE match_date IS NULL
+                """))
+
+                # Keep only the newest row of matches stored more than once before the unique index
+                conn.execute(text("""
+                    DELETE FROM comprehensive_matches older
+                    USING comprehensive_matches newer
+                    WHERE older.home_team = newer.home_team AND older.away_team = newer.away_team
+                    AND older.match_date = newer.match_date AND older.league = newer.league
+                    AND older.id < newer.id
+                """))
+
+                conn.execute(text("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS uq_comprehensive_matches_match 
+                    ON comprehensive_matches(home_team, away_team, match_date, league)
+                """))
+
                 # Create index for better performance
                 conn.execute(text("""
                     CREATE INDEX IF NOT EXISTS idx_comprehensive_matches_teams 
@@ -483,8 +501,10 @@ class ComprehensiveDataCollector:
         self.collect_from_resultados_futbol()
         self.collect_from_footballdatabase()
         self.collect_from_fcstats()
+        self.match_writer.flush()
         
-        logger.info("Comprehensive data collection completed!")
+        logger.info(f"Comprehensive data collection completed! ({self.match_writer.rows_written} matches stored, "
+                    f"{self.match_writer.rows_lost} lost)")
 
 def main():
     collector = ComprehensiveDataCollector()
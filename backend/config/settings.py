@@ -27,7 +27,6 @@ STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY', 'your_stripe_publis
 # Web scraping configuration
 SCRAPING_CONFIG = {
     'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'request_delay': 2,  # seconds between requests
     'max_retries': 3,
     'timeout': 30,
     'headers': {
@@ -46,12 +45,14 @@ DATA_SOURCES = {
         'enabled': True,
         'priority': 1,  # Highest priority for official source
         'update_frequency': 300,  # 5 minutes
+        'max_concurrency': 2,  # parallel team/H2H/odds requests
     },
     'promiedos': {
         'base_url': 'https://www.promiedos.com.ar',
         'enabled': True,
         'priority': 2,  # Good Spanish football coverage
         'update_frequency': 300,  # 5 minutes
+        'max_concurrency': 4,
     },
     'flashscore': {
         'base_url': 'https://www.flashscore.com',
@@ -59,6 +60,7 @@ DATA_SOURCES = {
         'enabled': True,
         'priority': 3,
         'update_frequency': 300,  # 5 minutes
+        'max_concurrency': 4,
     },
     'sofascore': {
         'base_url': 'https://www.sofascore.com',
@@ -66,6 +68,7 @@ DATA_SOURCES = {
         'enabled': True,
         'priority': 4,
         'update_frequency': 300,  # 5 minutes
+        'max_concurrency': 4,
     },
     'betsapi': {
         'base_url': 'https://betsapi.com',
@@ -73,21 +76,51 @@ DATA_SOURCES = {
         'enabled': True,
         'priority': 5,
         'update_frequency': 600,  # 10 minutes
+        'max_concurrency': 4,
     },
     'whoscored': {
         'base_url': 'https://www.whoscored.com',
         'enabled': True,
         'priority': 6,
         'update_frequency': 900,  # 15 minutes
+        'max_concurrency': 2,
     },
     'transfermarkt': {
         'base_url': 'https://www.transfermarkt.com',
         'enabled': True,
         'priority': 7,
         'update_frequency': 1800,  # 30 minutes
+        'max_concurrency': 3,
     }
 }
 
+# Per-run collection limits (sized to what the rate limits allow)
+COLLECTION_CONFIG = {
+    'default_concurrency': 2,  # for sources without max_concurrency
+    'h2h_match_limit': 40,  # upcoming matches per source that get H2H data
+    'odds_match_limit': 40,  # upcoming matches per source that get odds
+    # Caps of the collector's in-memory store (match_store.py), on top of window eviction
+    'max_matches': 20000,
+    'max_team_stats': 2000,
+    'max_h2h_records': 2000,
+    'max_odds': 5000,
+}
+
+# Field-level merge of records from several sources (field_merge.py)
+FIELD_MERGE_CONFIG = {
+    # Fields that change during a match: taken from the most recently collected record
+    'fresh_fields': ['status', 'home_score', 'away_score', 'minute', 'events', 'statistics'],
+}
+
+# Background collector daemon (collector_daemon.py)
+DAEMON_CONFIG = {
+    'enabled': os.getenv('COLLECTOR_DAEMON', 'false').lower() == 'true',  # start with main.py
+    'days_back': 7,  # window of each source's first run
+    'days_forward': 7,
+    'refresh_days_back': 1,  # later runs only re-check recent results
+    'tick': 5,  # seconds between scheduler checks
+}
+
 # La Liga specific configuration
 LA_LIGA_CONFIG = {
     'league_id': 'ES1',  # FlashScore league ID for La Liga
@@ -174,6 +207,37 @@ RATE_LIMITS = {
     'requests_per_minute': 30,
     'requests_per_hour': 1000,
     'requests_per_day': 10000,
+    'burst': 5,  # max back-to-back requests to a host before the per-minute rate applies
+}
+
+# Scraper retry policy (scrapers/retry_policy.py)
+RETRY_CONFIG = {
+    'max_attempts': 3,
+    'base_delay': 1,  # seconds; back-off is exponential with full jitter
+    'max_delay': 10,
+    'max_retry_after': 60,  # longer Retry-After waits are not retried
+    'retry_statuses': [429, 500, 502, 503, 504],  # other 4xx/5xx fail immediately
+    'budget': 10,  # retries a source may spend at once
+    'budget_refill_per_minute': 5,
+}
+
+# Per-source circuit breaker
+CIRCUIT_BREAKER_CONFIG = {
+    'failure_threshold': 5,  # consecutive failures that open the circuit
+    'window': 20,  # recent requests used for the success rate
+    'min_requests': 10,  # requests in the window before the success rate counts
+    'min_success_rate': 0.5,
+    'cooldown': 300,  # seconds a source is skipped once its circuit opens
+}
+
+# Process-wide pooled HTTP client (utils/http_client.py)
+HTTP_CLIENT_CONFIG = {
+    'timeout': 30,
+    'max_connections': 100,
+    'max_keepalive_connections': 40,
+    'max_connections_per_host': 6,
+    'keepalive_expiry': 60,  # seconds an idle connection stays in the pool
+    'http2': os.getenv('HTTP2_ENABLED', 'true').lower() == 'true',  # needs the h2 package
 }
 
 # Cache configuration
@@ -181,6 +245,75 @@ CACHE_CONFIG = {
     'enabled': True,
     'ttl': 300,  # 5 minutes
     'max_size': 1000,
+    'http_cache_dir': os.path.join(DATA_DIR, 'http_cache'),
+    'http_cache_max_bytes': 256 * 1024 * 1024,  # LRU eviction above 256 MB
+}
+
+# Record/replay of raw scraper responses ('off', 'record' or 'replay')
+CASSETTE_CONFIG = {
+    'mode': os.getenv('SCRAPER_CASSETTE_MODE', 'off'),
+    'dir': os.getenv('SCRAPER_CASSETTE_DIR', os.path.join(DATA_DIR, 'cassettes')),
+}
+
+# Compressed archive of every fetched page, for re-parsing without re-fetching (reparse.py)
+ARCHIVE_CONFIG = {
+    'enabled': os.getenv('SCRAPER_ARCHIVE', 'true').lower() == 'true',
+    'dir': os.getenv('SCRAPER_ARCHIVE_DIR', os.path.join(DATA_DIR, 'page_archive')),
+    'zstd_level': 10,  # used when zstandard is installed, gzip otherwise
+    'max_bytes': int(os.getenv('SCRAPER_ARCHIVE_MAX_BYTES', 1024 * 1024 * 1024)),  # oldest pages dropped above 1 GB
+    'retention_days': int(os.getenv('SCRAPER_ARCHIVE_RETENTION_DAYS', 30)),
+}
+
+# Understat bulk backfills (run_understat_scraper.py)
+UNDERSTAT_CONFIG = {
+    'max_concurrency': 4,  # league/season pages fetched at once
+    'store_dir': os.getenv('UNDERSTAT_STORE_DIR', os.path.join(DATA_DIR, 'understat')),
+}
+
+# Scrapy backfill of comprehensive_matches (backfill_crawler.py)
+BACKFILL_CRAWLER_CONFIG = {
+    'concurrent_requests': 32,
+    'concurrent_requests_per_domain': 4,
+    'autothrottle_start_delay': 1.0,
+    'autothrottle_max_delay': 30.0,
+    'autothrottle_target_concurrency': 2.0,  # average parallel requests per remote site
+    'http_cache_dir': os.path.join(DATA_DIR, 'scrapy_cache'),
+    'http_cache_expiration': 7 * 24 * 3600,  # historical pages rarely change
+    'batch_size': 500,  # matches per database transaction
+}
+
+# Canonical team identities used to group matches across sources (team_identity.py)
+TEAM_IDENTITY_CONFIG = {
+    'aliases_file': os.path.join(DATA_DIR, 'team_aliases.json'),
+    'unknown_file': os.path.join(DATA_DIR, 'unknown_team_names.json'),  # names waiting for curation
+}
+
+# Cross-source fixture linking (fixture_linker.py)
+FIXTURE_LINKING_CONFIG = {
+    'min_score': 0.6,  # minimum team-name similarity (0-1) to link two fixtures
+    'min_team_score': 0.4,  # both the home and the away names must reach this
+    'max_date_difference': 1,  # days; sources disagree on dates around midnight
+    'date_penalty': 0.95,  # score multiplier per day of difference
+    'min_competition_score': 0.5,  # competition-name similarity below which fixtures are never linked
+}
+
+# Published datasets (utils/snapshot_store.py)
+SNAPSHOT_CONFIG = {
+    'raw_dir': RAW_DATA_DIR,
+    'latest_file': os.path.join(PROCESSED_DATA_DIR, 'latest_data.json'),
+    'keyframe_every': 24,  # deltas between two full snapshots
+    'compress_level': 6,  # gzip level of the files in data/raw
+    'compact_after_hours': 24,  # older chains are reduced to their last snapshot
+    'retention_days': 7,  # older chains are deleted
+    'compact_interval_minutes': 60,  # how often a save starts compaction in the background
+}
+
+# Match validation (data_validator.py)
+VALIDATION_CONFIG = {
+    # 'python' checks one match group at a time, 'vectorized' all of them at once with pandas
+    'mode': os.getenv('VALIDATION_MODE', 'python'),
+    # Only re-validate match groups whose source records changed since the last run
+    'incremental': os.getenv('VALIDATION_INCREMENTAL', 'true').lower() == 'true',
 }
 
 # Notification configuration
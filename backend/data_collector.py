@@ -1,18 +1,25 @@
 import asyncio
-import json
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from loguru import logger
-from config.settings import DATA_SOURCES, LA_LIGA_CONFIG, CONFERENCE_LEAGUE_CONFIG, WOMENS_EURO_CONFIG, COMPETITIONS_CONFIG
+from config.settings import DATA_SOURCES, COLLECTION_CONFIG, LA_LIGA_CONFIG, CONFERENCE_LEAGUE_CONFIG, WOMENS_EURO_CONFIG, COMPETITIONS_CONFIG
 from scrapers.flashscore_scraper import FlashScoreScraper
 from scrapers.sofascore_scraper import SofaScoreScraper
 from scrapers.betsapi_scraper import BetsAPIScraper
 from scrapers.laliga_scraper import LaLigaScraper
 from scrapers.promiedos_scraper import PromiedosScraper
 from scrapers.transfermarkt_scraper import TransfermarktScraper
+from scrapers.circuit_breaker import CircuitBreaker, CircuitOpenError
+from scrapers.single_flight import single_flight_run
+from utils.http_client import http_client
+from utils.snapshot_store import snapshot_store
+from utils.json_cache import json_cache, freeze
 from models.data_models import Match, Team, H2HRecord, OddsData, Statistics
 from data_validator import DataValidator
+from match_store import MatchStore
+from field_merge import field_merger
 
 class DataCollector:
     """Main data collection orchestrator"""
@@ -26,37 +33,118 @@ class DataCollector:
             'betsapi': BetsAPIScraper(),
             'transfermarkt': TransfermarktScraper()
         }
-        self.collected_data = {
-            'matches': [],
-            'teams': {},
-            'h2h_records': {},
-            'odds': {},
-            'statistics': {}
-        }
+        # Matches, team stats, H2H records and odds, bounded to the collection window
+        self.match_store = MatchStore()
         self.last_update = {}
         self.validator = DataValidator()
+        # The collector daemon and /api/collect-data share one collector, so changes to
+        # the store and publishing the dataset happen under this lock, off the event loop
+        self._data_lock = threading.RLock()
         
     def collect_all_data(self, days_back: int = 7, days_forward: int = 7) -> Dict:
-        """Collect data from all sources"""
+        """Collect data from all sources (blocking wrapper around collect_all_data_async)"""
+        return asyncio.run(self.collect_all_data_async(days_back, days_forward))
+    
+    async def collect_all_data_async(self, days_back: int = 7, days_forward: int = 7) -> Dict:
+        """Collect data from all enabled sources concurrently"""
         logger.info("Starting data collection from all sources")
         
         date_from = datetime.now() - timedelta(days=days_back)
         date_to = datetime.now() + timedelta(days=days_forward)
         
-        # Collect data from each source
-        for source_name, source_config in DATA_SOURCES.items():
-            if not source_config['enabled']:
-                continue
-                
-            try:
-                logger.info(f"Collecting data from {source_name}")
-                self._collect_from_source(source_name, date_from, date_to)
-                self.last_update[source_name] = datetime.now()
-                
-            except Exception as e:
-                logger.error(f"Error collecting from {source_name}: {e}")
-                continue
+        # Collect data from every enabled source at the same time; healthy, fast
+        # sources are started first so they get the scraper threads first
+        source_names = self._order_sources_by_health(
+            [name for name, config in DATA_SOURCES.items() if config['enabled']]
+        )
+        throttled_before = {name: scraper.throttled_time for name, scraper in self.scrapers.items()}
+        try:
+            with single_flight_run('collection') as flight_group:
+                await asyncio.gather(*(
+                    self._collect_source_task(source_name, date_from, date_to)
+                    for source_name in source_names
+                ))
+            await self._update_store(self.match_store.evict_outside, date_from, date_to)
+        finally:
+            await http_client.close_async()
+        logger.info(flight_group.format_report())
+        http_client.log_stats()
+        
+        for source_name, scraper in self.scrapers.items():
+            throttled = scraper.throttled_time - throttled_before[source_name]
+            if throttled > 0:
+                logger.info(f"{source_name}: {throttled:.1f}s spent waiting on rate limits")
+        
+        return await asyncio.to_thread(self._process_collected_data)
+    
+    async def _update_store(self, fn, *args):
+        """Run a change to the shared store on a worker thread, holding the data lock"""
+        def locked():
+            with self._data_lock:
+                return fn(*args)
+        return await asyncio.to_thread(locked)
+    
+    def _order_sources_by_health(self, source_names: List[str]) -> List[str]:
+        """Order sources by circuit state, recent success rate and average latency"""
+        state_rank = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
         
+        def health_key(source_name: str):
+            scraper = self.scrapers.get(source_name)
+            if not scraper:
+                return (3, 0.0, 0.0)
+            breaker = scraper.circuit_breaker
+            return (state_rank[breaker.state], -breaker.get_success_rate(), scraper.get_avg_response_time())
+        
+        return sorted(source_names, key=health_key)
+    
+    async def _collect_source_task(self, source_name: str, date_from: datetime, date_to: datetime) -> bool:
+        """Collect one source, logging instead of raising so other sources keep going"""
+        scraper = self.scrapers.get(source_name)
+        if scraper and scraper.circuit_breaker.is_open:
+            retry_in = scraper.circuit_breaker.get_status()['retry_in']
+            logger.warning(f"Skipping {source_name}: circuit open for another {retry_in:.0f}s")
+            return False
+        try:
+            logger.info(f"Collecting data from {source_name}")
+            matches = await self._collect_from_source(source_name, date_from, date_to)
+            await self._update_store(self.match_store.replace_source, source_name, matches, date_from, date_to)
+            self.last_update[source_name] = datetime.now()
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error collecting from {source_name}: {e}")
+            return False
+    
+    async def collect_source_async(self, source_name: str, days_back: int = 7, days_forward: int = 7,
+                                   refresh_days_back: Optional[int] = None) -> bool:
+        """Refresh a single source and fold its results into the shared dataset.
+        
+        The first run of a source covers the full window; later runs only go
+        refresh_days_back into the past, since older results no longer change.
+        """
+        window_from = datetime.now() - timedelta(days=days_back)
+        if refresh_days_back is not None and source_name in self.last_update:
+            days_back = min(days_back, refresh_days_back)
+        date_from = datetime.now() - timedelta(days=days_back)
+        date_to = datetime.now() + timedelta(days=days_forward)
+        
+        throttled_before = self.scrapers[source_name].throttled_time if source_name in self.scrapers else 0.0
+        with single_flight_run(source_name) as flight_group:
+            collected = await self._collect_source_task(source_name, date_from, date_to)
+        logger.info(flight_group.format_report())
+        await self._update_store(self.match_store.evict_outside, window_from, date_to)
+        if collected:
+            throttled = self.scrapers[source_name].throttled_time - throttled_before
+            logger.info(f"Refreshed {source_name} ({days_back}d back, {days_forward}d forward, "
+                        f"{throttled:.1f}s waiting on rate limits)")
+        return bool(collected)
+    
+    def _process_collected_data(self) -> Dict:
+        """Merge, validate, filter and save the collected data (blocking; holds the data lock)"""
+        with self._data_lock:
+            return self._process_collected_data_locked()
+    
+    def _process_collected_data_locked(self) -> Dict:
         # Merge and deduplicate data
         merged_data = self._merge_data()
         
@@ -80,92 +168,122 @@ class DataCollector:
         logger.info("Data collection and validation completed")
         return merged_data
     
-    def _collect_from_source(self, source_name: str, date_from: datetime, date_to: datetime):
-        """Collect data from a specific source"""
+    async def _collect_competition(self, scraper, source_name: str, league_id: str, competition: str,
+                                   competition_type: str, date_from: datetime, date_to: datetime) -> List[Dict]:
+        """Collect the matches of one competition from a source"""
+        try:
+            matches = await scraper.scrape_matches_async(league_id, date_from, date_to)
+            for match in matches:
+                match['competition'] = competition
+                match['competition_type'] = competition_type
+            logger.info(f"Collected {len(matches)} {competition} matches from {source_name}")
+            return matches
+        except Exception as e:
+            logger.error(f"Error collecting {competition} matches from {source_name}: {e}")
+            return []
+    
+    async def _collect_from_source(self, source_name: str, date_from: datetime, date_to: datetime) -> List[Dict]:
+        """Collect data from a specific source, returning its matches"""
         scraper = self.scrapers.get(source_name)
         if not scraper:
             logger.error(f"No scraper found for {source_name}")
-            return
+            return []
         
-        # Collect matches for all competitions
-        all_matches = []
-        
-        # Collect La Liga matches
-        try:
-            la_liga_matches = scraper.scrape_matches(LA_LIGA_CONFIG['league_id'], date_from, date_to)
-            for match in la_liga_matches:
-                match['competition'] = 'La Liga'
-                match['competition_type'] = 'la_liga'
-            all_matches.extend(la_liga_matches)
-            logger.info(f"Collected {len(la_liga_matches)} La Liga matches from {source_name}")
-        except Exception as e:
-            logger.error(f"Error collecting La Liga matches from {source_name}: {e}")
-        
-        # Collect Conference League matches
-        try:
-            conference_matches = scraper.scrape_matches(CONFERENCE_LEAGUE_CONFIG['league_id'], date_from, date_to)
-            for match in conference_matches:
-                match['competition'] = CONFERENCE_LEAGUE_CONFIG['competition']
-                match['competition_type'] = 'conference_league'
-            all_matches.extend(conference_matches)
-            logger.info(f"Collected {len(conference_matches)} Conference League matches from {source_name}")
-        except Exception as e:
-            logger.error(f"Error collecting Conference League matches from {source_name}: {e}")
+        # Collect matches for all competitions concurrently
+        competitions = [
+            (LA_LIGA_CONFIG['league_id'], 'La Liga', 'la_liga'),
+            (CONFERENCE_LEAGUE_CONFIG['league_id'], CONFERENCE_LEAGUE_CONFIG['competition'], 'conference_league'),
+            (WOMENS_EURO_CONFIG['league_id'], WOMENS_EURO_CONFIG['competition'], 'womens_euro'),
+        ]
+        competition_matches = await asyncio.gather(*(
+            self._collect_competition(scraper, source_name, league_id, competition, competition_type, date_from, date_to)
+            for league_id, competition, competition_type in competitions
+        ))
+        all_matches = [match for matches in competition_matches for match in matches]
+        collected_at = datetime.now().isoformat()
+        for match in all_matches:
+            match.setdefault('source', source_name)
+            # Freshness of the record when the validator merges sources field by field
+            match['collected_at'] = collected_at
         
-        # Collect Women's Euro matches
-        try:
-            womens_euro_matches = scraper.scrape_matches(WOMENS_EURO_CONFIG['league_id'], date_from, date_to)
-            for match in womens_euro_matches:
-                match['competition'] = WOMENS_EURO_CONFIG['competition']
-                match['competition_type'] = 'womens_euro'
-            all_matches.extend(womens_euro_matches)
-            logger.info(f"Collected {len(womens_euro_matches)} Women's Euro matches from {source_name}")
-        except Exception as e:
-            logger.error(f"Error collecting Women's Euro matches from {source_name}: {e}")
+        if scraper.circuit_breaker.is_open:
+            logger.warning(f"Circuit open for {source_name}, skipping team stats, H2H and odds")
+            return all_matches
         
-        self.collected_data['matches'].extend(all_matches)
+        # Team stats, H2H and odds are fetched in parallel, bounded per source;
+        # the shared rate limiter still enforces the per-host budgets
+        semaphore = asyncio.Semaphore(
+            DATA_SOURCES[source_name].get('max_concurrency', COLLECTION_CONFIG['default_concurrency'])
+        )
         
         # Collect team data for teams in matches
         teams_to_collect = set()
         for match in all_matches:
             teams_to_collect.add(match.get('home_team', ''))
             teams_to_collect.add(match.get('away_team', ''))
+        teams_to_collect = [team for team in teams_to_collect if team and team not in self.match_store.teams]
         
-        for team_name in teams_to_collect:
-            if team_name and team_name not in self.collected_data['teams']:
-                try:
-                    team_stats = scraper.scrape_team_stats(team_name)
-                    if team_stats:
-                        self.collected_data['teams'][team_name] = team_stats
-                except Exception as e:
-                    logger.error(f"Error collecting team stats for {team_name}: {e}")
-        
-        # Collect H2H data for upcoming matches
+        # Collect H2H data and odds for upcoming matches
         upcoming_matches = [m for m in all_matches if m.get('status') == 'scheduled']
-        for match in upcoming_matches[:10]:  # Limit to first 10 to avoid too many requests
+        h2h_pairs = {}
+        for match in upcoming_matches[:COLLECTION_CONFIG['h2h_match_limit']]:
             home_team = match.get('home_team', '')
             away_team = match.get('away_team', '')
-            
             if home_team and away_team:
                 h2h_key = f"{home_team}_{away_team}"
-                if h2h_key not in self.collected_data['h2h_records']:
-                    try:
-                        h2h_data = scraper.scrape_h2h(home_team, away_team)
-                        if h2h_data:
-                            self.collected_data['h2h_records'][h2h_key] = h2h_data
-                    except Exception as e:
-                        logger.error(f"Error collecting H2H for {h2h_key}: {e}")
+                if h2h_key not in self.match_store.h2h_records:
+                    h2h_pairs[h2h_key] = (home_team, away_team)
+        odds_match_ids = [
+            m.get('id', '') for m in upcoming_matches[:COLLECTION_CONFIG['odds_match_limit']]
+            if m.get('id', '')
+        ]
+        
+        team_results, h2h_results, odds_results = await asyncio.gather(
+            asyncio.gather(*(
+                self._bounded_call(semaphore, f"team stats for {team_name}", scraper.scrape_team_stats_async, team_name)
+                for team_name in teams_to_collect
+            )),
+            asyncio.gather(*(
+                self._bounded_call(semaphore, f"H2H for {h2h_key}", scraper.scrape_h2h_async, *teams)
+                for h2h_key, teams in h2h_pairs.items()
+            )),
+            asyncio.gather(*(
+                self._bounded_call(semaphore, f"odds for match {match_id}", scraper.scrape_odds_async, match_id)
+                for match_id in odds_match_ids
+            ))
+        )
         
-        # Collect odds for upcoming matches
-        for match in upcoming_matches[:5]:  # Limit to first 5
-            match_id = match.get('id', '')
-            if match_id:
-                try:
-                    odds_data = scraper.scrape_odds(match_id)
-                    if odds_data:
-                        self.collected_data['odds'][match_id] = odds_data
-                except Exception as e:
-                    logger.error(f"Error collecting odds for match {match_id}: {e}")
+        await self._update_store(self._store_details, source_name,
+                                 zip(teams_to_collect, team_results),
+                                 zip(h2h_pairs, h2h_results),
+                                 zip(odds_match_ids, odds_results))
+        return all_matches
+    
+    def _store_details(self, source_name: str, team_results, h2h_results, odds_results):
+        """Fold a source's team stats, H2H records and odds into the store"""
+        # Merged field by field, so sources fetching the same team or match in one
+        # run fill each other's gaps instead of the last one overwriting the rest
+        teams, h2h_records, odds = self.match_store.teams, self.match_store.h2h_records, self.match_store.odds
+        for team_name, team_stats in team_results:
+            if team_stats:
+                teams[team_name] = field_merger.merge_into(teams.get(team_name), team_stats, source_name)
+        for h2h_key, h2h_data in h2h_results:
+            if h2h_data:
+                h2h_records[h2h_key] = field_merger.merge_into(h2h_records.get(h2h_key), h2h_data, source_name)
+        for match_id, odds_data in odds_results:
+            if odds_data:
+                odds[match_id] = field_merger.merge_into(odds.get(match_id), odds_data, source_name)
+    
+    async def _bounded_call(self, semaphore: asyncio.Semaphore, description: str, scrape_fn, *args):
+        """Run one scrape call under the source's concurrency limit, logging failures"""
+        async with semaphore:
+            try:
+                return await scrape_fn(*args)
+            except CircuitOpenError:
+                return None
+            except Exception as e:
+                logger.error(f"Error collecting {description}: {e}")
+                return None
     
     def _merge_data(self) -> Dict:
         """Merge and deduplicate collected data"""
@@ -178,52 +296,23 @@ class DataCollector:
             'last_updated': datetime.now().isoformat()
         }
         
-        # Merge matches (remove duplicates based on match ID)
-        seen_matches = set()
-        for match in self.collected_data['matches']:
-            match_id = match.get('id', '')
-            if match_id and match_id not in seen_matches:
-                merged['matches'].append(match)
-                seen_matches.add(match_id)
-        
-        # Merge teams
-        merged['teams'] = self.collected_data['teams']
-        
-        # Merge H2H records
-        merged['h2h_records'] = self.collected_data['h2h_records']
-        
-        # Merge odds
-        merged['odds'] = self.collected_data['odds']
-        
-        # Merge statistics
-        merged['statistics'] = self.collected_data['statistics']
+        # Matches (the store already keeps one per source and fixture), teams, H2H records,
+        # odds and statistics; copied, so later refreshes do not change what callers hold
+        merged.update(self.match_store.export())
         
         return merged
     
     def _save_data(self, data: Dict):
         """Save collected data to files"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Save raw data
-        raw_file = f"backend/data/raw/data_{timestamp}.json"
-        with open(raw_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-        
-        # Save latest data
-        latest_file = "backend/data/processed/latest_data.json"
-        with open(latest_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-        
-        logger.info(f"Data saved to {raw_file} and {latest_file}")
+        snapshot_store.save(data)
     
     def get_latest_data(self) -> Dict:
-        """Get the latest collected data"""
+        """Get the latest collected data (a shared, read-only view)"""
         try:
-            with open("backend/data/processed/latest_data.json", 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return json_cache.load(snapshot_store.latest_file)
         except FileNotFoundError:
             logger.warning("No latest data found, collecting new data")
-            return self.collect_all_data()
+            return freeze(self.collect_all_data())
     
     def get_source_status(self) -> Dict:
         """Get status of all data sources"""
@@ -232,6 +321,18 @@ class DataCollector:
             status[source_name] = scraper.get_data_source_status()
         return status
     
+    def get_memory_usage(self) -> Dict:
+        """Size of the in-memory dataset"""
+        with self._data_lock:
+            return self.match_store.memory_usage()
+    
+    def get_breaker_status(self) -> Dict:
+        """Get circuit breaker state of all data sources"""
+        return {
+            source_name: scraper.circuit_breaker.get_status()
+            for source_name, scraper in self.scrapers.items()
+        }
+    
     def cleanup(self):
         """Clean up resources"""
         for scraper in self.scrapers.values():
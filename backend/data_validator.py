@@ -1,13 +1,33 @@
+import hashlib
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+import pandas as pd
 from loguru import logger
+from config.settings import VALIDATION_CONFIG
 from models.data_models import Match
+from team_identity import team_index
+from fixture_linker import fixture_linker
+from field_merge import field_merger
 
 class DataValidator:
     """Validates and cross-checks match data from multiple sources"""
     
-    def __init__(self):
+    SOURCE_WEIGHTS = {
+        'laliga_official': 1.0,    # Official source - highest weight
+        'promiedos': 0.9,          # Reliable Spanish football coverage
+        'flashscore': 0.8,         # Well-established
+        'sofascore': 0.8,          # Well-established
+        'betsapi': 0.7,            # Good but less reliable
+        'whoscored': 0.7,
+        'transfermarkt': 0.6
+    }
+    
+    def __init__(self, mode: str = VALIDATION_CONFIG['mode'],
+                 incremental: bool = VALIDATION_CONFIG['incremental']):
+        # 'python' validates group by group, 'vectorized' every group at once over a pandas frame
+        self.mode = mode
+        self.incremental = incremental
         self.validation_rules = {
             'min_sources_required': 2,  # At least 2 sources must confirm the match
             'max_date_difference': 1,   # Max 1 day difference between sources
@@ -15,6 +35,10 @@ class DataValidator:
             'valid_statuses': ['scheduled', 'not_started', 'live'],
             'excluded_statuses': ['postponed', 'cancelled', 'abandoned', 'finished']
         }
+        # Link score of every group from the last grouping
+        self.link_scores = {}
+        # Fingerprint and outcome of every group from the last run (incremental mode)
+        self._group_cache: Dict[str, Dict] = {}
     
     def validate_matches(self, matches_data: Dict) -> Dict:
         """Validate and cross-check matches from multiple sources"""
@@ -23,15 +47,108 @@ class DataValidator:
         # Group matches by unique identifier
         grouped_matches = self._group_matches_by_id(matches_data['matches'])
         
-        # Validate each group
-        validated_matches = []
+        # Validate each group (only the new and changed ones in incremental mode)
+        if self.incremental:
+            fingerprints = {match_id: self._group_fingerprint(match_id, sources)
+                            for match_id, sources in grouped_matches.items()}
+            changed_groups = {
+                match_id: sources for match_id, sources in grouped_matches.items()
+                if self._group_cache.get(match_id, {}).get('fingerprint') != fingerprints[match_id]
+            }
+        else:
+            changed_groups = grouped_matches
+        
+        if self.mode == 'vectorized':
+            validated_by_id, validation_errors = self._validate_groups_vectorized(changed_groups)
+        else:
+            validated_by_id, validation_errors = self._validate_groups(changed_groups)
+        validated_matches = list(validated_by_id.values())
+        
+        summary = {
+            'total_matches': len(matches_data['matches']),
+            'valid_matches': 0,
+            'invalid_matches': 0,
+            'validation_rate': 0
+        }
+        if self.incremental:
+            validated_matches, validation_errors, summary['incremental'] = self._apply_group_cache(
+                grouped_matches, fingerprints, changed_groups, validated_by_id, validation_errors
+            )
+            logger.info("Incremental validation: {recomputed} groups recomputed, {reused} reused, "
+                        "{skipped} skipped".format(**summary['incremental']))
+        
+        logger.info(f"Validation complete: {len(validated_matches)} valid matches, {len(validation_errors)} errors")
+        
+        summary['valid_matches'] = len(validated_matches)
+        summary['invalid_matches'] = len(validation_errors)
+        summary['validation_rate'] = len(validated_matches) / len(matches_data['matches']) if matches_data['matches'] else 0
+        return {
+            'valid_matches': validated_matches,
+            'validation_errors': validation_errors,
+            'validation_summary': summary
+        }
+    
+    def _group_fingerprint(self, match_id: str, sources: Dict) -> str:
+        """Hash of a group's source records (in source order), its link score and
+        which of its records is freshest (that decides the merged live fields)"""
+        records = [
+            (source_name, {key: value for key, value in match_data.items()
+                           if key not in ('validation_metadata', 'collected_at')})
+            for source_name, match_data in sources.items()
+        ]
+        freshness = sorted(sources, key=lambda source_name: str(sources[source_name].get('collected_at') or ''))
+        raw = json.dumps([self.link_scores.get(match_id), records, freshness], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def _apply_group_cache(self, grouped_matches: Dict[str, Dict], fingerprints: Dict[str, str],
+                           changed_groups: Dict[str, Dict], validated_by_id: Dict[str, Dict],
+                           validation_errors: List[Dict]) -> Tuple[List[Dict], List[Dict], Dict]:
+        """Combine the freshly validated groups with the outcomes cached for unchanged ones.
+        
+        Unchanged groups that were valid reuse their merged record and
+        validation metadata (reused); unchanged groups that failed keep their
+        errors without being checked again (skipped). Freshly validated
+        groups are looked up by group id in validated_by_id and
+        validation_errors. The cache is rebuilt from this run's groups only.
+        """
+        errors_by_id = {error['match_id']: error for error in validation_errors}
+        counts = {'recomputed': 0, 'reused': 0, 'skipped': 0}
+        cache = {}
+        validated, errors = [], []
+        
+        for match_id, sources in grouped_matches.items():
+            if match_id in changed_groups:
+                counts['recomputed'] += 1
+                if match_id in validated_by_id:
+                    entry = {'best_match': validated_by_id[match_id]}
+                    validated.append(entry['best_match'])
+                else:
+                    entry = {'errors': errors_by_id[match_id]['errors']}
+                    errors.append(errors_by_id[match_id])
+                entry['fingerprint'] = fingerprints[match_id]
+            else:
+                entry = self._group_cache[match_id]
+                if 'errors' in entry:
+                    counts['skipped'] += 1
+                    errors.append({'match_id': match_id, 'errors': list(entry['errors']), 'sources': list(sources.keys())})
+                else:
+                    counts['reused'] += 1
+                    validated.append(entry['best_match'])
+            cache[match_id] = entry
+        
+        self._group_cache = cache
+        return validated, errors, counts
+    
+    def _validate_groups(self, grouped_matches: Dict[str, Dict]) -> Tuple[Dict[str, Dict], List[Dict]]:
+        """Validate the groups one at a time; valid matches are keyed by group id"""
+        validated_matches = {}
         validation_errors = []
         
         for match_id, sources in grouped_matches.items():
             try:
                 validation_result = self._validate_match_group(match_id, sources)
                 if validation_result['is_valid']:
-                    validated_matches.append(validation_result['best_match'])
+                    validated_matches[match_id] = validation_result['best_match']
                 else:
                     validation_errors.append({
                         'match_id': match_id,
@@ -46,60 +163,25 @@ class DataValidator:
                     'sources': list(sources.keys()) if 'sources' in locals() else []
                 })
         
-        logger.info(f"Validation complete: {len(validated_matches)} valid matches, {len(validation_errors)} errors")
-        
-        return {
-            'valid_matches': validated_matches,
-            'validation_errors': validation_errors,
-            'validation_summary': {
-                'total_matches': len(matches_data['matches']),
-                'valid_matches': len(validated_matches),
-                'invalid_matches': len(validation_errors),
-                'validation_rate': len(validated_matches) / len(matches_data['matches']) if matches_data['matches'] else 0
-            }
-        }
+        return validated_matches, validation_errors
     
     def _group_matches_by_id(self, matches: List[Dict]) -> Dict[str, Dict]:
-        """Group matches by a unique identifier based on teams and date"""
+        """Group matches from different sources that describe the same fixture"""
         grouped = {}
+        self.link_scores = {}
         
-        for match in matches:
-            # Create a unique ID based on teams and date
-            home_team = match.get('home_team', '').lower().strip()
-            away_team = match.get('away_team', '').lower().strip()
-            date = match.get('date', '')
+        for cluster in fixture_linker.link(matches):
+            # Create unique ID from the canonical team ids and date
+            unique_id = f"{cluster['home_id']}_{cluster['away_id']}_{cluster['date']}"
+            if unique_id in grouped:
+                unique_id = f"{unique_id}_{len(grouped)}"
             
-            if home_team and away_team and date:
-                # Normalize team names
-                home_team = self._normalize_team_name(home_team)
-                away_team = self._normalize_team_name(away_team)
-                
-                # Create unique ID
-                unique_id = f"{home_team}_{away_team}_{date[:10]}"  # Use date part only
-                
-                if unique_id not in grouped:
-                    grouped[unique_id] = {}
-                
-                source = match.get('source', 'unknown')
-                grouped[unique_id][source] = match
+            grouped[unique_id] = cluster['sources']
+            self.link_scores[unique_id] = cluster['score']
         
+        team_index.write_unknown()
         return grouped
     
-    def _normalize_team_name(self, team_name: str) -> str:
-        """Normalize team names for comparison"""
-        # Remove common suffixes and prefixes
-        normalized = team_name.lower()
-        
-        # Remove common words
-        common_words = ['fc', 'cf', 'cd', 'real', 'atletico', 'atletico', 'deportivo', 'united', 'city']
-        for word in common_words:
-            normalized = normalized.replace(word, '').strip()
-        
-        # Remove extra spaces
-        normalized = ' '.join(normalized.split())
-        
-        return normalized
-    
     def _validate_match_group(self, match_id: str, sources: Dict) -> Dict:
         """Validate a group of matches from different sources"""
         errors = []
@@ -147,14 +229,15 @@ class DataValidator:
                         if date_diff > self.validation_rules['max_date_difference']:
                             errors.append(f"Date mismatch between '{dates[i][0]}' and '{dates[j][0]}': {date_diff} days")
         
-        # Check team name consistency
-        if len(valid_matches) > 1:
+        # Check team name consistency (the linker already matched the teams of linked fixtures,
+        # whose spellings need not resolve to the same id)
+        if len(valid_matches) > 1 and self.link_scores.get(match_id) is None:
             home_teams = set()
             away_teams = set()
             
             for source_name, match_data in valid_matches:
-                home_teams.add(self._normalize_team_name(match_data['home_team']))
-                away_teams.add(self._normalize_team_name(match_data['away_team']))
+                home_teams.add(team_index.resolve(match_data['home_team'], source_name))
+                away_teams.add(team_index.resolve(match_data['away_team'], source_name))
             
             if len(home_teams) > 1:
                 errors.append(f"Home team name inconsistency: {home_teams}")
@@ -164,26 +247,17 @@ class DataValidator:
         # Determine if match is valid
         is_valid = len(errors) == 0
         
-        # Select best match data (prioritize official sources)
+        # Merge the valid records field by field (official sources first)
         best_match = None
         if is_valid and valid_matches:
-            # Prioritize official sources
-            source_priority = {
-                'laliga_official': 1,
-                'promiedos': 2,
-                'flashscore': 3,
-                'sofascore': 4,
-                'betsapi': 5
-            }
-            
-            best_source = min(valid_matches, key=lambda x: source_priority.get(x[0], 999))
-            best_match = best_source[1]
+            best_match = field_merger.merge(dict(valid_matches))
             
             # Add validation metadata
             best_match['validation_metadata'] = {
                 'sources_confirmed': list(sources.keys()),
                 'validation_timestamp': datetime.now().isoformat(),
-                'confidence_score': self._calculate_confidence_score(sources)
+                'confidence_score': self._calculate_confidence_score(sources),
+                'link_score': self.link_scores.get(match_id)
             }
         
         return {
@@ -193,21 +267,169 @@ class DataValidator:
             'sources_count': len(sources)
         }
     
+    def _validate_groups_vectorized(self, grouped_matches: Dict[str, Dict]) -> Tuple[Dict[str, Dict], List[Dict]]:
+        """Validate every group at once over a frame with one row per (group, source).
+        
+        Field, status, date-spread and team checks are computed with
+        group-bys; error messages are only built for the groups that fail, in
+        the same order and wording as _validate_match_group.
+        """
+        if not grouped_matches:
+            return {}, []
+        try:
+            return self._validate_frame(grouped_matches)
+        except Exception as e:
+            logger.error(f"Vectorized validation failed, validating group by group: {e}")
+            return self._validate_groups(grouped_matches)
+    
+    def _validate_frame(self, grouped_matches: Dict[str, Dict]) -> Tuple[Dict[str, Dict], List[Dict]]:
+        rules = self.validation_rules
+        match_ids = list(grouped_matches.keys())
+        group_sources = list(grouped_matches.values())
+        rows = [
+            (group, source_name, match_data)
+            for group, sources in enumerate(group_sources)
+            for source_name, match_data in sources.items()
+        ]
+        frame = pd.DataFrame({
+            'group': [row[0] for row in rows],
+            'source': [row[1] for row in rows],
+            'status': [str(row[2].get('status') or '').lower() for row in rows],
+            'date': [row[2].get('date') for row in rows],
+            'missing': [any(not row[2].get(field) for field in rules['required_fields']) for row in rows],
+        })
+        group = frame['group']
+        groups = pd.RangeIndex(len(group_sources))
+        sources_count = group.value_counts(sort=False).reindex(groups, fill_value=0)
+        
+        # Status checks
+        frame['excluded'] = frame['status'].isin(rules['excluded_statuses'])
+        frame['valid'] = frame['status'].isin(rules['valid_statuses'])
+        valid_count = frame['valid'].groupby(group).sum().reindex(groups, fill_value=0)
+        
+        # Dates are parsed once, only where the per-group date and team checks apply
+        frame['checked'] = frame['valid'] & (group.map(valid_count) > 1)
+        checked_rows = [row for row, is_checked in zip(rows, frame['checked'].tolist()) if is_checked]
+        day_strings = [row[2]['date'].split('T')[0] if isinstance(row[2].get('date'), str) else None
+                       for row in checked_rows]
+        frame['parsed'] = pd.NaT
+        frame.loc[frame['checked'], 'parsed'] = pd.to_datetime(pd.Series(day_strings, dtype=object),
+                                                              format='%Y-%m-%d', errors='coerce').values
+        frame['bad_date'] = frame['checked'] & frame['parsed'].isna()
+        dates_by_group = frame[frame['checked'] & frame['parsed'].notna()].groupby('group')['parsed']
+        spread = (dates_by_group.max() - dates_by_group.min()).dt.days.reindex(groups, fill_value=0)
+        
+        # Team consistency across the checked sources of groups the linker did not join
+        linked = [self.link_scores.get(match_id) is not None for match_id in match_ids]
+        frame['team_checked'] = frame['checked'] & group.map(lambda index: not linked[index])
+        team_rows = [row for row, is_checked in zip(rows, frame['team_checked'].tolist()) if is_checked]
+        for side in ('home', 'away'):
+            frame[f'{side}_id'] = None
+            frame.loc[frame['team_checked'], f'{side}_id'] = [
+                team_index.resolve(match_data[f'{side}_team'], source_name)
+                for _, source_name, match_data in team_rows
+            ]
+        checked = frame[frame['team_checked']]
+        home_teams = checked.groupby('group')['home_id'].nunique().reindex(groups, fill_value=1)
+        away_teams = checked.groupby('group')['away_id'].nunique().reindex(groups, fill_value=1)
+        
+        failing = (
+            (sources_count < rules['min_sources_required'])
+            | frame['missing'].groupby(group).any().reindex(groups, fill_value=False)
+            | frame['excluded'].groupby(group).any().reindex(groups, fill_value=False)
+            | (valid_count == 0)
+            | frame['bad_date'].groupby(group).any().reindex(groups, fill_value=False)
+            | (spread > rules['max_date_difference'])
+            | (home_teams > 1)
+            | (away_teams > 1)
+        )
+        
+        # Plain lists for the per-group loop below
+        is_failing, valid_counts, spreads = failing.tolist(), valid_count.tolist(), spread.tolist()
+        valid_records: Dict[int, Dict[str, Dict]] = {}
+        for (row_group, source_name, match_data), is_valid in zip(rows, frame['valid'].tolist()):
+            if is_valid:
+                valid_records.setdefault(row_group, {})[source_name] = match_data
+        
+        validated_matches = {}
+        validation_errors = []
+        failing_rows: Dict[int, List[Dict]] = {}
+        columns = ['group', 'source', 'status', 'checked', 'team_checked', 'parsed', 'home_id', 'away_id']
+        failing_frame = frame.loc[group.map(failing), columns]
+        for values in zip(*(failing_frame[column].tolist() for column in columns)):
+            row = dict(zip(columns, values))
+            failing_rows.setdefault(row['group'], []).append(row)
+        for index, match_id in enumerate(match_ids):
+            sources = group_sources[index]
+            if is_failing[index]:
+                validation_errors.append({
+                    'match_id': match_id,
+                    'errors': self._frame_group_errors(failing_rows[index], sources,
+                                                       int(valid_counts[index]), int(spreads[index])),
+                    'sources': list(sources.keys())
+                })
+                continue
+            best_match = field_merger.merge(valid_records[index])
+            best_match['validation_metadata'] = {
+                'sources_confirmed': list(sources.keys()),
+                'validation_timestamp': datetime.now().isoformat(),
+                # Same arithmetic as 'python' mode, so the scores match to the last bit
+                'confidence_score': self._calculate_confidence_score(sources),
+                'link_score': self.link_scores.get(match_id)
+            }
+            validated_matches[match_id] = best_match
+        
+        return validated_matches, validation_errors
+    
+    def _frame_group_errors(self, rows: List[Dict], sources: Dict, valid_count: int, spread: int) -> List[str]:
+        """Error messages of a failing group, worded and ordered as in _validate_match_group"""
+        rules = self.validation_rules
+        errors = []
+        if len(sources) < rules['min_sources_required']:
+            errors.append(f"Insufficient sources: {len(sources)} < {rules['min_sources_required']}")
+        for source_name, match_data in sources.items():
+            for field in rules['required_fields']:
+                if field not in match_data or not match_data[field]:
+                    errors.append(f"Missing required field '{field}' in source '{source_name}'")
+        for row in rows:
+            if row['status'] in rules['excluded_statuses']:
+                errors.append(f"Match excluded due to status '{row['status']}' in source '{row['source']}'")
+        if valid_count == 0:
+            errors.append("No valid match status found across sources")
+        if valid_count > 1:
+            checked = [row for row in rows if row['checked']]
+            dates = []
+            for row in checked:
+                source_name, parsed = row['source'], row['parsed']
+                if pd.isna(parsed):
+                    try:
+                        date_str = sources[source_name]['date']
+                        if 'T' in date_str:
+                            date_str = date_str.split('T')[0]
+                        datetime.strptime(date_str, '%Y-%m-%d')
+                    except Exception as e:
+                        errors.append(f"Invalid date format in source '{source_name}': {e}")
+                else:
+                    dates.append((source_name, parsed))
+            if spread > rules['max_date_difference']:
+                for i in range(len(dates)):
+                    for j in range(i + 1, len(dates)):
+                        date_diff = abs((dates[i][1] - dates[j][1]).days)
+                        if date_diff > rules['max_date_difference']:
+                            errors.append(f"Date mismatch between '{dates[i][0]}' and '{dates[j][0]}': {date_diff} days")
+            home_teams = {row['home_id'] for row in checked if row['team_checked']}
+            away_teams = {row['away_id'] for row in checked if row['team_checked']}
+            if len(home_teams) > 1:
+                errors.append(f"Home team name inconsistency: {home_teams}")
+            if len(away_teams) > 1:
+                errors.append(f"Away team name inconsistency: {away_teams}")
+        return errors
+    
     def _calculate_confidence_score(self, sources: Dict) -> float:
         """Calculate confidence score based on sources and their reliability"""
-        source_weights = {
-            'laliga_official': 1.0,    # Official source - highest weight
-            'promiedos': 0.9,          # Reliable Spanish football coverage
-            'flashscore': 0.8,         # Well-established
-            'sofascore': 0.8,          # Well-established
-            'betsapi': 0.7,            # Good but less reliable
-            'whoscored': 0.7,
-            'transfermarkt': 0.6
-        }
-        
         total_weight = 0
         for source_name in sources.keys():
-            total_weight += source_weights.get(source_name, 0.5)
+            total_weight += self.SOURCE_WEIGHTS.get(source_name, 0.5)
         
         # Normalize by number of sources
         confidence = total_weight / len(sources) if sources else 0
@@ -222,6 +444,16 @@ class DataValidator:
     
     def filter_matches_for_predictions(self, validated_matches: List[Dict]) -> List[Dict]:
         """Filter matches that are suitable for predictions"""
+        if self.mode == 'vectorized' and validated_matches:
+            suitable_matches = self._filter_matches_vectorized(validated_matches)
+        else:
+            suitable_matches = self._filter_matches_python(validated_matches)
+        
+        logger.info(f"Found {len(suitable_matches)} matches suitable for predictions")
+        return suitable_matches
+    
+    def _filter_matches_python(self, validated_matches: List[Dict]) -> List[Dict]:
+        """Check the matches one at a time"""
         suitable_matches = []
         
         for match in validated_matches:
@@ -244,9 +476,42 @@ class DataValidator:
                 logger.error(f"Error filtering match {match.get('id', 'unknown')}: {e}")
                 continue
         
-        logger.info(f"Found {len(suitable_matches)} matches suitable for predictions")
         return suitable_matches
     
+    def _filter_matches_vectorized(self, validated_matches: List[Dict]) -> List[Dict]:
+        """Same checks as _filter_matches_python with the dates parsed in one pass.
+        
+        Dates that are not plain naive ISO timestamps (time zones, other
+        formats) go through the per-match path, so the result and the logged
+        errors are the same as in 'python' mode.
+        """
+        now = datetime.now()
+        frame = pd.DataFrame({
+            'date': [match.get('date') for match in validated_matches],
+            'status': [str(match.get('status') or '').lower() for match in validated_matches],
+            'confidence': [match.get('validation_metadata', {}).get('confidence_score', 0) for match in validated_matches],
+        })
+        dates = frame['date'].where(frame['date'].map(lambda value: isinstance(value, str)))
+        plain = (dates.str.match(r'\d{4}-\d{2}-\d{2}', na=False)
+                 & ~dates.str.contains(r'(?:Z|[+-]\d{2}:?\d{2}(?::?\d{2})?)$', na=False))
+        parsed = pd.to_datetime(dates.where(plain), errors='coerce')
+        fallback = parsed.isna()
+        
+        suitable = (
+            ~fallback
+            & (parsed > now)
+            & ((parsed - now).dt.days <= 7)
+            & frame['status'].isin(['scheduled', 'not_started'])
+            & (frame['confidence'] >= 0.7)
+        )
+        fallback_matches = {id(match) for match in self._filter_matches_python(
+            [validated_matches[i] for i in frame.index[fallback]]
+        )}
+        return [
+            match for i, match in enumerate(validated_matches)
+            if suitable.iloc[i] or (fallback.iloc[i] and id(match) in fallback_matches)
+        ]
+    
     def generate_validation_report(self, validation_result: Dict) -> str:
         """Generate a human-readable validation report"""
         report = []
@@ -259,6 +524,10 @@ class DataValidator:
         report.append(f"Valid matches: {summary['valid_matches']}")
         report.append(f"Invalid matches: {summary['invalid_matches']}")
         report.append(f"Validation rate: {summary['validation_rate']:.2%}")
+        if 'incremental' in summary:
+            incremental = summary['incremental']
+            report.append(f"Match groups recomputed: {incremental['recomputed']}, "
+                          f"reused: {incremental['reused']}, skipped: {incremental['skipped']}")
         report.append("")
         
         if validation_result['validation_errors']:
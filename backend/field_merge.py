@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, List, Optional
+from config.settings import DATA_SOURCES, FIELD_MERGE_CONFIG
+
+# Where a record came from rather than what it says; taken whole from the primary record
+IDENTITY_FIELDS = ('id', 'source')
+# Bookkeeping that is never merged
+SKIPPED_FIELDS = ('field_sources', 'validation_metadata', 'collected_at')
+
+def _has_value(value) -> bool:
+    # 0 is a real score, so only None and empty strings/containers count as missing
+    return value is not None and value != '' and value != [] and value != {}
+
+class FieldMerger:
+    """Combines the records several sources hold for the same thing, field by field.
+
+    Each field comes from the highest-priority source (DATA_SOURCES
+    'priority') that has a value for it, so a gap in the official record is
+    filled by the next source instead of being lost. Fields that change as a
+    match is played (FIELD_MERGE_CONFIG['fresh_fields']) come from the most
+    recently collected record instead, priority breaking ties. The merged
+    record carries 'field_sources', mapping each field to the source that
+    supplied it.
+    """
+
+    def __init__(self, data_sources: Dict = DATA_SOURCES, config: Dict = FIELD_MERGE_CONFIG):
+        self.priorities = {name: source['priority'] for name, source in data_sources.items()}
+        self.fresh_fields = set(config['fresh_fields'])
+
+    def priority(self, source_name: str) -> int:
+        return self.priorities.get(source_name, 999)
+
+    def merge(self, records: Dict[str, Dict]) -> Dict:
+        """Merge one record per source ({source: record}) into a new record"""
+        by_priority = sorted(records.items(), key=lambda item: self.priority(item[0]))
+        # Newest first; sorted() is stable, so equally fresh records stay in priority order
+        by_freshness = sorted(by_priority, key=lambda item: str(item[1].get('collected_at') or ''), reverse=True)
+        primary_source, primary = by_priority[0]
+
+        merged = {field: primary[field] for field in IDENTITY_FIELDS if field in primary}
+        field_sources = {}
+        fields = self._fields(record for _, record in by_priority)
+        for field in fields:
+            candidates = by_freshness if field in self.fresh_fields else by_priority
+            for source_name, record in candidates:
+                if _has_value(record.get(field)):
+                    merged[field] = record[field]
+                    field_sources[field] = source_name
+                    break
+            else:
+                merged[field] = primary.get(field)
+        merged.setdefault('source', primary_source)
+        collected = [record['collected_at'] for record in records.values() if record.get('collected_at')]
+        if collected:
+            merged['collected_at'] = max(collected, key=str)
+        merged['field_sources'] = field_sources
+        return merged
+
+    def merge_into(self, current: Optional[Dict], record: Dict, source_name: str) -> Dict:
+        """Fold a record that was just collected into the merged record kept so far"""
+        if current is None:
+            return {
+                **record,
+                'field_sources': {field: source_name for field in self._fields([record]) if _has_value(record[field])},
+            }
+        merged = dict(current)
+        field_sources = dict(current.get('field_sources', {}))
+        for field in self._fields([record]):
+            value = record[field]
+            if not _has_value(value):
+                continue
+            supplier = field_sources.get(field)
+            # The incoming record is the freshest, so it wins fresh fields and priority ties
+            if (supplier is None or not _has_value(merged.get(field)) or field in self.fresh_fields
+                    or self.priority(source_name) <= self.priority(supplier)):
+                merged[field] = value
+                field_sources[field] = source_name
+        merged['field_sources'] = field_sources
+        return merged
+
+    @staticmethod
+    def _fields(records: Iterable[Dict]) -> List[str]:
+        fields = {}
+        for record in records:
+            for field in record:
+                if field not in IDENTITY_FIELDS and field not in SKIPPED_FIELDS:
+                    fields[field] = None
+        return list(fields)
+
+# Shared by the collector and the validator
+field_merger = FieldMerger()
@@ -0,0 +1,289 @@
+import re
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+from config.settings import FIXTURE_LINKING_CONFIG
+from team_identity import team_index, normalize_name, strip_affixes
+
+# Tokens that mark a club's women's, reserve or youth side. A fixture whose team has
+# one on only one side ('Real Madrid' v 'Real Madrid Castilla') is a different match
+QUALIFIER_TOKENS = {
+    'w': 'women', 'women': 'women', 'womens': 'women', 'ladies': 'women', 'wfc': 'women',
+    'femenino': 'women', 'femenina': 'women', 'feminino': 'women', 'feminine': 'women', 'frauen': 'women',
+    'b': 'reserve', 'ii': 'reserve', 'reserve': 'reserve', 'reserves': 'reserve',
+    'castilla': 'reserve', 'atletic': 'reserve',
+}
+_AGE_GROUP = re.compile(r'\b(?:u|sub|under)\s?(\d{2})\b')
+
+def qualifiers(name: str) -> FrozenSet[str]:
+    """Women's/reserve/age-group markers in a team or competition name"""
+    normalized = normalize_name(name)
+    found = {QUALIFIER_TOKENS[token] for token in normalized.split() if token in QUALIFIER_TOKENS}
+    found.update(f"u{age}" for age in _AGE_GROUP.findall(normalized))
+    return frozenset(found)
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def _dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+class FixtureLinker:
+    """Record linkage of fixtures reported by different sources.
+
+    Fixtures are blocked by day (neighbouring days up to max_date_difference
+    are compared too) and competitions that clearly differ are never linked.
+    Inside a block, candidates come from an inverted index of team-name
+    trigrams and canonical team ids, and each candidate pair is scored by
+    trigram similarity of the home and away names (1.0 when the team identity
+    index already knows both spellings). A side scores 0 when both names
+    resolve to different teams of the alias table, or when only one of them
+    is a women's, reserve or youth team. Pairs are merged best-first into
+    clusters holding at most one fixture per source.
+    """
+
+    def __init__(self, config: Dict = FIXTURE_LINKING_CONFIG):
+        self.min_score = config['min_score']
+        self.min_team_score = config['min_team_score']
+        self.max_date_difference = config['max_date_difference']
+        self.date_penalty = config['date_penalty']
+        self.min_competition_score = config['min_competition_score']
+        self._grams: Dict[str, FrozenSet[str]] = {}
+        self.last_stats: Dict = {}
+
+    def _name_grams(self, name: str) -> FrozenSet[str]:
+        grams = self._grams.get(name)
+        if grams is None:
+            grams = self._grams[name] = _trigrams(strip_affixes(normalize_name(name)))
+        return grams
+
+    def _team_fields(self, side: str, name: str, source: Optional[str], record_unknown: bool = True) -> Dict:
+        team_id = team_index.resolve(name, source, record_unknown=record_unknown)
+        return {
+            f'{side}_id': team_id,
+            f'{side}_known': team_index.is_known(team_id),
+            f'{side}_grams': self._name_grams(name),
+            f'{side}_qualifiers': qualifiers(name),
+        }
+
+    def _record(self, match: Dict) -> Optional[Dict]:
+        home_team, away_team = match.get('home_team'), match.get('away_team')
+        try:
+            day = date.fromisoformat(str(match.get('date', ''))[:10]).toordinal()
+        except ValueError:
+            return None
+        if not home_team or not away_team:
+            return None
+        source = match.get('source', 'unknown')
+        competition = match.get('competition')
+        return {
+            'match': match,
+            'source': source,
+            'day': day,
+            **self._team_fields('home', home_team, source),
+            **self._team_fields('away', away_team, source),
+            'competition_grams': self._name_grams(competition) if competition else None,
+            'competition_qualifiers': qualifiers(competition) if competition else None,
+        }
+
+    def _team_score(self, a: Dict, b: Dict, side: str) -> float:
+        if a[f'{side}_id'] == b[f'{side}_id']:
+            return 1.0
+        if (a[f'{side}_known'] and b[f'{side}_known']) or a[f'{side}_qualifiers'] != b[f'{side}_qualifiers']:
+            return 0.0
+        return _dice(a[f'{side}_grams'], b[f'{side}_grams'])
+
+    def _competitions_compatible(self, a: Dict, b: Dict) -> bool:
+        if a['competition_grams'] is None or b['competition_grams'] is None:
+            return True
+        return (a['competition_qualifiers'] == b['competition_qualifiers']
+                and _dice(a['competition_grams'], b['competition_grams']) >= self.min_competition_score)
+
+    def score_pair(self, a: Dict, b: Dict) -> Dict:
+        """Similarity of two prepared fixture records, with its components"""
+        home = self._team_score(a, b, 'home')
+        away = self._team_score(a, b, 'away')
+        days_apart = abs(a['day'] - b['day'])
+        score = (home + away) / 2 * self.date_penalty ** days_apart
+        if (min(home, away) < self.min_team_score or days_apart > self.max_date_difference
+                or not self._competitions_compatible(a, b)):
+            score = 0.0
+        return {'score': score, 'home': home, 'away': away, 'days_apart': days_apart}
+
+    def _candidate_pairs(self, records: List[Dict]) -> List[Tuple[float, int, int]]:
+        """Scored fixture pairs above min_score, one day block at a time.
+
+        Every name is a row of trigram columns (the trigram index is built once
+        per run), so a block's shared-trigram counts are one matrix product and
+        the Dice similarity of all its pairs is computed at once.
+        """
+        vocabulary: Dict[str, int] = {}
+        name_columns: Dict[FrozenSet[str], np.ndarray] = {}
+        gram_columns = {side: [] for side in ('home', 'away')}
+        for record in records:
+            for side in ('home', 'away'):
+                grams = record[f'{side}_grams']
+                columns = name_columns.get(grams)
+                if columns is None:
+                    columns = name_columns[grams] = np.array(
+                        [vocabulary.setdefault(g, len(vocabulary)) for g in grams], dtype=np.int64)
+                gram_columns[side].append(columns)
+        team_codes: Dict[str, int] = {}
+        team_ids = {side: np.array([team_codes.setdefault(r[f'{side}_id'], len(team_codes)) for r in records])
+                    for side in ('home', 'away')}
+        known = {side: np.array([r[f'{side}_known'] for r in records], dtype=bool) for side in ('home', 'away')}
+        qualifier_codes: Dict[FrozenSet[str], int] = {}
+        team_qualifiers = {
+            side: np.array([qualifier_codes.setdefault(r[f'{side}_qualifiers'], len(qualifier_codes)) for r in records])
+            for side in ('home', 'away')
+        }
+        source_codes: Dict[str, int] = {}
+        sources = np.array([source_codes.setdefault(r['source'], len(source_codes)) for r in records])
+        days = np.array([r['day'] for r in records])
+        positions = np.arange(len(records))
+
+        by_day: Dict[int, List[int]] = defaultdict(list)
+        for i, record in enumerate(records):
+            by_day[record['day']].append(i)
+
+        pairs = []
+        for day, rows in by_day.items():
+            rows = np.array(rows)
+            cols = np.concatenate([
+                np.array(by_day[d]) for d in range(day - self.max_date_difference, day + 1) if d in by_day
+            ])
+            similarity = {}
+            for side in ('home', 'away'):
+                used = np.unique(np.concatenate([gram_columns[side][i] for i in cols]))
+                row_matrix = self._incidence(rows, gram_columns[side], used)
+                col_matrix = self._incidence(cols, gram_columns[side], used)
+                shared = row_matrix @ col_matrix.T
+                sizes = row_matrix.sum(axis=1)[:, None] + col_matrix.sum(axis=1)[None, :]
+                dice = 2 * shared / np.maximum(sizes, 1)
+                same_team = team_ids[side][rows][:, None] == team_ids[side][cols][None, :]
+                other_team = ((known[side][rows][:, None] & known[side][cols][None, :])
+                              | (team_qualifiers[side][rows][:, None] != team_qualifiers[side][cols][None, :]))
+                dice[other_team] = 0.0
+                dice[same_team] = 1.0
+                similarity[side] = dice
+            days_apart = days[rows][:, None] - days[cols][None, :]
+            scores = (similarity['home'] + similarity['away']) / 2 * self.date_penalty ** days_apart
+            keep = (
+                (scores >= self.min_score)
+                & (np.minimum(similarity['home'], similarity['away']) >= self.min_team_score)
+                & (sources[rows][:, None] != sources[cols][None, :])
+                # Each pair once: earlier days, or the same day with a lower index
+                & ((days_apart > 0) | (positions[cols][None, :] < positions[rows][:, None]))
+            )
+            for r, c in zip(*np.nonzero(keep)):
+                i, j = int(rows[r]), int(cols[c])
+                if self._competitions_compatible(records[i], records[j]):
+                    pairs.append((float(scores[r, c]), j, i))
+        return pairs
+
+    @staticmethod
+    def _incidence(members: np.ndarray, gram_columns: List[np.ndarray], used: np.ndarray) -> np.ndarray:
+        member_columns = [gram_columns[i] for i in members]
+        matrix = np.zeros((len(members), len(used)), dtype=np.float32)
+        matrix[np.repeat(np.arange(len(members)), [len(c) for c in member_columns]),
+               np.searchsorted(used, np.concatenate(member_columns))] = 1.0
+        return matrix
+
+    def link(self, matches: List[Dict]) -> List[Dict]:
+        """Cluster fixtures that describe the same match.
+
+        Returns one entry per fixture cluster: 'sources' maps each source to
+        its fixture, 'score' is the weakest link that joined the cluster
+        (None for fixtures only one source reported), and 'home_id',
+        'away_id' and 'date' identify it. Fixtures without teams or a
+        parseable date are not returned.
+        """
+        start_time = time.perf_counter()
+        records = {}
+        for match in matches:
+            record = self._record(match)
+            if record is not None:
+                # A source repeating a fixture keeps its last copy
+                records[(record['source'], record['home_id'], record['away_id'], record['day'])] = record
+        records = list(records.values())
+
+        pairs = self._candidate_pairs(records)
+        pairs.sort(key=lambda pair: pair[0], reverse=True)
+
+        parent = list(range(len(records)))
+        cluster_sources = [{record['source']} for record in records]
+        cluster_score: List[Optional[float]] = [None] * len(records)
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        links = 0
+        for score, i, j in pairs:
+            root_i, root_j = find(i), find(j)
+            if root_i == root_j or cluster_sources[root_i] & cluster_sources[root_j]:
+                continue
+            parent[root_j] = root_i
+            cluster_sources[root_i] |= cluster_sources[root_j]
+            scores = [s for s in (cluster_score[root_i], cluster_score[root_j], score) if s is not None]
+            cluster_score[root_i] = min(scores)
+            links += 1
+
+        clusters: Dict[int, Dict] = {}
+        for i, record in enumerate(records):
+            root = find(i)
+            cluster = clusters.get(root)
+            if cluster is None:
+                cluster = clusters[root] = {
+                    'sources': {},
+                    'score': cluster_score[root],
+                    'home_id': records[root]['home_id'],
+                    'away_id': records[root]['away_id'],
+                    'date': date.fromordinal(records[root]['day']).isoformat(),
+                }
+            cluster['sources'][record['source']] = record['match']
+
+        self.last_stats = {
+            'fixtures': len(records),
+            'candidate_pairs': len(pairs),
+            'links': links,
+            'clusters': len(clusters),
+            'elapsed': time.perf_counter() - start_time,
+        }
+        logger.info(f"Linked {len(records)} fixtures into {len(clusters)} matches "
+                    f"({len(pairs)} candidate pairs, {self.last_stats['elapsed'] * 1000:.0f}ms)")
+        return list(clusters.values())
+
+    def best_match(self, home_team: str, away_team: str, candidates: List[Dict],
+                   source: Optional[str] = None) -> Optional[Tuple[Dict, float]]:
+        """Best-scoring candidate fixture (with home_team/away_team keys) for one match, if any"""
+        target = {
+            'source': source,
+            'day': 0,
+            **self._team_fields('home', home_team, source, record_unknown=False),
+            **self._team_fields('away', away_team, source, record_unknown=False),
+            'competition_grams': None,
+        }
+        best = None
+        for candidate in candidates:
+            record = {
+                **target,
+                # Candidates are only scored, so unknown names are not queued for curation
+                **self._team_fields('home', candidate['home_team'], candidate.get('source'), record_unknown=False),
+                **self._team_fields('away', candidate['away_team'], candidate.get('source'), record_unknown=False),
+            }
+            score = self.score_pair(target, record)['score']
+            if score >= self.min_score and (best is None or score > best[1]):
+                best = (candidate, score)
+        return best
+
+# Shared by the validator and the result checker
+fixture_linker = FixtureLinker()
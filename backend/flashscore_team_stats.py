@@ -1,6 +1,6 @@
-import requests
 from bs4 import BeautifulSoup
 import re
+from utils.http_client import http_client
 
 BASE_URL = 'https://www.flashscore.es'
 SEARCH_URL = BASE_URL + '/busqueda/?q={}'
@@ -15,7 +15,7 @@ headers = {
 def get_team_stats_flashscore(team_name):
     # Buscar el equipo
     search_url = SEARCH_URL.format(team_name.replace(' ', '+'))
-    resp = requests.get(search_url, headers=headers)
+    resp = http_client.get(search_url, headers=headers)
     resp.raise_for_status()
     soup = BeautifulSoup(resp.text, 'html.parser')
     # Buscar enlace a la página del equipo
@@ -29,7 +29,7 @@ def get_team_stats_flashscore(team_name):
         print(f"No se encontró página de equipo para {team_name}")
         return None
     # Scrapeo de la página del equipo
-    resp = requests.get(team_link, headers=headers)
+    resp = http_client.get(team_link, headers=headers)
     resp.raise_for_status()
     soup = BeautifulSoup(resp.text, 'html.parser')
     # Extraer últimos partidos (resultados)
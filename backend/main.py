@@ -6,8 +6,11 @@ from datetime import datetime, timedelta
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from loguru import logger
-from config.settings import LOGGING_CONFIG
+from config.settings import LOGGING_CONFIG, DAEMON_CONFIG
 from data_collector import DataCollector
+from collector_daemon import CollectorDaemon
+from utils.http_client import http_client
+from utils.json_cache import json_cache
 from ai_predictor import AIPredictor
 from payment_routes import payment_bp
 from payment_processor import payment_processor
@@ -30,6 +33,7 @@ app.register_blueprint(payment_bp)
 # Initialize components
 data_collector = DataCollector()
 ai_predictor = AIPredictor()
+collector_daemon = CollectorDaemon(data_collector) if DAEMON_CONFIG['enabled'] else None
 
 # Initialize payment tables
 payment_processor.create_payment_tables()
@@ -233,6 +237,11 @@ def get_status():
                 'odds': len(data.get('odds', {}))
             },
             'data_sources': source_status,
+            'circuit_breakers': data_collector.get_breaker_status(),
+            'http_pool': http_client.get_stats(),
+            'memory': data_collector.get_memory_usage(),
+            'json_cache': json_cache.get_stats(),
+            'collector_daemon': collector_daemon.get_status() if collector_daemon else None,
             'ai_model_status': {
                 'trained': ai_predictor.is_trained,
                 'models_available': list(ai_predictor.models.keys())
@@ -353,14 +362,20 @@ def train_models():
 if __name__ == '__main__':
     logger.info("Starting AI Football Predictions Backend")
     
-    # Initialize data collection
-    try:
-        logger.info("Initializing data collection...")
-        # Collect initial data
-        data_collector.collect_all_data(days_back=1, days_forward=7)
-        logger.info("Initial data collection completed")
-    except Exception as e:
-        logger.error(f"Error in initial data collection: {e}")
+    if collector_daemon:
+        # The daemon does the initial collection and keeps every source fresh. With debug on,
+        # the reloader runs this module twice; only its serving child starts the daemon
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            collector_daemon.start()
+    else:
+        # Initialize data collection
+        try:
+            logger.info("Initializing data collection...")
+            # Collect initial data
+            data_collector.collect_all_data(days_back=1, days_forward=7)
+            logger.info("Initial data collection completed")
+        except Exception as e:
+            logger.error(f"Error in initial data collection: {e}")
     
     # Start Flask app
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,178 @@
+import copy
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+from config.settings import COLLECTION_CONFIG
+from team_identity import team_index
+
+class BoundedDict(OrderedDict):
+    """Dict holding at most max_items entries; the least recently written go first"""
+
+    def __init__(self, max_items: int = sys.maxsize):
+        super().__init__()
+        self.max_items = max_items
+        self.evicted = 0
+
+    def __reduce__(self):
+        # Rebuilt with its cap, so copy, deepcopy and pickle keep it bounded
+        return (self.__class__, (self.max_items,), {'evicted': self.evicted}, None, iter(self.items()))
+
+    def copy(self) -> 'BoundedDict':
+        copied = self.__class__(self.max_items)
+        copied.update(self)
+        copied.evicted = self.evicted
+        return copied
+
+    def __setitem__(self, key, value):
+        if key in self:
+            self.move_to_end(key)
+        super().__setitem__(key, value)
+        while len(self) > self.max_items:
+            self.popitem(last=False)
+            self.evicted += 1
+
+def _deep_size(obj) -> int:
+    """Approximate memory held by a tree of dicts, lists and scalars"""
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+class MatchStore:
+    """In-memory dataset of a long-lived DataCollector.
+
+    Matches are upserted per source under a canonical id (canonical team ids
+    plus day), so a refresh replaces a fixture instead of appending a copy of
+    it. Matches that fall outside the collection window are evicted, and team
+    stats, H2H records and odds are dropped together with the last match
+    that refers to them. Every dict also has a hard size cap, so memory stays
+    flat however many runs the process goes through.
+    """
+
+    def __init__(self, config: Dict = COLLECTION_CONFIG):
+        self.max_matches = config['max_matches']
+        self._matches: Dict[str, Dict[str, Dict]] = {}  # source -> canonical id -> match
+        self.teams = BoundedDict(config['max_team_stats'])
+        self.h2h_records = BoundedDict(config['max_h2h_records'])
+        self.odds = BoundedDict(config['max_odds'])
+        self.statistics: Dict = {}
+        self.evicted = {'matches': 0, 'teams': 0, 'h2h_records': 0, 'odds': 0}
+        self.window: Optional[Tuple[str, str]] = None
+
+    @staticmethod
+    def match_key(match: Dict) -> Optional[str]:
+        """Canonical id of a match within its source, or None if it cannot be identified"""
+        source = match.get('source')
+        home_team, away_team = match.get('home_team'), match.get('away_team')
+        if home_team and away_team:
+            home_id = team_index.resolve(home_team, source)
+            away_id = team_index.resolve(away_team, source)
+            return f"{home_id}_{away_id}_{str(match.get('date', ''))[:10]}"
+        if match.get('id'):
+            return f"id:{match['id']}"
+        return None
+
+    def replace_source(self, source_name: str, matches: List[Dict], date_from: datetime, date_to: datetime):
+        """Swap a source's matches inside the refreshed window for the newly collected ones"""
+        day_from = date_from.strftime('%Y-%m-%d')
+        day_to = date_to.strftime('%Y-%m-%d')
+        stored = {
+            key: match for key, match in self._matches.get(source_name, {}).items()
+            if not day_from <= str(match.get('date', ''))[:10] <= day_to
+        }
+        for match in matches:
+            key = self.match_key(match)
+            if key is not None:
+                stored[key] = match
+        self._matches[source_name] = stored
+        self._enforce_cap()
+
+    def _enforce_cap(self):
+        """Drop the earliest matches once the store holds more than max_matches"""
+        excess = len(self) - self.max_matches
+        if excess <= 0:
+            return
+        by_date = sorted(
+            ((str(match.get('date', '')), source_name, key)
+             for source_name, matches in self._matches.items()
+             for key, match in matches.items())
+        )
+        for _, source_name, key in by_date[:excess]:
+            del self._matches[source_name][key]
+        self.evicted['matches'] += excess
+        logger.warning(f"Match store over {self.max_matches} matches, dropped the {excess} earliest")
+
+    def evict_outside(self, date_from: datetime, date_to: datetime) -> int:
+        """Evict matches outside the collection window and the data only they referred to"""
+        day_from = date_from.strftime('%Y-%m-%d')
+        day_to = date_to.strftime('%Y-%m-%d')
+        self.window = (day_from, day_to)
+        evicted = 0
+        for source_name, matches in self._matches.items():
+            kept = {
+                key: match for key, match in matches.items()
+                if day_from <= str(match.get('date', ''))[:10] <= day_to
+            }
+            evicted += len(matches) - len(kept)
+            self._matches[source_name] = kept
+        self.evicted['matches'] += evicted
+
+        match_ids, h2h_keys, team_names = set(), set(), set()
+        for match in self.matches():
+            match_ids.add(match.get('id', ''))
+            h2h_keys.add(f"{match.get('home_team', '')}_{match.get('away_team', '')}")
+            team_names.update((match.get('home_team', ''), match.get('away_team', '')))
+        for name, records, referenced in (('teams', self.teams, team_names),
+                                          ('h2h_records', self.h2h_records, h2h_keys),
+                                          ('odds', self.odds, match_ids)):
+            for key in [key for key in records if key not in referenced]:
+                del records[key]
+                self.evicted[name] += 1
+        if evicted:
+            logger.info(f"Evicted {evicted} matches outside {day_from}..{day_to}")
+        return evicted
+
+    def matches(self) -> List[Dict]:
+        return [match for matches in self._matches.values() for match in matches.values()]
+
+    def export(self) -> Dict:
+        """Copies of the stored records, safe to hand out while later refreshes change the store"""
+        return copy.deepcopy({
+            'matches': self.matches(),
+            'teams': dict(self.teams),
+            'h2h_records': dict(self.h2h_records),
+            'odds': dict(self.odds),
+            'statistics': self.statistics,
+        })
+
+    def __len__(self) -> int:
+        return sum(len(matches) for matches in self._matches.values())
+
+    def memory_usage(self) -> Dict:
+        """Entry counts, evictions and approximate size of the store"""
+        return {
+            'matches': len(self),
+            'matches_by_source': {source_name: len(matches) for source_name, matches in self._matches.items()},
+            'teams': len(self.teams),
+            'h2h_records': len(self.h2h_records),
+            'odds': len(self.odds),
+            'evicted': {
+                name: count + (getattr(self, name).evicted if name != 'matches' else 0)
+                for name, count in self.evicted.items()
+            },
+            'window': list(self.window) if self.window else None,
+            'approx_bytes': _deep_size([self._matches, self.teams, self.h2h_records, self.odds, self.statistics]),
+        }
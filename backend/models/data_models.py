@@ -197,3 +197,10 @@ class DataSource:
     error_count: int
     success_rate: float
     response_time_avg: float
+    throttled_time: float = 0.0  # seconds spent waiting on rate limits
+    parse_time_avg: float = 0.0  # seconds per HTML page
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_revalidations: int = 0  # 304 Not Modified answers
+    circuit_state: str = 'closed'  # closed, open, half_open
+    retries: int = 0  # retried fetches (see RetryPolicy)
@@ -1,6 +1,6 @@
-import requests
 import json
 import os
+from utils.http_client import http_client
 
 # Rutas de salida
 OUTPUT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'odds_realtime.json')
@@ -21,7 +21,7 @@ def get_the_odds_api():
         'dateFormat': 'iso'
     }
     try:
-        resp = requests.get(url, params=params)
+        resp = http_client.get(url, params=params)
         resp.raise_for_status()
         return {'source': 'the-odds-api', 'data': resp.json()}
     except Exception as e:
@@ -32,7 +32,7 @@ def get_betsapi():
     url = f'https://betsapi.com/api/v1/bet365/inplay'
     params = {'token': BETSAPI_KEY}
     try:
-        resp = requests.get(url, params=params)
+        resp = http_client.get(url, params=params)
         resp.raise_for_status()
         return {'source': 'betsapi', 'data': resp.json()}
     except Exception as e:
@@ -1,86 +1,203 @@
 import os
 import sys
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session as OrmSession
 from config.database import DATABASE_URL
 from models.data_models import Base, TransfermarktTeam, TransfermarktPlayer, TransfermarktTransfer
 from scrapers.transfermarkt_scraper import TransfermarktScraper
 from loguru import logger
 
-SEASON = '2024'
-LEAGUE_ID = 'ES1'
-LEAGUE_NAME = 'LaLiga'
+SEASONS = ['2024']
+LEAGUE_IDS = ['ES1']
+LEAGUE_NAMES = {
+    'ES1': 'LaLiga',
+    'GB1': 'Premier League',
+    'IT1': 'Serie A',
+    'L1': 'Bundesliga',
+    'FR1': 'Ligue 1',
+}
+
+PLAYER_FIELDS = ('position', 'age', 'nationality', 'market_value')
+TRANSFER_FIELDS = ('fee', 'transfer_type')
+
+class TransfermarktSync:
+    """Sincronización masiva de equipos, jugadores y traspasos.
+
+    Las claves existentes de las ligas/temporadas se cargan con una consulta
+    por tabla, los datos scrapeados se comparan en memoria y las altas y
+    modificaciones se aplican con sentencias bulk en una sola transacción.
+    """
+
+    def __init__(self, session: OrmSession, league_names: Iterable[str], seasons: Iterable[str]):
+        self.session = session
+        self.league_names = list(league_names)
+        self.seasons = list(seasons)
+        self.counts = {table: {'inserted': 0, 'updated': 0, 'unchanged': 0}
+                       for table in ('teams', 'players', 'transfers')}
+        self.teams: Dict[Tuple[str, str, str], Dict] = {}
+        self.players: Dict[Tuple[int, str], Dict] = {}
+        self.transfers: Dict[Tuple, Dict] = {}
+        # Cambios pendientes
+        self.new_teams: Dict[Tuple[str, str, str], Dict] = {}
+        self.new_players: Dict[Tuple[str, str, str], Dict[str, Dict]] = defaultdict(dict)
+        self.team_updates: List[Dict] = []
+        self.player_updates: List[Dict] = []
+        self.new_transfers: Dict[Tuple, Dict] = {}
+        self.transfer_updates: List[Dict] = []
+
+    def load_existing(self):
+        """Una consulta por tabla para todas las ligas y temporadas del lote"""
+        teams = self.session.query(
+            TransfermarktTeam.id, TransfermarktTeam.name, TransfermarktTeam.league,
+            TransfermarktTeam.season, TransfermarktTeam.market_value
+        ).filter(
+            TransfermarktTeam.league.in_(self.league_names),
+            TransfermarktTeam.season.in_(self.seasons)
+        )
+        for team in teams:
+            self.teams[(team.name, team.league, team.season)] = {'id': team.id, 'market_value': team.market_value}
+
+        team_ids = [team['id'] for team in self.teams.values()]
+        if team_ids:
+            players = self.session.query(
+                TransfermarktPlayer.id, TransfermarktPlayer.name, TransfermarktPlayer.team_id,
+                *(getattr(TransfermarktPlayer, field) for field in PLAYER_FIELDS)
+            ).filter(TransfermarktPlayer.team_id.in_(team_ids))
+            for player in players:
+                self.players[(player.team_id, player.name)] = dict(player._mapping)
+
+        transfers = self.session.query(
+            TransfermarktTransfer.id, TransfermarktTransfer.player_name, TransfermarktTransfer.from_team,
+            TransfermarktTransfer.to_team, TransfermarktTransfer.season, TransfermarktTransfer.league,
+            *(getattr(TransfermarktTransfer, field) for field in TRANSFER_FIELDS)
+        ).filter(
+            TransfermarktTransfer.league.in_(self.league_names),
+            TransfermarktTransfer.season.in_(self.seasons)
+        )
+        for transfer in transfers:
+            key = (transfer.player_name, transfer.from_team, transfer.to_team, transfer.season, transfer.league)
+            self.transfers[key] = dict(transfer._mapping)
+        logger.info(f"Claves existentes: {len(self.teams)} equipos, {len(self.players)} jugadores, "
+                    f"{len(self.transfers)} traspasos")
+
+    def add_squad(self, league_name: str, season: str, team: Dict):
+        """Compara una plantilla scrapeada con lo guardado y anota los cambios"""
+        team_key = (team['team'], league_name, season)
+        existing_team = self.teams.get(team_key)
+        if existing_team is None:
+            self.new_teams[team_key] = {'name': team['team'], 'league': league_name, 'season': season,
+                                        'market_value': team['team_value']}
+            self.counts['teams']['inserted'] += 1
+        elif existing_team['market_value'] != team['team_value']:
+            self.team_updates.append({'id': existing_team['id'], 'market_value': team['team_value'],
+                                      'last_updated': datetime.utcnow()})
+            self.counts['teams']['updated'] += 1
+        else:
+            self.counts['teams']['unchanged'] += 1
+
+        # Un jugador repetido en la página cuenta una sola vez (gana el último)
+        scraped = {player['name']: player for player in team['players']}
+        for name, player in scraped.items():
+            values = {
+                'position': player['position'],
+                'age': int(player['age']) if player['age'].isdigit() else None,
+                'nationality': player['nationality'],
+                'market_value': player['market_value'],
+            }
+            existing_player = self.players.get((existing_team['id'], name)) if existing_team else None
+            if existing_player is None:
+                self.new_players[team_key][name] = {'name': name, **values}
+                self.counts['players']['inserted'] += 1
+            elif any(existing_player[field] != values[field] for field in PLAYER_FIELDS):
+                self.player_updates.append({'id': existing_player['id'], **values, 'last_updated': datetime.utcnow()})
+                self.counts['players']['updated'] += 1
+            else:
+                self.counts['players']['unchanged'] += 1
+
+    def add_transfers(self, league_name: str, season: str, transfers: List[Dict]):
+        for t in transfers:
+            key = (t['player'], t['from_team'], t['to_team'], season, league_name)
+            values = {'fee': t['fee'], 'transfer_type': t['type']}
+            existing = self.transfers.get(key)
+            if existing is None:
+                if key not in self.new_transfers:
+                    self.counts['transfers']['inserted'] += 1
+                self.new_transfers[key] = {'player_name': t['player'], 'from_team': t['from_team'],
+                                           'to_team': t['to_team'], 'season': season, 'league': league_name,
+                                           **values}
+            elif any(existing[field] != values[field] for field in TRANSFER_FIELDS):
+                self.transfer_updates.append({'id': existing['id'], **values, 'last_updated': datetime.utcnow()})
+                self.counts['transfers']['updated'] += 1
+            else:
+                self.counts['transfers']['unchanged'] += 1
+
+    def apply(self):
+        """Aplica todas las altas y modificaciones en una transacción"""
+        try:
+            new_teams = list(self.new_teams.items())
+            # return_defaults para conocer los ids de los equipos nuevos antes de insertar sus jugadores
+            self.session.bulk_insert_mappings(TransfermarktTeam, [row for _, row in new_teams], return_defaults=True)
+            team_ids = {key: team['id'] for key, team in self.teams.items()}
+            team_ids.update({key: row['id'] for key, row in new_teams})
+
+            self.session.bulk_insert_mappings(TransfermarktPlayer, [
+                {**player, 'team_id': team_ids[team_key]}
+                for team_key, players in self.new_players.items()
+                for player in players.values()
+            ])
+            self.session.bulk_update_mappings(TransfermarktTeam, self.team_updates)
+            self.session.bulk_update_mappings(TransfermarktPlayer, self.player_updates)
+            self.session.bulk_insert_mappings(TransfermarktTransfer, list(self.new_transfers.values()))
+            self.session.bulk_update_mappings(TransfermarktTransfer, self.transfer_updates)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def format_report(self) -> str:
+        return "\n".join(
+            f"{table}: {counts['inserted']} nuevos, {counts['updated']} actualizados, {counts['unchanged']} sin cambios"
+            for table, counts in self.counts.items()
+        )
 
 def main():
+    parser = argparse.ArgumentParser(description='Poblar equipos, jugadores y traspasos de Transfermarkt')
+    parser.add_argument('--league', action='append', dest='leagues', help='id de liga en Transfermarkt (repetible, p.ej. ES1)')
+    parser.add_argument('--season', action='append', dest='seasons', help='temporada (repetible, p.ej. 2024)')
+    args = parser.parse_args()
+    league_ids = args.leagues or LEAGUE_IDS
+    seasons = args.seasons or SEASONS
+
     engine = create_engine(DATABASE_URL)
     Session = sessionmaker(bind=engine)
     session = Session()
     # Crear tablas si no existen
     Base.metadata.create_all(engine)
     scraper = TransfermarktScraper()
+    sync = TransfermarktSync(session, [LEAGUE_NAMES.get(league_id, league_id) for league_id in league_ids], seasons)
+    sync.load_existing()
 
-    # Poblar equipos y jugadores
+    # Equipos y jugadores: cada plantilla se compara en cuanto llega
     logger.info('Scrapeando valores de mercado y plantillas...')
-    teams_data = scraper.scrape_market_values(league_id=LEAGUE_ID, season=SEASON)
-    for team in teams_data:
-        team_obj = session.query(TransfermarktTeam).filter_by(name=team['team'], league=LEAGUE_NAME, season=SEASON).first()
-        if not team_obj:
-            team_obj = TransfermarktTeam(name=team['team'], league=LEAGUE_NAME, season=SEASON, market_value=team['team_value'])
-            session.add(team_obj)
-            session.flush()  # Para obtener el id
-        else:
-            team_obj.market_value = team['team_value']
-            team_obj.last_updated = team_obj.last_updated
-        for player in team['players']:
-            player_obj = session.query(TransfermarktPlayer).filter_by(name=player['name'], team_id=team_obj.id).first()
-            if not player_obj:
-                player_obj = TransfermarktPlayer(
-                    name=player['name'],
-                    position=player['position'],
-                    age=int(player['age']) if player['age'].isdigit() else None,
-                    nationality=player['nationality'],
-                    market_value=player['market_value'],
-                    team_id=team_obj.id
-                )
-                session.add(player_obj)
-            else:
-                player_obj.position = player['position']
-                player_obj.age = int(player['age']) if player['age'].isdigit() else None
-                player_obj.nationality = player['nationality']
-                player_obj.market_value = player['market_value']
-                player_obj.last_updated = player_obj.last_updated
-    session.commit()
-    logger.info('Equipos y jugadores actualizados.')
-
-    # Poblar traspasos
+    for team in scraper.iter_squads(league_ids, seasons):
+        league_name = LEAGUE_NAMES.get(team['league_id'], team['league_id'])
+        sync.add_squad(league_name, team['season'], team)
+        logger.info(f"{team['team']} ({league_name} {team['season']}): {len(team['players'])} jugadores")
+
+    # Traspasos
     logger.info('Scrapeando traspasos recientes...')
-    transfers = scraper.scrape_transfers(league_id=LEAGUE_ID, season=SEASON, limit=50)
-    for t in transfers:
-        transfer_obj = session.query(TransfermarktTransfer).filter_by(
-            player_name=t['player'],
-            from_team=t['from_team'],
-            to_team=t['to_team'],
-            season=SEASON,
-            league=LEAGUE_NAME
-        ).first()
-        if not transfer_obj:
-            transfer_obj = TransfermarktTransfer(
-                player_name=t['player'],
-                from_team=t['from_team'],
-                to_team=t['to_team'],
-                fee=t['fee'],
-                transfer_type=t['type'],
-                season=SEASON,
-                league=LEAGUE_NAME
-            )
-            session.add(transfer_obj)
-        else:
-            transfer_obj.fee = t['fee']
-            transfer_obj.transfer_type = t['type']
-            transfer_obj.last_updated = transfer_obj.last_updated
-    session.commit()
-    logger.info('Traspasos actualizados.')
+    for league_id in league_ids:
+        league_name = LEAGUE_NAMES.get(league_id, league_id)
+        for season in seasons:
+            sync.add_transfers(league_name, season, scraper.scrape_transfers(league_id=league_id, season=season, limit=50))
+
+    sync.apply()
+    logger.info('Equipos, jugadores y traspasos actualizados:\n' + sync.format_report())
     session.close()
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Reparse Script
+Reruns the current scraper parsers over the raw page archive, so fixed
+selectors can rebuild historical data without re-fetching anything.
+
+    python reparse.py                          # every archived page, all CPU cores
+    python reparse.py --source flashscore --since 2024-08-01 --workers 4
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Tuple
+from loguru import logger
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import PROCESSED_DATA_DIR
+from scrapers.page_archive import page_archive
+from scrapers.flashscore_scraper import FlashScoreScraper
+from scrapers.sofascore_scraper import SofaScoreScraper
+from scrapers.betsapi_scraper import BetsAPIScraper
+from scrapers.laliga_scraper import LaLigaScraper
+from scrapers.promiedos_scraper import PromiedosScraper
+
+# Scrapers with archive parsers, by source_key
+SCRAPER_CLASSES = {
+    scraper_class.source_key: scraper_class
+    for scraper_class in (FlashScoreScraper, SofaScoreScraper, BetsAPIScraper, LaLigaScraper, PromiedosScraper)
+}
+
+# One scraper instance per worker process
+_worker_scrapers = {}
+
+def _reparse_page(page: Dict) -> Tuple[Dict, List[Dict]]:
+    """Run the current parser for one archived page (executed in a worker process)"""
+    scraper = _worker_scrapers.get(page['source'])
+    if scraper is None:
+        scraper = _worker_scrapers[page['source']] = SCRAPER_CLASSES[page['source']]()
+    parser = getattr(scraper, scraper.archive_parsers[page['page_type']])
+    try:
+        records = parser(page_archive.load(page['sha256'], page['codec']))
+    except Exception as e:
+        logger.error(f"Error reparsing {page['url']}: {e}")
+        return page, []
+    archived_at = datetime.fromtimestamp(page['fetched_at']).isoformat()
+    for record in records:
+        record.setdefault('source', page['source'])
+        record['archived_at'] = archived_at
+    return page, records
+
+def _parse_day(value: str) -> float:
+    return datetime.strptime(value, '%Y-%m-%d').timestamp()
+
+def main():
+    """Reparse archived pages in parallel and write the rebuilt matches"""
+    parser = argparse.ArgumentParser(description='Rebuild scraped data from the raw page archive')
+    parser.add_argument('--source', choices=sorted(SCRAPER_CLASSES), help='only reparse this source')
+    parser.add_argument('--since', type=_parse_day, help='first fetch day to include (YYYY-MM-DD)')
+    parser.add_argument('--until', type=_parse_day, help='fetch day to stop at, exclusive (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes (default: all cores)')
+    parser.add_argument('--output', help='output file (default: data/processed/reparsed_<timestamp>.json)')
+    args = parser.parse_args()
+
+    pages = [
+        page for page in page_archive.iter_pages(source=args.source, since=args.since, until=args.until)
+        if page['source'] in SCRAPER_CLASSES
+        and page['page_type'] in SCRAPER_CLASSES[page['source']].archive_parsers
+    ]
+    if not pages:
+        logger.warning("No archived pages with a parser matched")
+        return 1
+    logger.info(f"Reparsing {len(pages)} archived pages with {args.workers} workers")
+
+    start_time = time.perf_counter()
+    matches = {}
+    unkeyed = []
+    pages_with_records = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        chunksize = max(1, len(pages) // (args.workers * 4))
+        # Results come back in fetch order, so later fetches of a match win
+        for page, records in executor.map(_reparse_page, pages, chunksize=chunksize):
+            if records:
+                pages_with_records += 1
+            for record in records:
+                if record.get('id'):
+                    matches[record['id']] = record
+                else:
+                    unkeyed.append(record)
+    elapsed = time.perf_counter() - start_time
+
+    output_file = args.output or os.path.join(
+        PROCESSED_DATA_DIR, f"reparsed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'matches': list(matches.values()) + unkeyed,
+            'pages_reparsed': len(pages),
+            'last_updated': datetime.now().isoformat()
+        }, f, indent=2, ensure_ascii=False, default=str)
+
+    print("\n" + "="*50)
+    print("REPARSE SUMMARY")
+    print("="*50)
+    print(f"Pages: {len(pages)} ({pages_with_records} with records)")
+    print(f"Matches: {len(matches) + len(unkeyed)}")
+    print(f"Time: {elapsed:.2f}s")
+    print(f"Output: {output_file}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
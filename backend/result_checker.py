@@ -5,12 +5,13 @@ Automatically checks match results and updates prediction status
 """
 
 import os
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from loguru import logger
 from sqlalchemy import create_engine, text
 from config.database import DATABASE_URL
+from utils.http_client import http_client
+from fixture_linker import fixture_linker
 
 class ResultChecker:
     """Check match results and update prediction status"""
@@ -71,37 +72,44 @@ class ResultChecker:
                 'season': '2024'
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = http_client.get(url, headers=headers, params=params)
             
             if response.status_code == 200:
                 data = response.json()
                 fixtures = data.get('response', [])
                 
-                # Find the specific match
-                for fixture in fixtures:
-                    fixture_data = fixture['fixture']
-                    teams = fixture['teams']
-                    goals = fixture['goals']
+                # Find the specific match: best team-name similarity among the day's fixtures
+                candidates = [
+                    {
+                        'home_team': fixture['teams']['home']['name'],
+                        'away_team': fixture['teams']['away']['name'],
+                        'source': 'api_football',
+                        'fixture': fixture
+                    }
+                    for fixture in fixtures
+                ]
+                linked = fixture_linker.best_match(home_team, away_team, candidates)
+                
+                if linked:
+                    candidate, link_score = linked
+                    fixture_data = candidate['fixture']['fixture']
+                    goals = candidate['fixture']['goals']
                     
-                    # Check if this is our match
-                    if (teams['home']['name'].lower() in home_team.lower() or 
-                        home_team.lower() in teams['home']['name'].lower()) and \
-                       (teams['away']['name'].lower() in away_team.lower() or 
-                        away_team.lower() in teams['away']['name'].lower()):
-                        
-                        # Check if match is finished
-                        if fixture_data['status']['short'] == 'FT':
-                            return {
-                                'home_score': goals['home'],
-                                'away_score': goals['away'],
-                                'status': 'finished',
-                                'fixture_id': fixture_data['id']
-                            }
-                        elif fixture_data['status']['short'] in ['PST', 'CANC']:
-                            return {
-                                'status': 'postponed',
-                                'fixture_id': fixture_data['id']
-                            }
+                    # Check if match is finished
+                    if fixture_data['status']['short'] == 'FT':
+                        return {
+                            'home_score': goals['home'],
+                            'away_score': goals['away'],
+                            'status': 'finished',
+                            'fixture_id': fixture_data['id'],
+                            'link_score': link_score
+                        }
+                    elif fixture_data['status']['short'] in ['PST', 'CANC']:
+                        return {
+                            'status': 'postponed',
+                            'fixture_id': fixture_data['id'],
+                            'link_score': link_score
+                        }
             
             return None
             
@@ -57,6 +57,7 @@ def main():
             print(f"  Success Rate: {source_status.success_rate:.1%}")
             print(f"  Error Count: {source_status.error_count}")
             print(f"  Avg Response Time: {source_status.response_time_avg:.2f}s")
+            print(f"  Avg Parse Time: {source_status.parse_time_avg * 1000:.1f}ms")
             print()
         
         # Show sample matches
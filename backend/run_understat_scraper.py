@@ -1,12 +1,18 @@
 import os
 import json
+import argparse
 import logging
+import time
 from datetime import datetime
 
 from scrapers.understat_scraper import UnderstatScraper
+from utils.columnar_store import xg_store
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data', 'understat')
 
+LEAGUES = ["La_liga"]
+SEASONS = ["2023"]
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
 def ensure_data_dir():
@@ -21,27 +27,28 @@ def save_json(data, filename):
     logging.info(f"Datos guardados en {path}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Descarga tablas de xG de Understat')
+    parser.add_argument('--league', action='append', help='liga de Understat (repetible, por defecto La_liga)')
+    parser.add_argument('--season', action='append', help='temporada, p. ej. 2023 (repetible)')
+    parser.add_argument('--json', action='store_true', help='guardar también una copia en JSON')
+    args = parser.parse_args()
+    leagues = args.league or LEAGUES
+    seasons = args.season or SEASONS
+
     ensure_data_dir()
     scraper = UnderstatScraper()
-    league = "La_liga"
-    season = "2023"
-    logging.info(f"Iniciando scraping de Understat (equipos) para {league} {season}...")
-    teams_data = scraper.scrape_team_stats(league=league, season=season)
-    save_json(teams_data, f"teams_{league}_{season}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-
-    # Obtener partidos de los equipos (solo IDs únicos)
-    match_ids = set()
-    for team in teams_data:
-        # Suponemos que hay un campo 'id' o similar, pero Understat no da todos los match_ids directamente
-        # Aquí solo como ejemplo, normalmente necesitaríamos scrapear el calendario o lista de partidos
-        pass  # TODO: scrapear lista de partidos por equipo/temporada si se implementa
-    # Para demo, no scrapear partidos si no hay match_ids
-    matches_data = []
-    # for match_id in match_ids:
-    #     match_stats = scraper.scrape_match_stats(match_id)
-    #     matches_data.append(match_stats)
-    save_json(matches_data, f"matches_{league}_{season}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    logging.info(f"Iniciando scraping de Understat para {', '.join(leagues)} / {', '.join(seasons)}...")
+    start_time = time.perf_counter()
+    # Las tablas de equipos y partidos se guardan en el almacén columnar (una partición por liga/temporada)
+    tables = scraper.scrape_bulk(leagues, seasons, store=xg_store)
+    logging.info(f"{len(tables['teams'])} equipos y {len(tables['matches'])} partidos en "
+                 f"{time.perf_counter() - start_time:.1f}s")
+
+    if args.json:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        save_json(tables['teams'], f"teams_{timestamp}.json")
+        save_json(tables['matches'], f"matches_{timestamp}.json")
     logging.info("Scraping de Understat finalizado correctamente.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,13 +1,31 @@
-import requests
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import time
 import random
 from abc import ABC, abstractmethod
+from bs4 import BeautifulSoup, SoupStrainer
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential
-from config.settings import SCRAPING_CONFIG, RATE_LIMITS
+from config.settings import SCRAPING_CONFIG, DATA_SOURCES, CACHE_CONFIG, COLLECTION_CONFIG
 from models.data_models import DataSource
+from .rate_limiter import rate_limiter
+from .http_cache import http_cache
+from .cassette import cassette
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .retry_policy import RetryPolicy
+from .single_flight import run_single_flight, run_single_flight_async
+from .page_archive import page_archive
+from utils.http_client import http_client
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
@@ -29,75 +47,254 @@ EXTRA_HEADERS = {
     'Upgrade-Insecure-Requests': '1',
 }
 
+# Worker threads for the blocking scrape_* implementations, sized so every source
+# can run its competitions and its configured team/H2H/odds fan-out at once
+SCRAPER_EXECUTOR = ThreadPoolExecutor(
+    max_workers=sum(
+        3 + config.get('max_concurrency', COLLECTION_CONFIG['default_concurrency'])
+        for config in DATA_SOURCES.values()
+    ),
+    thread_name_prefix='scraper'
+)
+
 class BaseScraper(ABC):
     """Base class for all web scrapers"""
     
+    # Key of this scraper in DATA_SOURCES (used for per-source settings)
+    source_key: Optional[str] = None
+    # page_type -> name of a method that parses an archived body of that type (see reparse.py)
+    archive_parsers: Dict[str, str] = {}
+    
     def __init__(self, name: str, base_url: str):
         self.name = name
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update(SCRAPING_CONFIG['headers'])
-        self.session.headers['User-Agent'] = SCRAPING_CONFIG['user_agent']
-        self.last_request_time = 0
+        self.throttled_time = 0.0
         self.request_count = 0
         self.error_count = 0
         self.success_count = 0
         self.response_times = []
+        self.parse_times = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_revalidations = 0
+        self.circuit_breaker = CircuitBreaker(name)
+        self.retry_policy = RetryPolicy(name)
         
-    def _rate_limit(self):
-        """Implement rate limiting to avoid being blocked"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+    def _rate_limit(self, url: str):
+        """Wait until the shared per-host budget allows a request to `url`"""
+        self.throttled_time += rate_limiter.acquire(url)
+    
+    async def _rate_limit_async(self, url: str):
+        """Async rate limiting: waits for a slot without blocking the event loop"""
+        self.throttled_time += await rate_limiter.acquire_async(url)
+    
+    def _request_headers(self) -> Dict[str, str]:
+        """Build request headers with a rotated User-Agent"""
+        # Rotar User-Agent y añadir headers realistas
+        headers = SCRAPING_CONFIG['headers'].copy()
+        headers['User-Agent'] = random.choice(USER_AGENTS)
+        headers.update(EXTRA_HEADERS)
+        return headers
+    
+    def _check_circuit(self, url: str) -> bool:
+        """Fail fast while this source's circuit breaker is open; True if this request is the probe"""
+        probe = self.circuit_breaker.acquire()
+        if probe is None:
+            raise CircuitOpenError(f"{self.name}: circuit open, skipping {url}")
+        return probe
+    
+    def _cache_ttl(self) -> float:
+        """Seconds a cached response stays fresh for this source"""
+        return DATA_SOURCES.get(self.source_key, {}).get('update_frequency', CACHE_CONFIG['ttl'])
+    
+    def _cache_lookup(self, url: str, params: Optional[Dict]):
+        """Return (cache key, cached entry); both None when the cache is disabled"""
+        if not CACHE_CONFIG['enabled']:
+            return None, None
+        cache_key = http_cache.make_key(url, params)
+        return cache_key, http_cache.get(cache_key)
+    
+    def _cache_store(self, cache_key: Optional[str], url: str, response):
+        """Store a freshly fetched response"""
+        if cache_key is None:
+            return
+        self.cache_misses += 1
+        http_cache.put(cache_key, str(response.url), response.status_code, response.headers, response.content)
+    
+    def _cache_revalidated(self, cache_key: str, url: str):
+        """The server answered 304 Not Modified: the cached entry is fresh again"""
+        self.cache_revalidations += 1
+        http_cache.touch(cache_key)
+        logger.info(f"{self.name}: Not modified, serving cached {url}")
+    
+    def _record_success(self, url: str, response_time: float):
+        """Track a successful request"""
+        self.response_times.append(response_time)
         
-        # Ensure minimum delay between requests
-        min_delay = SCRAPING_CONFIG['request_delay']
-        if time_since_last < min_delay:
-            sleep_time = min_delay - time_since_last
-            time.sleep(sleep_time)
+        # Keep only last 100 response times
+        if len(self.response_times) > 100:
+            self.response_times = self.response_times[-100:]
         
-        # Add some randomness to avoid detection
-        random_delay = random.uniform(0.5, 2.0)
-        time.sleep(random_delay)
+        self.success_count += 1
+        self.request_count += 1
+        self.circuit_breaker.record_success()
         
-        self.last_request_time = time.time()
+        logger.info(f"{self.name}: Successful request to {url} in {response_time:.2f}s")
+    
+    def _record_failure(self, url: str, error: Exception):
+        """Track a failed attempt; the circuit breaker sees the request's final outcome in _fetch"""
+        self.error_count += 1
+        self.request_count += 1
+        logger.error(f"{self.name}: Request failed for {url}: {str(error)}")
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def _make_request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
-        """Make HTTP request with retry logic and anti-blocking headers"""
-        self._rate_limit()
-        start_time = time.time()
+    def _make_request(self, url: str, params: Optional[Dict] = None, page_type: Optional[str] = None) -> httpx.Response:
+        """Make HTTP request, served from or captured to a cassette in replay/record mode.
+        
+        Identical requests within one collection run share a single fetch.
+        Bodies are kept in the page archive, tagged with page_type so reparse.py
+        can find the parser for them in archive_parsers.
+        """
+        if cassette.replaying:
+            return cassette.replay(self.source_key, url, params).to_httpx_response()
+        return run_single_flight('requests', ('GET', http_cache.make_key(url, params)),
+                                 self._fetch_and_record, url, params, page_type)
+    
+    def _fetch_and_record(self, url: str, params: Optional[Dict] = None, page_type: Optional[str] = None) -> httpx.Response:
+        response = self._fetch(url, params)
+        if cassette.recording:
+            cassette.record(self.source_key, url, params, response.status_code, response.headers, response.content)
+        # Cache hits and 304s were archived when they were first fetched
+        if not response.extensions.get('from_cache'):
+            page_archive.store(self.source_key, url, params, response.status_code, response.content, page_type)
+        return response
+    
+    def _fetch(self, url: str, params: Optional[Dict] = None) -> httpx.Response:
+        """Fetch with the source's retry policy"""
+        try:
+            return self.retry_policy.call(url, self._fetch_once, url, params)
+        except httpx.HTTPError as e:
+            # Once per request rather than per attempt, and only for host failures
+            self.circuit_breaker.record_failure(e)
+            raise
+    
+    def _fetch_once(self, url: str, params: Optional[Dict] = None) -> httpx.Response:
+        """Fetch over the network with anti-blocking headers and conditional-GET caching"""
+        cache_key, cached = self._cache_lookup(url, params)
+        if cached and cached.is_fresh(self._cache_ttl()):
+            self.cache_hits += 1
+            return cached.to_httpx_response()
+        
+        probe = self._check_circuit(url)
         try:
-            # Rotar User-Agent y añadir headers realistas
-            headers = SCRAPING_CONFIG['headers'].copy()
-            headers['User-Agent'] = random.choice(USER_AGENTS)
-            headers.update(EXTRA_HEADERS)
-            response = self.session.get(
+            headers = self._request_headers()
+            if cached:
+                headers.update(cached.conditional_headers())
+            
+            self._rate_limit(url)
+            start_time = time.time()
+            response = http_client.get(
                 url,
                 params=params,
                 timeout=SCRAPING_CONFIG['timeout'],
                 headers=headers
             )
-            response.raise_for_status()
+            if cached and response.status_code == 304:
+                self._record_success(url, time.time() - start_time)
+                self._cache_revalidated(cache_key, url)
+                return cached.to_httpx_response()
             
-            # Track response time
-            response_time = time.time() - start_time
-            self.response_times.append(response_time)
+            response.raise_for_status()
+            self._record_success(url, time.time() - start_time)
+            self._cache_store(cache_key, url, response)
+            return response
             
-            # Keep only last 100 response times
-            if len(self.response_times) > 100:
-                self.response_times = self.response_times[-100:]
+        except httpx.HTTPError as e:
+            self._record_failure(url, e)
+            raise
+        finally:
+            # No-op once a success closed the circuit; otherwise the next attempt may probe
+            # (failures are recorded once per request, in _fetch)
+            if probe:
+                self.circuit_breaker.release_probe()
+    
+    async def _make_request_async(self, url: str, params: Optional[Dict] = None,
+                                  page_type: Optional[str] = None) -> httpx.Response:
+        """Async variant of _make_request; shares the same per-host politeness limits, cache, cassettes and archive"""
+        if cassette.replaying:
+            return cassette.replay(self.source_key, url, params).to_httpx_response()
+        return await run_single_flight_async('requests', ('GET', http_cache.make_key(url, params)),
+                                             self._fetch_and_record_async, url, params, page_type)
+    
+    async def _fetch_and_record_async(self, url: str, params: Optional[Dict] = None,
+                                      page_type: Optional[str] = None) -> httpx.Response:
+        response = await self._fetch_async(url, params)
+        if cassette.recording:
+            cassette.record(self.source_key, url, params, response.status_code, response.headers, response.content)
+        # Cache hits and 304s were archived when they were first fetched; compressing
+        # and indexing a new page happens off the event loop
+        if not response.extensions.get('from_cache'):
+            await asyncio.to_thread(page_archive.store, self.source_key, url, params,
+                                    response.status_code, response.content, page_type)
+        return response
+    
+    async def _fetch_async(self, url: str, params: Optional[Dict] = None) -> httpx.Response:
+        """Async fetch with the source's retry policy; back-offs do not block the event loop"""
+        try:
+            return await self.retry_policy.call_async(url, self._fetch_once_async, url, params)
+        except httpx.HTTPError as e:
+            self.circuit_breaker.record_failure(e)
+            raise
+    
+    async def _fetch_once_async(self, url: str, params: Optional[Dict] = None) -> httpx.Response:
+        """Async network fetch with conditional-GET caching"""
+        cache_key, cached = self._cache_lookup(url, params)
+        if cached and cached.is_fresh(self._cache_ttl()):
+            self.cache_hits += 1
+            return cached.to_httpx_response()
+        
+        probe = self._check_circuit(url)
+        try:
+            headers = self._request_headers()
+            if cached:
+                headers.update(cached.conditional_headers())
             
-            self.success_count += 1
-            self.request_count += 1
+            await self._rate_limit_async(url)
+            start_time = time.time()
+            response = await http_client.get_async(
+                url,
+                params=params,
+                timeout=SCRAPING_CONFIG['timeout'],
+                headers=headers
+            )
+            if cached and response.status_code == 304:
+                self._record_success(url, time.time() - start_time)
+                self._cache_revalidated(cache_key, url)
+                return cached.to_httpx_response()
             
-            logger.info(f"{self.name}: Successful request to {url} in {response_time:.2f}s")
+            response.raise_for_status()
+            self._record_success(url, time.time() - start_time)
+            self._cache_store(cache_key, url, response)
             return response
             
-        except requests.exceptions.RequestException as e:
-            self.error_count += 1
-            self.request_count += 1
-            logger.error(f"{self.name}: Request failed for {url}: {str(e)}")
+        except httpx.HTTPError as e:
+            self._record_failure(url, e)
             raise
+        finally:
+            # No-op once a success closed the circuit; otherwise the next attempt may probe
+            # (failures are recorded once per request, in _fetch)
+            if probe:
+                self.circuit_breaker.release_probe()
+    
+    def _parse_html(self, content, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Parse a page with lxml when available, building only the subtrees matched by parse_only"""
+        start_time = time.perf_counter()
+        soup = BeautifulSoup(content, HTML_PARSER, parse_only=parse_only)
+        self.parse_times.append(time.perf_counter() - start_time)
+        
+        # Keep only last 100 parse times
+        if len(self.parse_times) > 100:
+            self.parse_times = self.parse_times[-100:]
+        return soup
     
     def get_success_rate(self) -> float:
         """Calculate success rate of requests"""
@@ -111,16 +308,29 @@ class BaseScraper(ABC):
             return 0.0
         return sum(self.response_times) / len(self.response_times)
     
+    def get_avg_parse_time(self) -> float:
+        """Calculate average HTML parse time"""
+        if not self.parse_times:
+            return 0.0
+        return sum(self.parse_times) / len(self.parse_times)
+    
     def get_data_source_status(self) -> DataSource:
         """Get current status of this data source"""
         return DataSource(
             name=self.name,
             url=self.base_url,
             last_scraped=datetime.now(),
-            status='active' if self.get_success_rate() > 0.8 else 'error',
+            status='active' if self.get_success_rate() > 0.8 and not self.circuit_breaker.is_open else 'error',
             error_count=self.error_count,
             success_rate=self.get_success_rate(),
-            response_time_avg=self.get_avg_response_time()
+            response_time_avg=self.get_avg_response_time(),
+            parse_time_avg=self.get_avg_parse_time(),
+            throttled_time=self.throttled_time,
+            cache_hits=self.cache_hits,
+            cache_misses=self.cache_misses,
+            cache_revalidations=self.cache_revalidations,
+            circuit_state=self.circuit_breaker.state,
+            retries=self.retry_policy.retries
         )
     
     @abstractmethod
@@ -148,6 +358,36 @@ class BaseScraper(ABC):
         """Scrape live match data"""
         pass
     
+    # Async variants. By default they run the blocking implementation in a worker
+    # thread so several sources and competitions overlap their network I/O.
+    # Scrapers with a native async fetch path can override them.
+    
+    async def _run_blocking(self, fn, *args):
+        """Run a blocking scraper method on SCRAPER_EXECUTOR, keeping the caller's run context"""
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(SCRAPER_EXECUTOR, functools.partial(context.run, fn, *args))
+    
+    async def _run_blocking_once(self, fn, *args):
+        """_run_blocking, coalesced with identical calls in the same collection run"""
+        return await run_single_flight_async('results', (self.name, fn.__name__, args), self._run_blocking, fn, *args,
+                                             copy_result=True)
+    
+    async def scrape_matches_async(self, league_id: str, date_from: datetime, date_to: datetime) -> List[Dict]:
+        """Async version of scrape_matches"""
+        return await self._run_blocking_once(self.scrape_matches, league_id, date_from, date_to)
+    
+    async def scrape_team_stats_async(self, team_id: str) -> Dict:
+        """Async version of scrape_team_stats"""
+        return await self._run_blocking_once(self.scrape_team_stats, team_id)
+    
+    async def scrape_h2h_async(self, team1_id: str, team2_id: str) -> Dict:
+        """Async version of scrape_h2h"""
+        return await self._run_blocking_once(self.scrape_h2h, team1_id, team2_id)
+    
+    async def scrape_odds_async(self, match_id: str) -> Dict:
+        """Async version of scrape_odds"""
+        return await self._run_blocking_once(self.scrape_odds, match_id)
+    
     def cleanup(self):
-        """Clean up resources"""
-        self.session.close()
+        """Clean up resources (connections belong to the shared http_client pool)"""
+        pass
@@ -1,15 +1,26 @@
+import asyncio
 import json
-import requests
+import time
+import httpx
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from loguru import logger
 from .base_scraper import BaseScraper
+from .circuit_breaker import CircuitOpenError
+from .cassette import cassette
+from .http_cache import http_cache
+from .page_archive import page_archive
+from utils.http_client import http_client
+from .single_flight import run_single_flight, run_single_flight_async
 from models.data_models import Match, Team, MatchStatus, OddsData, Statistics
 from config.settings import BETSAPI_KEY, SCRAPING_CONFIG
 
 class BetsAPIScraper(BaseScraper):
     """Scraper for BetsAPI (uses their official API)"""
     
+    source_key = 'betsapi'
+    archive_parsers = {'events': '_parse_events_page'}
+    
     def __init__(self):
         super().__init__("BetsAPI", "https://betsapi.com")
         self.api_key = BETSAPI_KEY
@@ -21,52 +32,161 @@ class BetsAPIScraper(BaseScraper):
             params = {}
         
         params['token'] = self.api_key
+        url = f"{self.api_base}/{endpoint}"
+        try:
+            return run_single_flight('requests', ('betsapi', http_cache.make_key(url, params)),
+                                     self._api_get, endpoint, url, params, copy_result=True)
+        except CircuitOpenError as e:
+            logger.warning(str(e))
+        except httpx.HTTPError as e:
+            logger.error(f"BetsAPI request failed: {e}")
+        return {}
+    
+    def _api_get(self, endpoint: str, url: str, params: Dict) -> Dict:
+        """Fetch one endpoint with the retry policy; raises on failure so the error is not shared as a result"""
+        if cassette.replaying:
+            return cassette.replay(self.source_key, url, params).to_httpx_response().json()
+        
+        try:
+            response = self.retry_policy.call(url, self._api_get_once, endpoint, url, params)
+        except httpx.HTTPError as e:
+            # Once per request rather than per attempt, and only for host failures
+            self.circuit_breaker.record_failure(e)
+            raise
+        
+        if cassette.recording:
+            cassette.record(self.source_key, url, params, response.status_code, response.headers, response.content)
+        page_archive.store(self.source_key, url, params, response.status_code, response.content, endpoint)
+        return response.json()
+    
+    def _api_get_once(self, endpoint: str, url: str, params: Dict) -> httpx.Response:
+        """One attempt at an endpoint"""
+        probe = self.circuit_breaker.acquire()
+        if probe is None:
+            raise CircuitOpenError(f"BetsAPI circuit open, skipping {endpoint}")
         
         try:
-            response = self.session.get(
-                f"{self.api_base}/{endpoint}",
+            self._rate_limit(self.api_base)
+            start_time = time.time()
+            response = http_client.get(
+                url,
                 params=params,
-                timeout=SCRAPING_CONFIG['timeout']
+                timeout=SCRAPING_CONFIG['timeout'],
+                headers=self._request_headers()
             )
             response.raise_for_status()
-            
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
+            self._record_success(url, time.time() - start_time)
+            return response
+        except httpx.HTTPError as e:
+            self._record_failure(url, e)
+            raise
+        finally:
+            if probe:
+                self.circuit_breaker.release_probe()
+    
+    async def _make_api_request_async(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        """Async variant of _make_api_request"""
+        if params is None:
+            params = {}
+        
+        params['token'] = self.api_key
+        url = f"{self.api_base}/{endpoint}"
+        try:
+            return await run_single_flight_async('requests', ('betsapi', http_cache.make_key(url, params)),
+                                                 self._api_get_async, endpoint, url, params, copy_result=True)
+        except CircuitOpenError as e:
+            logger.warning(str(e))
+        except httpx.HTTPError as e:
             logger.error(f"BetsAPI request failed: {e}")
-            return {}
+        return {}
+    
+    async def _api_get_async(self, endpoint: str, url: str, params: Dict) -> Dict:
+        """Async variant of _api_get"""
+        if cassette.replaying:
+            return cassette.replay(self.source_key, url, params).to_httpx_response().json()
+        
+        try:
+            response = await self.retry_policy.call_async(url, self._api_get_once_async, endpoint, url, params)
+        except httpx.HTTPError as e:
+            self.circuit_breaker.record_failure(e)
+            raise
+        
+        if cassette.recording:
+            cassette.record(self.source_key, url, params, response.status_code, response.headers, response.content)
+        await asyncio.to_thread(page_archive.store, self.source_key, url, params,
+                                response.status_code, response.content, endpoint)
+        return response.json()
+    
+    async def _api_get_once_async(self, endpoint: str, url: str, params: Dict) -> httpx.Response:
+        """Async variant of _api_get_once"""
+        probe = self.circuit_breaker.acquire()
+        if probe is None:
+            raise CircuitOpenError(f"BetsAPI circuit open, skipping {endpoint}")
+        
+        try:
+            await self._rate_limit_async(self.api_base)
+            start_time = time.time()
+            response = await http_client.get_async(
+                url,
+                params=params,
+                timeout=SCRAPING_CONFIG['timeout'],
+                headers=self._request_headers()
+            )
+            response.raise_for_status()
+            self._record_success(url, time.time() - start_time)
+            return response
+        except httpx.HTTPError as e:
+            self._record_failure(url, e)
+            raise
+        finally:
+            if probe:
+                self.circuit_breaker.release_probe()
+    
+    def _events_params(self, league_id: str, date_from: datetime, date_to: datetime) -> Dict:
+        """Build the query parameters for the events endpoint"""
+        return {
+            'sport_id': 1,  # Football
+            'league_id': league_id,
+            'date_from': date_from.strftime("%Y-%m-%d"),
+            'date_to': date_to.strftime("%Y-%m-%d")
+        }
+    
+    def _parse_events_page(self, content: bytes) -> List[Dict]:
+        """Parse an archived events endpoint response"""
+        return self._parse_events(json.loads(content))
+    
+    def _parse_events(self, response_data: Dict) -> List[Dict]:
+        """Parse the events endpoint response into match dicts"""
+        matches = []
+        
+        if 'results' in response_data:
+            for event in response_data['results']:
+                try:
+                    match_data = self._parse_event_data(event)
+                    if match_data:
+                        matches.append(match_data)
+                except Exception as e:
+                    logger.error(f"Error parsing event data: {e}")
+                    continue
+        
+        logger.info(f"Scraped {len(matches)} matches from BetsAPI")
+        return matches
     
     def scrape_matches(self, league_id: str, date_from: datetime, date_to: datetime) -> List[Dict]:
         """Scrape matches using BetsAPI"""
         try:
-            # Convert dates to required format
-            date_from_str = date_from.strftime("%Y-%m-%d")
-            date_to_str = date_to.strftime("%Y-%m-%d")
-            
-            # BetsAPI endpoint for events
-            params = {
-                'sport_id': 1,  # Football
-                'league_id': league_id,
-                'date_from': date_from_str,
-                'date_to': date_to_str
-            }
+            response_data = self._make_api_request('events', self._events_params(league_id, date_from, date_to))
+            return self._parse_events(response_data)
             
-            response_data = self._make_api_request('events', params)
-            
-            matches = []
-            
-            if 'results' in response_data:
-                for event in response_data['results']:
-                    try:
-                        match_data = self._parse_event_data(event)
-                        if match_data:
-                            matches.append(match_data)
-                    except Exception as e:
-                        logger.error(f"Error parsing event data: {e}")
-                        continue
-            
-            logger.info(f"Scraped {len(matches)} matches from BetsAPI")
-            return matches
+        except Exception as e:
+            logger.error(f"Error scraping matches from BetsAPI: {e}")
+            return []
+    
+    async def scrape_matches_async(self, league_id: str, date_from: datetime, date_to: datetime) -> List[Dict]:
+        """Scrape matches using BetsAPI without blocking the event loop"""
+        try:
+            response_data = await self._make_api_request_async('events', self._events_params(league_id, date_from, date_to))
+            return self._parse_events(response_data)
             
         except Exception as e:
             logger.error(f"Error scraping matches from BetsAPI: {e}")
@@ -0,0 +1,98 @@
+import base64
+import gzip
+import json
+import os
+import threading
+from typing import Dict, Optional
+from loguru import logger
+import httpx
+from config.settings import CASSETTE_CONFIG
+from .http_cache import CachedResponse, ResponseCache
+
+# Query parameters that must never end up in a cassette or its keys
+SECRET_PARAMS = {'token', 'api_key', 'apikey', 'key'}
+
+class CassetteMissError(httpx.RequestError):
+    """Raised in replay mode when a request was never recorded"""
+
+class CassetteRecorder:
+    """Record raw scraper responses and replay them offline.
+
+    Modes (CASSETTE_CONFIG['mode'] / SCRAPER_CASSETTE_MODE):
+      off    - normal network access
+      record - every response is appended to a gzip JSON-lines cassette per source
+      replay - responses are served from the cassettes: no network, no rate limiting
+    """
+
+    def __init__(self, mode: str = CASSETTE_CONFIG['mode'], cassette_dir: str = CASSETTE_CONFIG['dir']):
+        self.mode = mode
+        self.cassette_dir = cassette_dir
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, Dict[str, Dict]] = {}
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    @staticmethod
+    def _public_params(params: Optional[Dict]) -> Dict:
+        return {k: v for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS}
+
+    def _path(self, source: str) -> str:
+        return os.path.join(self.cassette_dir, f"{source or 'unknown'}.jsonl.gz")
+
+    def record(self, source: str, url: str, params: Optional[Dict], status_code: int,
+               headers: Dict[str, str], content: bytes):
+        """Append one response to the source's cassette"""
+        params = self._public_params(params)
+        entry = {
+            'key': ResponseCache.make_key(url, params),
+            'url': url,
+            'params': params,
+            'status_code': status_code,
+            'headers': {k: v for k, v in headers.items() if k.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')},
+            'content': base64.b64encode(content).decode('ascii')
+        }
+        with self._lock:
+            os.makedirs(self.cassette_dir, exist_ok=True)
+            # Each append adds a gzip member; gzip.open reads them back as one stream
+            with gzip.open(self._path(source), 'at', encoding='utf-8') as f:
+                f.write(json.dumps(entry, default=str) + '\n')
+            self._loaded.pop(source, None)
+
+    def _entries(self, source: str) -> Dict[str, Dict]:
+        with self._lock:
+            if source not in self._loaded:
+                entries = {}
+                path = self._path(source)
+                if os.path.exists(path):
+                    with gzip.open(path, 'rt', encoding='utf-8') as f:
+                        for line in f:
+                            entry = json.loads(line)
+                            entries[entry['key']] = entry  # last recording wins
+                else:
+                    logger.warning(f"No cassette found for {source} at {path}")
+                self._loaded[source] = entries
+            return self._loaded[source]
+
+    def replay(self, source: str, url: str, params: Optional[Dict]) -> CachedResponse:
+        """Return the recorded response for a request or raise CassetteMissError"""
+        entry = self._entries(source).get(ResponseCache.make_key(url, self._public_params(params)))
+        if entry is None:
+            raise CassetteMissError(f"No recorded response for {url} in {source} cassette")
+        return CachedResponse(
+            url=entry['url'],
+            status_code=entry['status_code'],
+            headers=entry['headers'],
+            content=base64.b64decode(entry['content']),
+            etag=None,
+            last_modified=None,
+            stored_at=0
+        )
+
+# Shared by every scraper in the process
+cassette = CassetteRecorder()
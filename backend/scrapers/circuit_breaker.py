@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+import httpx
+from loguru import logger
+from config.settings import CIRCUIT_BREAKER_CONFIG
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised instead of making a request while a source's circuit is open"""
+
+def is_host_failure(error: Exception) -> bool:
+    """True for failures that say the host is unhealthy: network errors, timeouts, 429 and 5xx.
+
+    Other 4xx responses (a missing page, a bad request) are the caller's
+    problem and do not count against the source.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+class CircuitBreaker:
+    """Per-source circuit breaker.
+
+    closed    - requests flow normally; outcomes are tracked in a rolling window
+    open      - requests fail fast with CircuitOpenError until the cool-down ends
+    half_open - one probe request is let through; success closes the circuit,
+                failure opens it again. A probe that ends without an outcome
+                (cancelled, unexpected error) is released by the caller, and
+                one that outlives the cool-down is given up on
+
+    Only host failures (see is_host_failure) count, and outcomes of requests
+    that were already in flight when the circuit opened are ignored.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, config: Dict = CIRCUIT_BREAKER_CONFIG):
+        self.name = name
+        self.config = config
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.outcomes = deque(maxlen=config['window'])
+        self.opened_at = None
+        self.trips = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[bool]:
+        """None if the request is rejected, otherwise whether it is the half-open probe"""
+        with self._lock:
+            now = time.time()
+            if self.state == self.OPEN:
+                if now - self.opened_at < self.config['cooldown']:
+                    self.rejected += 1
+                    return None
+                self.state = self.HALF_OPEN
+                logger.info(f"{self.name}: circuit half-open, sending a probe request")
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    if now - self._probe_started < self.config['cooldown']:
+                        self.rejected += 1
+                        return None
+                    logger.warning(f"{self.name}: probe request never finished, sending another")
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+            return False
+
+    def allow_request(self) -> bool:
+        return self.acquire() is not None
+
+    def release_probe(self):
+        """Let another probe through after this one ended without recording an outcome"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        """True while requests would be rejected"""
+        with self._lock:
+            return self.state == self.OPEN and time.time() - self.opened_at < self.config['cooldown']
+
+    def get_success_rate(self) -> float:
+        if not self.outcomes:
+            return 1.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def record_success(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                return
+            self.outcomes.append(1)
+            self.consecutive_failures = 0
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self.outcomes.clear()
+                logger.info(f"{self.name}: circuit closed")
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Optional[Exception] = None):
+        """Count a failed request; errors that are not host failures are ignored"""
+        if error is not None and not is_host_failure(error):
+            return
+        with self._lock:
+            # Stragglers must not restart the cool-down
+            if self.state == self.OPEN:
+                return
+            self.outcomes.append(0)
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN:
+                self._trip("probe request failed")
+            elif self.consecutive_failures >= self.config['failure_threshold']:
+                self._trip(f"{self.consecutive_failures} consecutive failures")
+            elif (len(self.outcomes) >= self.config['min_requests']
+                  and self.get_success_rate() < self.config['min_success_rate']):
+                self._trip(f"success rate {self.get_success_rate():.0%} over last {len(self.outcomes)} requests")
+
+    def _trip(self, reason: str):
+        self.state = self.OPEN
+        self.opened_at = time.time()
+        self.trips += 1
+        logger.warning(f"{self.name}: circuit opened ({reason}), cooling down for {self.config['cooldown']}s")
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.config['cooldown'] - (time.time() - self.opened_at))
+            return {
+                'state': self.state,
+                'success_rate': self.get_success_rate(),
+                'consecutive_failures': self.consecutive_failures,
+                'trips': self.trips,
+                'rejected_requests': self.rejected,
+                'retry_in': retry_in
+            }
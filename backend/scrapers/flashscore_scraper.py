@@ -2,7 +2,7 @@ import json
 import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from loguru import logger
 from .base_scraper import BaseScraper
 from models.data_models import Match, Team, MatchStatus, OddsData, Statistics
@@ -10,6 +10,9 @@ from models.data_models import Match, Team, MatchStatus, OddsData, Statistics
 class FlashScoreScraper(BaseScraper):
     """Scraper for FlashScore website"""
     
+    source_key = 'flashscore'
+    archive_parsers = {'matches': '_parse_matches_page'}
+    
     def __init__(self):
         super().__init__("FlashScore", "https://www.flashscore.com")
         self.api_base = "https://api.flashscore.com"
@@ -35,26 +38,8 @@ class FlashScoreScraper(BaseScraper):
                 date_str = date_from.strftime("%Y-%m-%d")
                 url += f"fixtures/{date_str}/"
             
-            response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            matches = []
-            
-            # Find match containers - try multiple selectors
-            match_containers = soup.find_all('div', class_='event__match')
-            if not match_containers:
-                match_containers = soup.find_all('div', class_='event__match--static')
-            if not match_containers:
-                match_containers = soup.find_all('div', class_='event__match--scheduled')
-            
-            for container in match_containers:
-                try:
-                    match_data = self._parse_match_container(container)
-                    if match_data:
-                        matches.append(match_data)
-                except Exception as e:
-                    logger.error(f"Error parsing match container: {e}")
-                    continue
+            response = self._make_request(url, page_type='matches')
+            matches = self._parse_matches_page(response.content)
             
             logger.info(f"Scraped {len(matches)} matches from FlashScore")
             return matches
@@ -63,6 +48,30 @@ class FlashScoreScraper(BaseScraper):
             logger.error(f"Error scraping matches from FlashScore: {e}")
             return []
     
+    def _parse_matches_page(self, content: bytes) -> List[Dict]:
+        """Parse the match containers of a fixtures page"""
+        soup = self._parse_html(content, SoupStrainer('div', class_=re.compile(r'^event__match')))
+        
+        matches = []
+        
+        # Find match containers - try multiple selectors
+        match_containers = soup.find_all('div', class_='event__match')
+        if not match_containers:
+            match_containers = soup.find_all('div', class_='event__match--static')
+        if not match_containers:
+            match_containers = soup.find_all('div', class_='event__match--scheduled')
+        
+        for container in match_containers:
+            try:
+                match_data = self._parse_match_container(container)
+                if match_data:
+                    matches.append(match_data)
+            except Exception as e:
+                logger.error(f"Error parsing match container: {e}")
+                continue
+        
+        return matches
+    
     def _parse_match_container(self, container) -> Optional[Dict]:
         """Parse individual match container"""
         try:
@@ -134,7 +143,7 @@ class FlashScoreScraper(BaseScraper):
             # FlashScore team URL structure
             url = f"{self.base_url}/team/{team_id}/"
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('div', class_=['form', 'stat__row']))
             
             stats = {}
             
@@ -195,7 +204,7 @@ class FlashScoreScraper(BaseScraper):
             # FlashScore H2H URL structure
             url = f"{self.base_url}/h2h/{team1_id}/{team2_id}/"
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('div', class_='h2h__row'))
             
             h2h_data = {
                 'total_matches': 0,
@@ -265,7 +274,7 @@ class FlashScoreScraper(BaseScraper):
             # FlashScore odds URL structure
             url = f"{self.base_url}/match/{match_id}/odds/"
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('div', class_='odds__table'))
             
             odds_data = {
                 'home_win': None,
@@ -332,7 +341,7 @@ class FlashScoreScraper(BaseScraper):
             # FlashScore live match URL
             url = f"{self.base_url}/match/{match_id}/"
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('div', class_=['event__score', 'event__time', 'event__events']))
             
             live_data = {
                 'minute': None,
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+import httpx
+from loguru import logger
+from config.settings import CACHE_CONFIG
+
+# Bodies are stored decoded, so transfer-level headers must not be replayed
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+@dataclass
+class CachedResponse:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Validators to send with a conditional GET"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_httpx_response(self) -> httpx.Response:
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=httpx.Request('GET', self.url),
+            # Lets callers tell a response served from disk from one that just came off the wire
+            extensions={'from_cache': True}
+        )
+
+class ResponseCache:
+    """Persistent on-disk HTTP response cache with LRU eviction by total size.
+
+    Entries keep their ETag/Last-Modified validators so stale entries can be
+    revalidated with a conditional GET instead of refetched.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_CONFIG['http_cache_dir'],
+                 max_bytes: int = CACHE_CONFIG['http_cache_max_bytes']):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database lazily so importing scrapers does not create the cache"""
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.cache_dir, 'responses.sqlite'), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    content BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+            self._conn.commit()
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        raw = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT url, status_code, headers, content, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        url, status_code, headers, content, etag, last_modified, stored_at = row
+        return CachedResponse(url, status_code, json.loads(headers), content, etag, last_modified, stored_at)
+
+    def put(self, key: str, url: str, status_code: int, headers: Dict[str, str], content: bytes):
+        headers = {name: value for name, value in headers.items() if name.lower() not in DROPPED_HEADERS}
+        lowered = {name.lower(): value for name, value in headers.items()}
+        size = len(content)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            previous = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status_code, json.dumps(headers), content,
+                 lowered.get('etag'), lowered.get('last-modified'), now, now, size)
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self._evict(conn)
+            conn.commit()
+
+    def touch(self, key: str):
+        """Mark an entry as fresh again after a 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        evicted = 0
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            evicted += 1
+        logger.info(f"HTTP cache: evicted {evicted} entries")
+
+# Shared by every scraper in the process
+http_cache = ResponseCache()
@@ -4,12 +4,15 @@ import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from loguru import logger
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from .base_scraper import BaseScraper
 
 class LaLigaScraper(BaseScraper):
     """Scraper for official La Liga website"""
     
+    source_key = 'laliga_official'
+    archive_parsers = {'matches': '_parse_matches_page'}
+    
     def __init__(self):
         super().__init__("La Liga Official", "https://www.laliga.com")
         self.api_base = "https://www.laliga.com/api"
@@ -23,20 +26,11 @@ class LaLigaScraper(BaseScraper):
             # We'll scrape the calendar page for upcoming matches
             calendar_url = f"{self.base_url}/en-GB/calendar"
             
-            response = self._make_request(calendar_url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find match containers
-            match_containers = soup.find_all('div', class_=re.compile(r'match|fixture'))
-            
-            for container in match_containers:
-                try:
-                    match_data = self._parse_match_container(container)
-                    if match_data and self._is_match_in_date_range(match_data, date_from, date_to):
-                        matches.append(match_data)
-                except Exception as e:
-                    logger.error(f"Error parsing match container: {e}")
-                    continue
+            response = self._make_request(calendar_url, page_type='matches')
+            matches = [
+                match_data for match_data in self._parse_matches_page(response.content)
+                if self._is_match_in_date_range(match_data, date_from, date_to)
+            ]
             
             logger.info(f"Scraped {len(matches)} matches from La Liga official website")
             
@@ -45,6 +39,25 @@ class LaLigaScraper(BaseScraper):
         
         return matches
     
+    def _parse_matches_page(self, content: bytes) -> List[Dict]:
+        """Parse every match container of the calendar page"""
+        soup = self._parse_html(content, SoupStrainer('div', class_=re.compile(r'match|fixture')))
+        matches = []
+        
+        # Find match containers
+        match_containers = soup.find_all('div', class_=re.compile(r'match|fixture'))
+        
+        for container in match_containers:
+            try:
+                match_data = self._parse_match_container(container)
+                if match_data:
+                    matches.append(match_data)
+            except Exception as e:
+                logger.error(f"Error parsing match container: {e}")
+                continue
+        
+        return matches
+    
     def _parse_match_container(self, container) -> Optional[Dict]:
         """Parse individual match container"""
         try:
@@ -147,7 +160,7 @@ class LaLigaScraper(BaseScraper):
             team_url = f"{self.base_url}/en-GB/teams/{team_id}"
             
             response = self._make_request(team_url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('table', class_=re.compile(r'standings|table')))
             
             stats = {
                 'team_name': team_id,
@@ -197,7 +210,7 @@ class LaLigaScraper(BaseScraper):
             h2h_url = f"{self.base_url}/en-GB/head-to-head/{team1_id}-vs-{team2_id}"
             
             response = self._make_request(h2h_url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content)
             
             h2h_data = {
                 'team1': team1_id,
@@ -243,7 +256,7 @@ class LaLigaScraper(BaseScraper):
                 # Try to find live match data
                 live_url = f"{self.base_url}/en-GB/live"
                 response = self._make_request(live_url)
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = self._parse_html(response.content, SoupStrainer('div', class_=re.compile(r'match|fixture')))
                 
                 # Look for the specific match
                 match_containers = soup.find_all('div', class_=re.compile(r'match|fixture'))
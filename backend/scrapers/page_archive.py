@@ -0,0 +1,204 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, Optional
+from loguru import logger
+from config.settings import ARCHIVE_CONFIG
+from .cassette import SECRET_PARAMS
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class PageArchive:
+    """Content-addressed archive of raw page bodies.
+
+    Bodies are compressed (zstd when available, gzip otherwise) and stored
+    once per SHA-256 under blobs/; a SQLite index maps source, URL, page type
+    and fetch time to the blob so reparse.py can rerun the current parsers
+    over historical pages without touching the network. Pages older than
+    retention_days are dropped, and the oldest pages go first once the blobs
+    take more than max_bytes.
+    """
+
+    # Seconds between retention sweeps
+    EXPIRE_INTERVAL = 3600
+
+    def __init__(self, archive_dir: str = ARCHIVE_CONFIG['dir'], enabled: bool = ARCHIVE_CONFIG['enabled'],
+                 max_bytes: int = ARCHIVE_CONFIG['max_bytes'], retention_days: float = ARCHIVE_CONFIG['retention_days']):
+        self.archive_dir = archive_dir
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.retention = retention_days * 86400
+        self.codec = 'zst' if zstandard else 'gz'
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0
+        self._last_expired = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the index lazily so importing scrapers does not create the archive"""
+        if self._conn is None:
+            os.makedirs(os.path.join(self.archive_dir, 'blobs'), exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.archive_dir, 'index.sqlite'), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT NOT NULL,
+                    page_type TEXT,
+                    url TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    codec TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_source_url ON pages(source, url, fetched_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_sha256 ON pages(sha256)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_fetched_at ON pages(fetched_at)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    sha256 TEXT PRIMARY KEY,
+                    codec TEXT NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            # Archives written before blob sizes were tracked
+            for sha256, codec in self._conn.execute(
+                    "SELECT DISTINCT sha256, codec FROM pages WHERE sha256 NOT IN (SELECT sha256 FROM blobs)").fetchall():
+                path = self._blob_path(sha256, codec)
+                if os.path.exists(path):
+                    self._conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)",
+                                       (sha256, codec, os.path.getsize(path)))
+            self._conn.commit()
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        return self._conn
+
+    def _blob_path(self, sha256: str, codec: str) -> str:
+        return os.path.join(self.archive_dir, 'blobs', sha256[:2], f"{sha256}.{codec}")
+
+    def _compress(self, content: bytes) -> bytes:
+        if self.codec == 'zst':
+            return zstandard.ZstdCompressor(level=ARCHIVE_CONFIG['zstd_level']).compress(content)
+        return gzip.compress(content)
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == 'zst':
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read .zst archive blobs")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def store(self, source: str, url: str, params: Optional[Dict], status_code: int, content: bytes,
+              page_type: Optional[str] = None):
+        """Archive a fetched body; unchanged refetches of the same URL are skipped"""
+        if not self.enabled:
+            return
+        sha256 = hashlib.sha256(content).hexdigest()
+        params = {k: v for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS}
+        params_json = json.dumps(params, sort_keys=True, default=str)
+        try:
+            with self._lock:
+                conn = self._connection()
+                latest = conn.execute(
+                    "SELECT sha256 FROM pages WHERE source = ? AND url = ? AND params = ? ORDER BY fetched_at DESC LIMIT 1",
+                    (source, url, params_json)
+                ).fetchone()
+                if latest and latest[0] == sha256:
+                    return
+                path = self._blob_path(sha256, self.codec)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp_path = f"{path}.tmp"
+                    compressed = self._compress(content)
+                    with open(tmp_path, 'wb') as f:
+                        f.write(compressed)
+                    os.replace(tmp_path, path)
+                    conn.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)", (sha256, self.codec, len(compressed)))
+                    self._total_bytes += len(compressed)
+                now = time.time()
+                conn.execute(
+                    "INSERT INTO pages (source, page_type, url, params, fetched_at, status_code, sha256, codec) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (source, page_type, url, params_json, now, status_code, sha256, self.codec)
+                )
+                if now - self._last_expired > self.EXPIRE_INTERVAL:
+                    self._last_expired = now
+                    self._drop_pages(conn, "fetched_at < ?", (now - self.retention,), "older than retention")
+                self._evict(conn)
+                conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Page archive: failed to store {url}: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop the oldest pages until the blobs fit in max_bytes"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        dropped = 0
+        rows = conn.execute("SELECT id, sha256, codec FROM pages ORDER BY fetched_at").fetchall()
+        for page_id, sha256, codec in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM pages WHERE id = ?", (page_id,))
+            self._release_blob(conn, sha256, codec)
+            dropped += 1
+        logger.info(f"Page archive: dropped the {dropped} oldest pages to stay under {self.max_bytes} bytes")
+
+    def _drop_pages(self, conn: sqlite3.Connection, where: str, args: tuple, reason: str):
+        rows = conn.execute(f"SELECT id, sha256, codec FROM pages WHERE {where}", args).fetchall()
+        for page_id, sha256, codec in rows:
+            conn.execute("DELETE FROM pages WHERE id = ?", (page_id,))
+            self._release_blob(conn, sha256, codec)
+        if rows:
+            logger.info(f"Page archive: dropped {len(rows)} pages {reason}")
+
+    def _release_blob(self, conn: sqlite3.Connection, sha256: str, codec: str):
+        """Delete a blob once no page refers to it"""
+        if conn.execute("SELECT 1 FROM pages WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone():
+            return
+        row = conn.execute("SELECT size FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+        conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+        if row:
+            self._total_bytes -= row[0]
+        try:
+            os.remove(self._blob_path(sha256, codec))
+        except FileNotFoundError:
+            pass
+
+    def load(self, sha256: str, codec: str) -> bytes:
+        with open(self._blob_path(sha256, codec), 'rb') as f:
+            return self._decompress(f.read(), codec)
+
+    def iter_pages(self, source: Optional[str] = None, page_type: Optional[str] = None,
+                   since: Optional[float] = None, until: Optional[float] = None) -> Iterator[Dict]:
+        """Yield index entries in fetch order, optionally filtered"""
+        query = "SELECT source, page_type, url, params, fetched_at, status_code, sha256, codec FROM pages WHERE 1 = 1"
+        args = []
+        for clause, value in (("source = ?", source), ("page_type = ?", page_type),
+                              ("fetched_at >= ?", since), ("fetched_at < ?", until)):
+            if value is not None:
+                query += f" AND {clause}"
+                args.append(value)
+        with self._lock:
+            rows = self._connection().execute(query + " ORDER BY fetched_at", args).fetchall()
+        for source_name, row_page_type, url, params, fetched_at, status_code, sha256, codec in rows:
+            yield {
+                'source': source_name,
+                'page_type': row_page_type,
+                'url': url,
+                'params': json.loads(params),
+                'fetched_at': fetched_at,
+                'status_code': status_code,
+                'sha256': sha256,
+                'codec': codec
+            }
+
+# Shared by every scraper in the process
+page_archive = PageArchive()
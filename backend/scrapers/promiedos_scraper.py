@@ -4,12 +4,15 @@ import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from loguru import logger
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from .base_scraper import BaseScraper
 
 class PromiedosScraper(BaseScraper):
     """Scraper for Promiedos website (covers Spanish football well)"""
     
+    source_key = 'promiedos'
+    archive_parsers = {'matches': '_parse_matches_page'}
+    
     def __init__(self):
         super().__init__("Promiedos", "https://www.promiedos.com.ar")
         
@@ -24,34 +27,14 @@ class PromiedosScraper(BaseScraper):
             else:
                 league_url = f"{self.base_url}/league/{league_id}"
             
-            response = self._make_request(league_url)
+            response = self._make_request(league_url, page_type='matches')
             if not response:
                 return matches
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
             
-            # Look for the JSON data in the script tag
-            script_tag = soup.find('script', {'id': '__NEXT_DATA__'})
-            if script_tag:
-                try:
-                    json_data = json.loads(script_tag.string)
-                    leagues = json_data.get('props', {}).get('pageProps', {}).get('data', {}).get('leagues', [])
-                    
-                    for league in leagues:
-                        if league.get('id') == 'bb':  # La Liga ID
-                            games = league.get('games', [])
-                            
-                            for game in games:
-                                try:
-                                    match_data = self._extract_match_from_json(game)
-                                    if match_data and self._is_match_in_date_range(match_data, date_from, date_to):
-                                        matches.append(match_data)
-                                except Exception as e:
-                                    logger.error(f"Error extracting match data: {e}")
-                                    continue
-                                    
-                except json.JSONDecodeError as e:
-                    logger.error(f"Error parsing JSON data: {e}")
+            matches = [
+                match_data for match_data in self._parse_matches_page(response.content)
+                if self._is_match_in_date_range(match_data, date_from, date_to)
+            ]
             
             logger.info(f"Scraped {len(matches)} matches from Promiedos")
             
@@ -60,6 +43,36 @@ class PromiedosScraper(BaseScraper):
         
         return matches
     
+    def _parse_matches_page(self, content: bytes) -> List[Dict]:
+        """Parse the La Liga games from the page's embedded __NEXT_DATA__ JSON"""
+        matches = []
+        soup = self._parse_html(content, SoupStrainer('script', id='__NEXT_DATA__'))
+        
+        # Look for the JSON data in the script tag
+        script_tag = soup.find('script', {'id': '__NEXT_DATA__'})
+        if script_tag:
+            try:
+                json_data = json.loads(script_tag.string)
+                leagues = json_data.get('props', {}).get('pageProps', {}).get('data', {}).get('leagues', [])
+                
+                for league in leagues:
+                    if league.get('id') == 'bb':  # La Liga ID
+                        games = league.get('games', [])
+                        
+                        for game in games:
+                            try:
+                                match_data = self._extract_match_from_json(game)
+                                if match_data:
+                                    matches.append(match_data)
+                            except Exception as e:
+                                logger.error(f"Error extracting match data: {e}")
+                                continue
+                                
+            except json.JSONDecodeError as e:
+                logger.error(f"Error parsing JSON data: {e}")
+        
+        return matches
+    
     def _parse_match_row(self, row) -> Optional[Dict]:
         """Parse individual match row from table"""
         try:
@@ -172,7 +185,7 @@ class PromiedosScraper(BaseScraper):
             team_url = f"{self.base_url}/team/{team_id}"
             
             response = self._make_request(team_url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('table', class_=re.compile(r'stats|standings|table')))
             
             stats = {
                 'team_name': team_id,
@@ -225,7 +238,7 @@ class PromiedosScraper(BaseScraper):
             h2h_url = f"{self.base_url}/h2h/{team1_id}-vs-{team2_id}"
             
             response = self._make_request(h2h_url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('table', class_=re.compile(r'h2h|head-to-head')))
             
             h2h_data = {
                 'team1': team1_id,
@@ -291,7 +304,7 @@ class PromiedosScraper(BaseScraper):
                 # Try to find live match data
                 live_url = f"{self.base_url}/live"
                 response = self._make_request(live_url)
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = self._parse_html(response.content, SoupStrainer('div', class_=re.compile(r'match|fixture')))
                 
                 # Look for the specific match
                 match_containers = soup.find_all('div', class_=re.compile(r'match|fixture'))
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+from urllib.parse import urlparse
+from config.settings import RATE_LIMITS
+
+# (RATE_LIMITS key, window length in seconds)
+RATE_WINDOWS = [
+    ('requests_per_minute', 60),
+    ('requests_per_hour', 3600),
+    ('requests_per_day', 86400),
+]
+
+class TokenBucket:
+    """Token bucket that refills `limit` tokens evenly over `window` seconds"""
+
+    def __init__(self, limit: int, window: float, capacity: float = None):
+        self.rate = limit / window
+        self.capacity = capacity if capacity is not None else limit
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, now: float) -> float:
+        """Take one token and return how long the caller must wait before using it.
+
+        Tokens may go negative: later callers queue up behind earlier reservations.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+class HostRateLimiter:
+    """Per-host rate limiter with minute, hour and day token buckets.
+
+    Only waits when one of the budgets in RATE_LIMITS is exhausted. Reservations
+    are made under a thread lock, so the same instance is shared by threads and
+    asyncio tasks; the waiting itself happens outside the lock.
+    """
+
+    def __init__(self, limits: Dict = RATE_LIMITS):
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, List[TokenBucket]] = {}
+        self._paused_until: Dict[str, float] = {}
+        self.throttled_time = defaultdict(float)
+        self.throttled_requests = defaultdict(int)
+
+    def _host_buckets(self, host: str) -> List[TokenBucket]:
+        buckets = self._buckets.get(host)
+        if buckets is None:
+            buckets = []
+            for key, window in RATE_WINDOWS:
+                if self.limits.get(key):
+                    # The minute bucket is capped at `burst` so a fresh host is not hammered
+                    capacity = self.limits.get('burst') if key == 'requests_per_minute' else None
+                    buckets.append(TokenBucket(self.limits[key], window, capacity))
+            self._buckets[host] = buckets
+        return buckets
+
+    def reserve(self, host: str) -> float:
+        """Reserve a request slot for `host` and return the required wait in seconds"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max([bucket.reserve(now) for bucket in self._host_buckets(host)], default=0.0)
+            wait = max(wait, self._paused_until.get(host, 0.0) - now)
+            if wait > 0:
+                self.throttled_time[host] += wait
+                self.throttled_requests[host] += 1
+            return wait
+
+    def back_off(self, url: str, seconds: float):
+        """Hold every request to the host of `url` for `seconds` (e.g. after a Retry-After)"""
+        host = urlparse(url).netloc
+        with self._lock:
+            self._paused_until[host] = max(self._paused_until.get(host, 0.0), time.monotonic() + seconds)
+
+    def acquire(self, url: str) -> float:
+        """Block the calling thread until a request to `url` is allowed"""
+        wait = self.reserve(urlparse(url).netloc)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url: str) -> float:
+        """Wait (without blocking the event loop) until a request to `url` is allowed"""
+        wait = self.reserve(urlparse(url).netloc)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_throttle_report(self) -> Dict[str, Dict]:
+        """Time spent throttled per host"""
+        with self._lock:
+            return {
+                host: {
+                    'throttled_time': self.throttled_time[host],
+                    'throttled_requests': self.throttled_requests[host]
+                }
+                for host in self._buckets
+            }
+
+# Shared by every scraper in the process
+rate_limiter = HostRateLimiter(RATE_LIMITS)
@@ -0,0 +1,137 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+import httpx
+from loguru import logger
+from config.settings import RETRY_CONFIG
+from .rate_limiter import rate_limiter
+from .circuit_breaker import CircuitOpenError
+from .cassette import CassetteMissError
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RetryBudget:
+    """Retries a source may spend, refilled at a steady rate.
+
+    Once a host has burned through its budget, failures are raised straight
+    away instead of being retried, so one bad host cannot stall a run.
+    """
+
+    def __init__(self, capacity: int, refill_per_minute: float):
+        self.capacity = capacity
+        self.rate = refill_per_minute / 60
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+class RetryPolicy:
+    """Per-source retry policy for scraper fetches.
+
+    - 4xx responses other than 429 are never retried
+    - 429/5xx responses, timeouts and connection errors are retried
+    - Retry-After is honoured by holding the whole host in the rate limiter;
+      waits longer than max_retry_after are not retried (the circuit breaker
+      takes over if the host keeps refusing)
+    - other back-offs use exponential delays with full jitter
+    - the async path awaits instead of sleeping the thread
+    """
+
+    def __init__(self, name: str, config: dict = RETRY_CONFIG):
+        self.name = name
+        self.config = config
+        self.budget = RetryBudget(config['budget'], config['budget_refill_per_minute'])
+        self.retries = 0
+        self.retries_denied = 0
+
+    def classify(self, error: Exception) -> Tuple[bool, Optional[float]]:
+        """Return (retryable, Retry-After seconds) for a failed attempt"""
+        if isinstance(error, (CircuitOpenError, CassetteMissError)):
+            return False, None
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+            if status_code not in self.config['retry_statuses']:
+                return False, None
+            return True, parse_retry_after(error.response.headers.get('Retry-After'))
+        if isinstance(error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
+            return True, None
+        return False, None
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential delay for the given retry number (1-based)"""
+        return random.uniform(0, min(self.config['max_delay'], self.config['base_delay'] * 2 ** attempt))
+
+    def next_delay(self, url: str, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up"""
+        if attempt >= self.config['max_attempts']:
+            return None
+        retryable, retry_after = self.classify(error)
+        if not retryable:
+            return None
+        if retry_after is not None and retry_after > self.config['max_retry_after']:
+            logger.warning(f"{self.name}: Retry-After of {retry_after:.0f}s for {url} is too long, giving up")
+            return None
+        if not self.budget.try_spend():
+            self.retries_denied += 1
+            logger.warning(f"{self.name}: retry budget exhausted, not retrying {url}")
+            return None
+        self.retries += 1
+        if retry_after is not None:
+            # Every request to the host waits it out in the rate limiter, not just this one
+            rate_limiter.back_off(url, retry_after)
+            return random.uniform(0, self.config['base_delay'])
+        return self._backoff(attempt)
+
+    def call(self, url: str, fn, *args):
+        """Run a blocking fetch with retries"""
+        attempt = 1
+        while True:
+            try:
+                return fn(*args)
+            except Exception as e:
+                delay = self.next_delay(url, e, attempt)
+                if delay is None:
+                    raise
+            logger.info(f"{self.name}: retrying {url} in {delay:.1f}s (attempt {attempt + 1})")
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, url: str, coro_fn, *args):
+        """Run an async fetch with retries; waiting yields to the event loop"""
+        attempt = 1
+        while True:
+            try:
+                return await coro_fn(*args)
+            except Exception as e:
+                delay = self.next_delay(url, e, attempt)
+                if delay is None:
+                    raise
+            logger.info(f"{self.name}: retrying {url} in {delay:.1f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+            attempt += 1
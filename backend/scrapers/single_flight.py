@@ -0,0 +1,110 @@
+import asyncio
+import contextvars
+import copy
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Hashable, Optional
+
+# Group of the collection run the current task/thread belongs to
+_current_group: contextvars.ContextVar = contextvars.ContextVar('single_flight_group', default=None)
+
+class SingleFlightGroup:
+    """Coalesces identical calls made during one collection run.
+
+    The first caller of a key executes it; concurrent callers wait on the same
+    future and later callers get the stored result. Failures are not kept, so
+    the next caller after a failed call tries again. Works across scraper
+    threads and asyncio tasks alike.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.stats = defaultdict(lambda: {'calls': 0, 'executed': 0, 'coalesced': 0})
+
+    def _claim(self, kind: str, key: Hashable):
+        """Return (future, is_leader) for a call"""
+        with self._lock:
+            stats = self.stats[kind]
+            stats['calls'] += 1
+            future = self._calls.get((kind, key))
+            if future is not None and not (future.done() and future.exception() is not None):
+                stats['coalesced'] += 1
+                return future, False
+            future = Future()
+            self._calls[(kind, key)] = future
+            stats['executed'] += 1
+            return future, True
+
+    def do(self, kind: str, key: Hashable, fn, *args):
+        """Blocking single-flight call; returns (result, is_leader)"""
+        future, leader = self._claim(kind, key)
+        if not leader:
+            return future.result(), False
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result, True
+
+    async def do_async(self, kind: str, key: Hashable, coro_fn, *args):
+        """Async single-flight call; returns (result, is_leader)"""
+        future, leader = self._claim(kind, key)
+        if not leader:
+            return await asyncio.wrap_future(future), False
+        try:
+            result = await coro_fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result, True
+
+    def get_report(self) -> Dict:
+        with self._lock:
+            report = {kind: dict(stats) for kind, stats in self.stats.items()}
+        report['calls_saved'] = sum(stats['coalesced'] for stats in self.stats.values())
+        return report
+
+    def format_report(self) -> str:
+        report = self.get_report()
+        parts = [
+            f"{kind}: {stats['calls']} calls, {stats['executed']} executed, {stats['coalesced']} shared"
+            for kind, stats in report.items() if kind != 'calls_saved'
+        ]
+        return f"Single-flight ({self.name}): " + ('; '.join(parts) or 'no calls') + \
+            f" - {report['calls_saved']} duplicate calls saved"
+
+@contextmanager
+def single_flight_run(name: str):
+    """Coalesce identical requests and scrape calls made inside this block"""
+    group = SingleFlightGroup(name)
+    token = _current_group.set(group)
+    try:
+        yield group
+    finally:
+        _current_group.reset(token)
+
+def current_group() -> Optional[SingleFlightGroup]:
+    return _current_group.get()
+
+def run_single_flight(kind: str, key: Hashable, fn, *args, copy_result: bool = False):
+    """Call fn(*args) through the current run's group, or directly outside a run"""
+    group = _current_group.get()
+    if group is None:
+        return fn(*args)
+    result, leader = group.do(kind, key, fn, *args)
+    return copy.deepcopy(result) if copy_result and not leader else result
+
+async def run_single_flight_async(kind: str, key: Hashable, coro_fn, *args, copy_result: bool = False):
+    """Async variant of run_single_flight"""
+    group = _current_group.get()
+    if group is None:
+        return await coro_fn(*args)
+    result, leader = await group.do_async(kind, key, coro_fn, *args)
+    return copy.deepcopy(result) if copy_result and not leader else result
@@ -2,7 +2,7 @@ import json
 import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from loguru import logger
 from .base_scraper import BaseScraper
 from models.data_models import Match, Team, MatchStatus, OddsData, Statistics
@@ -10,6 +10,9 @@ from models.data_models import Match, Team, MatchStatus, OddsData, Statistics
 class SofaScoreScraper(BaseScraper):
     """Scraper for SofaScore website"""
     
+    source_key = 'sofascore'
+    archive_parsers = {'matches': '_parse_matches_page'}
+    
     def __init__(self):
         super().__init__("SofaScore", "https://www.sofascore.com")
         self.api_base = "https://api.sofascore.com"
@@ -35,26 +38,8 @@ class SofaScoreScraper(BaseScraper):
                 date_str = date_from.strftime("%Y-%m-%d")
                 url += f"/fixtures/{date_str}"
             
-            response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            matches = []
-            
-            # Find match containers - try multiple selectors
-            match_containers = soup.find_all('div', class_='sc-fqkvVR')
-            if not match_containers:
-                match_containers = soup.find_all('div', class_='sc-jQrLum')
-            if not match_containers:
-                match_containers = soup.find_all('div', class_='sc-eCssSg')
-            
-            for container in match_containers:
-                try:
-                    match_data = self._parse_match_container(container)
-                    if match_data:
-                        matches.append(match_data)
-                except Exception as e:
-                    logger.error(f"Error parsing match container: {e}")
-                    continue
+            response = self._make_request(url, page_type='matches')
+            matches = self._parse_matches_page(response.content)
             
             logger.info(f"Scraped {len(matches)} matches from SofaScore")
             return matches
@@ -63,6 +48,30 @@ class SofaScoreScraper(BaseScraper):
             logger.error(f"Error scraping matches from SofaScore: {e}")
             return []
     
+    def _parse_matches_page(self, content: bytes) -> List[Dict]:
+        """Parse the match containers of a fixtures page"""
+        soup = self._parse_html(content, SoupStrainer('div', class_=['sc-fqkvVR', 'sc-jQrLum', 'sc-eCssSg']))
+        
+        matches = []
+        
+        # Find match containers - try multiple selectors
+        match_containers = soup.find_all('div', class_='sc-fqkvVR')
+        if not match_containers:
+            match_containers = soup.find_all('div', class_='sc-jQrLum')
+        if not match_containers:
+            match_containers = soup.find_all('div', class_='sc-eCssSg')
+        
+        for container in match_containers:
+            try:
+                match_data = self._parse_match_container(container)
+                if match_data:
+                    matches.append(match_data)
+            except Exception as e:
+                logger.error(f"Error parsing match container: {e}")
+                continue
+        
+        return matches
+    
     def _parse_match_container(self, container) -> Optional[Dict]:
         """Parse individual match container"""
         try:
@@ -132,7 +141,7 @@ class SofaScoreScraper(BaseScraper):
             # SofaScore team URL structure
             url = f"{self.base_url}/team/{team_id}"
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('div', class_=['sc-kDvujY', 'sc-eCssSg']))
             
             stats = {}
             
@@ -185,7 +194,7 @@ class SofaScoreScraper(BaseScraper):
             # SofaScore H2H URL structure
             url = f"{self.base_url}/h2h/{team1_id}/{team2_id}"
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('div', class_='sc-fqkvVR'))
             
             h2h_data = {
                 'total_matches': 0,
@@ -255,7 +264,7 @@ class SofaScoreScraper(BaseScraper):
             # SofaScore odds URL structure
             url = f"{self.base_url}/match/{match_id}/odds"
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('div', class_='sc-eCssSg'))
             
             odds_data = {
                 'home_win': None,
@@ -322,7 +331,7 @@ class SofaScoreScraper(BaseScraper):
             # SofaScore live match URL
             url = f"{self.base_url}/match/{match_id}"
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer('div', class_=['sc-gsFSXq', 'sc-hLBbgP', 'sc-kDvujY']))
             
             live_data = {
                 'minute': None,
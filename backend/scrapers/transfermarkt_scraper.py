@@ -1,21 +1,33 @@
 from .base_scraper import BaseScraper
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Iterable, Iterator, Union
 from loguru import logger
-from bs4 import BeautifulSoup, Tag
+from bs4 import SoupStrainer, Tag
+from config.settings import DATA_SOURCES, COLLECTION_CONFIG
 import re
 
+# URL slug of each competition (Transfermarkt routes on the wettbewerb id)
+LEAGUE_SLUGS = {
+    'ES1': 'laliga',
+    'GB1': 'premier-league',
+    'IT1': 'serie-a',
+    'L1': 'bundesliga',
+    'FR1': 'ligue-1',
+}
+
 class TransfermarktScraper(BaseScraper):
     """Scraper para Transfermarkt: traspasos, valores de mercado y plantillas"""
+    source_key = 'transfermarkt'
     def __init__(self):
         super().__init__("Transfermarkt", "https://www.transfermarkt.com")
 
     def scrape_transfers(self, league_id: str = "ES1", season: str = "2024", limit: int = 20) -> List[Dict[str, Any]]:
         """Scrapea los traspasos recientes de LaLiga desde Transfermarkt"""
-        url = f"https://www.transfermarkt.com/laliga/transfers/wettbewerb/{league_id}/plus/?saison_id={season}"
+        url = f"https://www.transfermarkt.com/{LEAGUE_SLUGS.get(league_id, 'wettbewerb')}/transfers/wettbewerb/{league_id}/plus/?saison_id={season}"
         logger.info(f"Scraping traspasos de {url}")
         try:
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_html(response.content, SoupStrainer(['div', 'table'], class_=['table-header', 'items']))
             transfers = []
             # Buscar la tabla de traspasos (puede haber varias, nos interesa la de 'Arrivals' y 'Departures')
             tables = soup.find_all('table', class_='items')
@@ -60,137 +72,133 @@ class TransfermarktScraper(BaseScraper):
             logger.error(f"Error scraping traspasos Transfermarkt: {e}")
             return []
 
-    def scrape_market_values(self, league_id: str = "ES1", season: str = "2024") -> List[Dict[str, Any]]:
-        """Scrapea valores de mercado de equipos y jugadores de LaLiga desde Transfermarkt"""
-        url = f"https://www.transfermarkt.com/laliga/startseite/wettbewerb/{league_id}/plus/?saison_id={season}"
-        logger.info(f"Scraping valores de mercado de {url}")
-        try:
-            response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            teams = []
-            table = soup.find('table', class_='items')
-            if not table:
-                logger.warning("No se encontró la tabla de equipos en Transfermarkt")
-                return []
-            tbody = table.find('tbody')
-            if not (tbody and isinstance(tbody, Tag)):
-                logger.warning("No se encontró el tbody de la tabla de equipos en Transfermarkt")
-                return []
-            rows = [row for row in tbody.find_all('tr', recursive=False) if isinstance(row, Tag) and row.find_all('td')]
-            for row in rows:
-                cols = row.find_all('td')
-                if len(cols) < 5:
-                    continue
-                # Equipo
-                team_name = cols[1].get_text(strip=True)
-                # Valor de mercado del equipo
-                team_value = cols[-1].get_text(strip=True)
-                # Enlace a la plantilla para scraping de jugadores
-                team_link = cols[1].find('a')['href'] if cols[1].find('a') else None
-                players = []
-                if team_link:
-                    team_url = f"https://www.transfermarkt.com{team_link}"
-                    try:
-                        team_resp = self._make_request(team_url)
-                        team_soup = BeautifulSoup(team_resp.content, 'html.parser')
-                        player_table = team_soup.find('table', class_='items')
-                        if player_table:
-                            pbody = player_table.find('tbody')
-                            if not (pbody and isinstance(pbody, Tag)):
-                                continue
-                            player_rows = [prow for prow in pbody.find_all('tr', recursive=False) if isinstance(prow, Tag) and prow.find_all('td')]
-                            for prow in player_rows:
-                                pcols = prow.find_all('td')
-                                if len(pcols) < 7:
-                                    continue
-                                player_name = pcols[1].get_text(strip=True)
-                                position = pcols[4].get_text(strip=True)
-                                age = pcols[5].get_text(strip=True)
-                                nationality = pcols[2].find('img')['title'] if pcols[2].find('img') else ''
-                                market_value = pcols[-1].get_text(strip=True)
-                                players.append({
-                                    'name': player_name,
-                                    'position': position,
-                                    'age': age,
-                                    'nationality': nationality,
-                                    'market_value': market_value
-                                })
-                    except Exception as e:
-                        logger.warning(f"Error scraping plantilla de {team_name}: {e}")
-                teams.append({
-                    'team': team_name,
-                    'team_value': team_value,
-                    'players': players
-                })
-            logger.info(f"Scrapeados valores de mercado de {len(teams)} equipos de LaLiga")
-            return teams
-        except Exception as e:
-            logger.error(f"Error scraping valores de mercado Transfermarkt: {e}")
+    def _league_url(self, league_id: str, season: str) -> str:
+        slug = LEAGUE_SLUGS.get(league_id, 'wettbewerb')
+        return f"https://www.transfermarkt.com/{slug}/startseite/wettbewerb/{league_id}/plus/?saison_id={season}"
+
+    def _parse_league_table(self, content: bytes) -> List[Dict[str, Any]]:
+        """Equipos de la tabla de la liga: nombre, valor de mercado y enlace a la plantilla"""
+        soup = self._parse_html(content, SoupStrainer('table', class_='items'))
+        table = soup.find('table', class_='items')
+        if not table:
+            logger.warning("No se encontró la tabla de equipos en Transfermarkt")
+            return []
+        tbody = table.find('tbody')
+        if not (tbody and isinstance(tbody, Tag)):
+            logger.warning("No se encontró el tbody de la tabla de equipos en Transfermarkt")
+            return []
+        teams = []
+        rows = [row for row in tbody.find_all('tr', recursive=False) if isinstance(row, Tag) and row.find_all('td')]
+        for row in rows:
+            cols = row.find_all('td')
+            if len(cols) < 5:
+                continue
+            team_link = cols[1].find('a')['href'] if cols[1].find('a') else None
+            teams.append({
+                'team': cols[1].get_text(strip=True),
+                'team_value': cols[-1].get_text(strip=True),
+                'team_url': f"https://www.transfermarkt.com{team_link}" if team_link else None
+            })
+        return teams
+
+    def _parse_squad_page(self, content: bytes) -> List[Dict[str, Any]]:
+        """Jugadores de la página de plantilla de un equipo"""
+        soup = self._parse_html(content, SoupStrainer('table', class_='items'))
+        player_table = soup.find('table', class_='items')
+        if not player_table:
+            return []
+        pbody = player_table.find('tbody')
+        if not (pbody and isinstance(pbody, Tag)):
             return []
+        players = []
+        player_rows = [prow for prow in pbody.find_all('tr', recursive=False) if isinstance(prow, Tag) and prow.find_all('td')]
+        for prow in player_rows:
+            pcols = prow.find_all('td')
+            if len(pcols) < 7:
+                continue
+            players.append({
+                'name': pcols[1].get_text(strip=True),
+                'position': pcols[4].get_text(strip=True),
+                'age': pcols[5].get_text(strip=True),
+                'nationality': pcols[2].find('img')['title'] if pcols[2].find('img') else '',
+                'market_value': pcols[-1].get_text(strip=True)
+            })
+        return players
 
-    def scrape_squads(self, league_id: str = "ES1", season: str = "2024") -> List[Dict[str, Any]]:
-        """Scrapea plantillas de equipos de LaLiga desde Transfermarkt"""
-        from bs4 import BeautifulSoup, Tag
-        url = f"https://www.transfermarkt.com/laliga/startseite/wettbewerb/{league_id}/plus/?saison_id={season}"
-        logger.info(f"Scraping plantillas de {url}")
+    def _fetch_league_table(self, league_id: str, season: str) -> List[Dict[str, Any]]:
+        url = self._league_url(league_id, season)
+        logger.info(f"Scraping equipos de {url}")
+        response = self._make_request(url, page_type='league_table')
+        return self._parse_league_table(response.content)
+
+    def _fetch_squad(self, league_id: str, season: str, team: Dict[str, Any]) -> Dict[str, Any]:
+        players = []
+        if team['team_url']:
+            try:
+                response = self._make_request(team['team_url'], page_type='squad')
+                players = self._parse_squad_page(response.content)
+            except Exception as e:
+                logger.warning(f"Error scraping plantilla de {team['team']}: {e}")
+        return {
+            'league_id': league_id,
+            'season': season,
+            'team': team['team'],
+            'team_value': team['team_value'],
+            'players': players
+        }
+
+    def iter_squads(self, league_ids: Union[str, Iterable[str]] = "ES1",
+                    seasons: Union[str, Iterable[str]] = "2024") -> Iterator[Dict[str, Any]]:
+        """Genera la plantilla de cada equipo en cuanto se descarga y parsea.
+
+        Las tablas de todas las ligas/temporadas y las páginas de plantilla se
+        piden en paralelo, limitadas por max_concurrency de la fuente; el
+        rate limiter compartido sigue marcando el ritmo por host. El orden de
+        salida es el de llegada, no el de la tabla.
+        """
+        league_ids = [league_ids] if isinstance(league_ids, str) else list(league_ids)
+        seasons = [seasons] if isinstance(seasons, str) else list(seasons)
+        max_workers = DATA_SOURCES[self.source_key].get('max_concurrency', COLLECTION_CONFIG['default_concurrency'])
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='transfermarkt')
         try:
-            response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            squads = []
-            table = soup.find('table', class_='items')
-            if not table:
-                logger.warning("No se encontró la tabla de equipos en Transfermarkt")
-                return []
-            tbody = table.find('tbody')
-            if not (tbody and isinstance(tbody, Tag)):
-                logger.warning("No se encontró el tbody de la tabla de equipos en Transfermarkt")
-                return []
-            rows = [row for row in tbody.find_all('tr', recursive=False) if isinstance(row, Tag) and row.find_all('td')]
-            for row in rows:
-                cols = row.find_all('td')
-                if len(cols) < 5:
-                    continue
-                team_name = cols[1].get_text(strip=True)
-                team_link = cols[1].find('a')['href'] if cols[1].find('a') else None
-                players = []
-                if team_link:
-                    team_url = f"https://www.transfermarkt.com{team_link}"
+            pending = {
+                executor.submit(self._fetch_league_table, league_id, season): ('table', league_id, season)
+                for league_id in league_ids for season in seasons
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, league_id, season = pending.pop(future)
+                    if kind == 'squad':
+                        yield future.result()
+                        continue
                     try:
-                        team_resp = self._make_request(team_url)
-                        team_soup = BeautifulSoup(team_resp.content, 'html.parser')
-                        player_table = team_soup.find('table', class_='items')
-                        if player_table:
-                            pbody = player_table.find('tbody')
-                            if not (pbody and isinstance(pbody, Tag)):
-                                continue
-                            player_rows = [prow for prow in pbody.find_all('tr', recursive=False) if isinstance(prow, Tag) and prow.find_all('td')]
-                            for prow in player_rows:
-                                pcols = prow.find_all('td')
-                                if len(pcols) < 7:
-                                    continue
-                                player_name = pcols[1].get_text(strip=True)
-                                position = pcols[4].get_text(strip=True)
-                                age = pcols[5].get_text(strip=True)
-                                nationality = pcols[2].find('img')['title'] if pcols[2].find('img') else ''
-                                market_value = pcols[-1].get_text(strip=True)
-                                players.append({
-                                    'name': player_name,
-                                    'position': position,
-                                    'age': age,
-                                    'nationality': nationality,
-                                    'market_value': market_value
-                                })
+                        teams = future.result()
                     except Exception as e:
-                        logger.warning(f"Error scraping plantilla de {team_name}: {e}")
-                squads.append({
-                    'team': team_name,
-                    'players': players
-                })
-            logger.info(f"Scrapeadas plantillas de {len(squads)} equipos de LaLiga")
-            return squads
-        except Exception as e:
-            logger.error(f"Error scraping plantillas Transfermarkt: {e}")
-            return []
+                        logger.error(f"Error scraping tabla de {league_id} {season} en Transfermarkt: {e}")
+                        continue
+                    logger.info(f"{len(teams)} equipos en {league_id} {season}, descargando plantillas")
+                    for team in teams:
+                        pending[executor.submit(self._fetch_squad, league_id, season, team)] = ('squad', league_id, season)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def scrape_market_values(self, league_id: Union[str, Iterable[str]] = "ES1",
+                             season: Union[str, Iterable[str]] = "2024") -> List[Dict[str, Any]]:
+        """Scrapea valores de mercado de equipos y jugadores desde Transfermarkt (una o varias ligas/temporadas)"""
+        teams = list(self.iter_squads(league_id, season))
+        logger.info(f"Scrapeados valores de mercado de {len(teams)} equipos")
+        return teams
+
+    def scrape_squads(self, league_id: Union[str, Iterable[str]] = "ES1",
+                      season: Union[str, Iterable[str]] = "2024") -> List[Dict[str, Any]]:
+        """Scrapea plantillas de equipos desde Transfermarkt (una o varias ligas/temporadas)"""
+        squads = [
+            {'league_id': squad['league_id'], 'season': squad['season'], 'team': squad['team'], 'players': squad['players']}
+            for squad in self.iter_squads(league_id, season)
+        ]
+        logger.info(f"Scrapeadas plantillas de {len(squads)} equipos")
+        return squads
 
     def scrape_matches(self, league_id: str, date_from, date_to) -> List[Dict]:
         """Stub: Transfermarkt no provee partidos directamente, devolver lista vacía"""
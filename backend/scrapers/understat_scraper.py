@@ -1,102 +1,187 @@
-import requests
-from bs4 import BeautifulSoup, Tag
 from loguru import logger
-from typing import List, Dict, Any
+from utils.http_client import http_client
+from utils.columnar_store import ColumnarStore, xg_store
+from config.settings import UNDERSTAT_CONFIG
+from typing import List, Dict, Any, Iterable, Optional, Union
+import asyncio
 import re
 import json
 
+# Bloques JSON.parse('...') incrustados en las páginas de Understat
+_JSON_BLOCKS = {
+    name: re.compile(rf"{name}\s*=\s*JSON\.parse\('([^']+)'\)")
+    for name in ('teamsData', 'datesData', 'match_info', 'shotsData')
+}
+
+def _extract_json(html: str, name: str) -> Optional[Any]:
+    """Extrae y decodifica un bloque JSON.parse de la página"""
+    raw = _JSON_BLOCKS[name].search(html)
+    if not raw:
+        return None
+    return json.loads(raw.group(1).encode('utf-8').decode('unicode_escape'))
+
+def _as_list(value: Union[str, Iterable[str]]) -> List[str]:
+    return [value] if isinstance(value, str) else list(value)
+
 class UnderstatScraper:
     """Scraper para Understat: xG, xGA, xPoints, tiros, conversiones, etc."""
     BASE_URL = "https://understat.com"
 
+    def _parse_team_stats(self, teams_data: Dict, season: str) -> List[Dict[str, Any]]:
+        """Convierte teamsData en filas de estadísticas por equipo"""
+        equipos = []
+        for team_name, seasons in teams_data.items():
+            if season not in seasons:
+                continue
+            data = seasons[season]
+            equipos.append({
+                'team': team_name,
+                'id': data.get('id'),
+                'matches': int(data.get('matches', 0)),
+                'wins': int(data.get('wins', 0)),
+                'draws': int(data.get('draws', 0)),
+                'loses': int(data.get('loses', 0)),
+                'goals': float(data.get('goals', 0)),
+                'xG': float(data.get('xG', 0)),
+                'xGA': float(data.get('xGA', 0)),
+                'xPoints': float(data.get('xPoints', 0)),
+                'shots': int(data.get('shots', 0)),
+                'shotsOnTarget': int(data.get('shotsOnTarget', 0)),
+                'deep': int(data.get('deep', 0)),
+                'ppda': float(data.get('ppda', {}).get('att', 0)),
+                'ppda_allowed': float(data.get('ppda_allowed', {}).get('att', 0)),
+                'fouls': int(data.get('fouls', 0)),
+                'corners': int(data.get('corners', 0)),
+                'yellow_cards': int(data.get('yellow_cards', 0)),
+                'red_cards': int(data.get('red_cards', 0)),
+                'result_form': data.get('form', ''),
+            })
+        return equipos
+
+    def _parse_league_matches(self, dates_data: List[Dict]) -> List[Dict[str, Any]]:
+        """Convierte datesData (calendario de la liga) en filas de xG por partido"""
+        partidos = []
+        for match in dates_data:
+            played = bool(match.get('isResult'))
+            goals = match.get('goals') or {}
+            xg = match.get('xG') or {}
+            partidos.append({
+                'match_id': match.get('id'),
+                'date': match.get('datetime'),
+                'home_team': (match.get('h') or {}).get('title'),
+                'away_team': (match.get('a') or {}).get('title'),
+                'is_result': played,
+                'home_goals': int(goals['h']) if played and goals.get('h') is not None else None,
+                'away_goals': int(goals['a']) if played and goals.get('a') is not None else None,
+                'home_xG': float(xg['h']) if played and xg.get('h') is not None else None,
+                'away_xG': float(xg['a']) if played and xg.get('a') is not None else None,
+            })
+        return partidos
+
+    def _parse_league_page(self, html: str, league: str, season: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Equipos y partidos de una página de liga/temporada, etiquetados con liga y temporada"""
+        teams_data = _extract_json(html, 'teamsData')
+        if teams_data is None:
+            logger.error(f"No se encontró el bloque de teamsData para {league} {season}")
+        dates_data = _extract_json(html, 'datesData') or []
+        tables = {
+            'teams': self._parse_team_stats(teams_data or {}, season),
+            'matches': self._parse_league_matches(dates_data),
+        }
+        for rows in tables.values():
+            for row in rows:
+                row['league'] = league
+                row['season'] = season
+        return tables
+
     def scrape_team_stats(self, league: str = "La_liga", season: str = "2023") -> List[Dict[str, Any]]:
         """Scrapea estadísticas avanzadas de equipos de una liga y temporada"""
         url = f"{self.BASE_URL}/league/{league}/{season}"
         logger.info(f"Scraping equipos de {url}")
         try:
-            response = requests.get(url)
+            response = http_client.get(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            # Buscar el bloque de datos de equipos (JavaScript)
-            script = soup.find('script', text=re.compile('teamsData'))
-            if not script:
+            teams_data = _extract_json(response.text, 'teamsData')
+            if teams_data is None:
                 logger.error("No se encontró el bloque de teamsData en la página de Understat")
                 return []
-            # Extraer el JSON de teamsData
-            raw = re.search(r"teamsData\s+=\s+JSON.parse\('([^']+)'\)", script.string)
-            if not raw:
-                logger.error("No se pudo extraer el JSON de teamsData")
-                return []
-            json_data = raw.group(1).encode('utf-8').decode('unicode_escape')
-            teams_data = json.loads(json_data)
-            equipos = []
-            for team_name, seasons in teams_data.items():
-                if season not in seasons:
-                    continue
-                data = seasons[season]
-                equipos.append({
-                    'team': team_name,
-                    'id': data.get('id'),
-                    'matches': int(data.get('matches', 0)),
-                    'wins': int(data.get('wins', 0)),
-                    'draws': int(data.get('draws', 0)),
-                    'loses': int(data.get('loses', 0)),
-                    'goals': float(data.get('goals', 0)),
-                    'xG': float(data.get('xG', 0)),
-                    'xGA': float(data.get('xGA', 0)),
-                    'xPoints': float(data.get('xPoints', 0)),
-                    'shots': int(data.get('shots', 0)),
-                    'shotsOnTarget': int(data.get('shotsOnTarget', 0)),
-                    'deep': int(data.get('deep', 0)),
-                    'ppda': float(data.get('ppda', {}).get('att', 0)),
-                    'ppda_allowed': float(data.get('ppda_allowed', {}).get('att', 0)),
-                    'fouls': int(data.get('fouls', 0)),
-                    'corners': int(data.get('corners', 0)),
-                    'yellow_cards': int(data.get('yellow_cards', 0)),
-                    'red_cards': int(data.get('red_cards', 0)),
-                    'result_form': data.get('form', ''),
-                })
+            equipos = self._parse_team_stats(teams_data, season)
             logger.info(f"Scrapeados {len(equipos)} equipos de Understat para {league} {season}")
             return equipos
         except Exception as e:
             logger.error(f"Error scraping Understat: {e}")
             return []
 
+    async def _fetch_league_page(self, league: str, season: str,
+                                 semaphore: asyncio.Semaphore) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        url = f"{self.BASE_URL}/league/{league}/{season}"
+        try:
+            async with semaphore:
+                response = await http_client.get_async(url)
+            response.raise_for_status()
+            tables = self._parse_league_page(response.text, league, season)
+            logger.info(f"Understat {league} {season}: {len(tables['teams'])} equipos, {len(tables['matches'])} partidos")
+            return tables
+        except Exception as e:
+            logger.error(f"Error scraping Understat {league} {season}: {e}")
+            return None
+
+    async def scrape_bulk_async(self, leagues: Union[str, Iterable[str]],
+                                seasons: Union[str, Iterable[str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Descarga en paralelo todas las combinaciones liga/temporada.
+
+        Devuelve {'teams': [...], 'matches': [...]} con columnas league y
+        season; las páginas que fallan se registran y se omiten.
+        """
+        semaphore = asyncio.Semaphore(UNDERSTAT_CONFIG['max_concurrency'])
+        pages = await asyncio.gather(*(
+            self._fetch_league_page(league, str(season), semaphore)
+            for league in _as_list(leagues)
+            for season in _as_list(seasons)
+        ))
+        result = {'teams': [], 'matches': []}
+        for tables in pages:
+            if tables:
+                for table, rows in tables.items():
+                    result[table].extend(rows)
+        return result
+
+    def scrape_bulk(self, leagues: Union[str, Iterable[str]], seasons: Union[str, Iterable[str]],
+                    store: Optional[ColumnarStore] = xg_store) -> Dict[str, List[Dict[str, Any]]]:
+        """Versión bloqueante de scrape_bulk_async que además guarda las tablas de xG.
+
+        Cada liga/temporada se escribe como una partición del almacén columnar
+        (store=None para no guardar nada).
+        """
+        async def run():
+            try:
+                return await self.scrape_bulk_async(leagues, seasons)
+            finally:
+                await http_client.close_async()
+
+        result = asyncio.run(run())
+        if store is not None:
+            for table, rows in result.items():
+                partitions = store.write_partitions(f"understat_{table}", rows)
+                logger.info(f"Guardadas {len(rows)} filas de understat_{table} en {partitions} particiones")
+        return result
+
     def scrape_match_stats(self, match_id: str) -> Dict[str, Any]:
         url = f"{self.BASE_URL}/match/{match_id}"
         logger.info(f"Scraping partido de {url}")
         try:
-            response = requests.get(url)
+            response = http_client.get(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            # Buscar el bloque de datos de partido (JavaScript)
-            script = soup.find('script', text=re.compile('match_info'))
-            if not (script and isinstance(script, Tag) and hasattr(script, 'string') and script.string):
+            html = response.text
+            # Extraer el JSON de match_info (es una lista con un dict)
+            match_info = _extract_json(html, 'match_info')
+            if not match_info:
                 logger.error("No se encontró el bloque de match_info en la página de Understat")
                 return {}
-            # Extraer el JSON de match_info
-            raw = re.search(r"match_info\s+=\s+JSON.parse\('([^']+)'\)", str(script.string or ''))
-            if not raw:
-                logger.error("No se pudo extraer el JSON de match_info")
-                return {}
-            json_data = raw.group(1).encode('utf-8').decode('unicode_escape')
-            match_info = json.loads(json_data)[0]  # Es una lista con un dict
-            # Buscar el bloque de datos de equipos (JavaScript)
-            script_teams = soup.find('script', text=re.compile('teamsData'))
-            teams_data = {}
-            if script_teams and isinstance(script_teams, Tag) and hasattr(script_teams, 'string') and script_teams.string:
-                raw_teams = re.search(r"teamsData\s+=\s+JSON.parse\('([^']+)'\)", str(script_teams.string or ''))
-                if raw_teams:
-                    json_teams = raw_teams.group(1).encode('utf-8').decode('unicode_escape')
-                    teams_data = json.loads(json_teams)
-            # Buscar el bloque de datos de eventos (shots)
-            script_shots = soup.find('script', text=re.compile('shotsData'))
-            shots_data = []
-            if script_shots and isinstance(script_shots, Tag) and hasattr(script_shots, 'string') and script_shots.string:
-                raw_shots = re.search(r"shotsData\s+=\s+JSON.parse\('([^']+)'\)", str(script_shots.string or ''))
-                if raw_shots:
-                    json_shots = raw_shots.group(1).encode('utf-8').decode('unicode_escape')
-                    shots_data = json.loads(json_shots)
+            match_info = match_info[0]
+            teams_data = _extract_json(html, 'teamsData') or {}
+            # Bloque de datos de eventos (shots)
+            shots_data = _extract_json(html, 'shotsData') or []
             # Resumir datos principales
             result = {
                 'match_id': match_id,
@@ -117,4 +202,4 @@ class UnderstatScraper:
             return result
         except Exception as e:
             logger.error(f"Error scraping partido Understat: {e}")
-            return {} 
\ No newline at end of file
+            return {}
@@ -1,6 +1,6 @@
-import requests
 import json
 import os
+from utils.http_client import http_client
 
 # Ruta de salida
 OUTPUT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'sportmonks_fixtures.json')
@@ -18,7 +18,7 @@ def get_fixtures():
         'per_page': 10  # Cambia este valor según lo que necesites
     }
     try:
-        resp = requests.get(url, params=params)
+        resp = http_client.get(url, params=params)
         resp.raise_for_status()
         return {'source': 'sportmonks', 'data': resp.json()}
     except Exception as e:
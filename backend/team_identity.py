@@ -0,0 +1,152 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+from loguru import logger
+from config.settings import TEAM_IDENTITY_CONFIG
+
+# Club-type tokens dropped when looking for a looser match ('FC Barcelona' -> 'barcelona').
+# Words that tell clubs apart ('real', 'city', 'united', 'sc', ...) are deliberately kept.
+AFFIX_TOKENS = {'fc', 'cf', 'cd', 'ud', 'sd', 'rcd', 'rc', 'ca', 'afc', 'club', 'de', 'the'}
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse spaces"""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(_NON_ALNUM.sub(' ', ascii_name.lower()).split())
+
+def strip_affixes(normalized: str) -> str:
+    tokens = [token for token in normalized.split() if token not in AFFIX_TOKENS]
+    return ' '.join(tokens) if tokens else normalized
+
+class TeamIdentityIndex:
+    """Maps every source's spelling of a team to one canonical team id.
+
+    Spellings come from the alias table (data/team_aliases.json). A name is
+    matched on its normalised form first, then on its form without club
+    affixes as long as that is not shared by two teams. Lookups are memoised
+    per (source, name), so grouping costs a dictionary hit per match once a
+    name has been seen. Names the table does not know get a stable id of
+    their own and are recorded for curation.
+    """
+
+    def __init__(self, aliases_file: str = TEAM_IDENTITY_CONFIG['aliases_file'],
+                 unknown_file: str = TEAM_IDENTITY_CONFIG['unknown_file']):
+        self.aliases_file = aliases_file
+        self.unknown_file = unknown_file
+        self.names: Dict[str, str] = {}
+        self._exact: Dict[str, str] = {}
+        self._loose: Dict[str, Set[str]] = {}
+        self._by_source: Dict[Tuple[str, str], str] = {}
+        self._cache: Dict[Tuple[Optional[str], str], str] = {}
+        self.unknown: Dict[Tuple[str, str], Dict] = {}
+        self._unknown_written = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def _add_alias(self, team_id: str, alias: str):
+        normalized = normalize_name(alias)
+        previous = self._exact.setdefault(normalized, team_id)
+        if previous != team_id:
+            logger.warning(f"Team alias '{alias}' is listed for both {previous} and {team_id}")
+        self._loose.setdefault(strip_affixes(normalized), set()).add(team_id)
+
+    def load(self):
+        """(Re)load the alias table"""
+        try:
+            with open(self.aliases_file, 'r', encoding='utf-8') as f:
+                teams = json.load(f).get('teams', {})
+        except FileNotFoundError:
+            logger.warning(f"Team alias table not found: {self.aliases_file}")
+            teams = {}
+        with self._lock:
+            self.names, self._exact, self._loose, self._by_source, self._cache = {}, {}, {}, {}, {}
+            for team_id, team in teams.items():
+                self.names[team_id] = team['name']
+                self._add_alias(team_id, team_id.replace('-', ' '))
+                for alias in [team['name'], *team.get('aliases', [])]:
+                    self._add_alias(team_id, alias)
+                for source, aliases in team.get('source_aliases', {}).items():
+                    for alias in aliases:
+                        self._by_source[(source, normalize_name(alias))] = team_id
+        logger.info(f"Loaded {len(self.names)} canonical teams ({len(self._exact)} spellings)")
+
+    def _lookup(self, normalized: str, source: Optional[str]) -> Optional[str]:
+        if source and (source, normalized) in self._by_source:
+            return self._by_source[(source, normalized)]
+        if normalized in self._exact:
+            return self._exact[normalized]
+        candidates = self._loose.get(strip_affixes(normalized), ())
+        if len(candidates) == 1:
+            return next(iter(candidates))
+        return None
+
+    def resolve(self, name: str, source: Optional[str] = None, record_unknown: bool = True) -> str:
+        """Canonical id of a team name as spelled by a source.
+
+        With record_unknown=False an unknown name still gets its stable id but
+        is neither logged nor queued for curation (for names that are only
+        being compared, not collected).
+        """
+        cache_key = (source, name)
+        team_id = self._cache.get(cache_key)
+        if team_id is not None:
+            return team_id
+        normalized = normalize_name(name)
+        team_id = self._lookup(normalized, source)
+        if team_id is None:
+            # Unknown names still group consistently across sources that spell them alike
+            team_id = strip_affixes(normalized).replace(' ', '-')
+            if not record_unknown:
+                return team_id
+            with self._lock:
+                unknown_key = (source or 'unknown', name)
+                if unknown_key not in self.unknown:
+                    logger.warning(f"Unknown team name '{name}' from {source or 'unknown source'}")
+                    self.unknown[unknown_key] = {'seen': 0, 'suggested_id': team_id}
+                self.unknown[unknown_key]['seen'] += 1
+        self._cache[cache_key] = team_id
+        return team_id
+
+    def is_known(self, team_id: str) -> bool:
+        """True for ids from the alias table, False for ids made up for unknown names"""
+        return team_id in self.names
+
+    def display_name(self, team_id: str) -> Optional[str]:
+        return self.names.get(team_id)
+
+    def write_unknown(self):
+        """Merge the names waiting for curation into the unknown-names file"""
+        with self._lock:
+            if len(self.unknown) == self._unknown_written:
+                return
+            self._unknown_written = len(self.unknown)
+            current = {key: dict(entry) for key, entry in self.unknown.items()}
+        try:
+            with open(self.unknown_file, 'r', encoding='utf-8') as f:
+                saved = {(entry['source'], entry['name']): entry for entry in json.load(f).get('names', [])}
+        except (FileNotFoundError, ValueError):
+            saved = {}
+        for (source, name), entry in current.items():
+            if (source, name) not in saved:
+                saved[(source, name)] = {'source': source, 'name': name, **entry}
+            else:
+                saved[(source, name)]['seen'] = max(saved[(source, name)].get('seen', 0), entry['seen'])
+        # Names that have since been added to the alias table are dropped
+        names = [entry for entry in saved.values() if self._lookup(normalize_name(entry['name']), entry['source']) is None]
+        try:
+            tmp_path = f"{self.unknown_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'updated': datetime.now().isoformat(),
+                           'names': sorted(names, key=lambda entry: (entry['source'], entry['name']))},
+                          f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.unknown_file)
+        except OSError as e:
+            logger.error(f"Could not save unknown team names: {e}")
+
+# Shared by everything that groups matches by team
+team_index = TeamIdentityIndex()
@@ -0,0 +1,47 @@
+from sqlalchemy import create_engine, event, text
+from comprehensive_data_collector import BatchedMatchWriter
+
+def sqlite_engine(path):
+    engine = create_engine(f'sqlite:///{path}')
+
+    @event.listens_for(engine, 'connect')
+    def add_now(dbapi_connection, _):
+        dbapi_connection.create_function('NOW', 0, lambda: '2025-01-01 00:00:00')
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE comprehensive_matches (
+                id INTEGER PRIMARY KEY,
+                home_team VARCHAR(255) CHECK (length(home_team) <= 255),
+                away_team VARCHAR(255),
+                home_score INTEGER, away_score INTEGER,
+                match_date VARCHAR(32), league VARCHAR(255), source VARCHAR(64),
+                created_at TEXT, updated_at TEXT,
+                UNIQUE (home_team, away_team, match_date, league)
+            )
+        """))
+    return engine
+
+def match(home_team, day=1):
+    return {'home_team': home_team, 'away_team': 'Away', 'home_score': 1, 'away_score': 0,
+            'match_date': f'2025-01-{day:02d}', 'league': 'La Liga', 'source': 'test'}
+
+def test_one_bad_row_only_loses_itself(tmp_path):
+    engine = sqlite_engine(tmp_path / 'matches.db')
+    writer = BatchedMatchWriter(engine, batch_size=100)
+    writer.add_many([match(f'Team {i}', day=i % 28 + 1) for i in range(9)] + [match('X' * 300)])
+    assert writer.flush() == 9
+    assert writer.rows_lost == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM comprehensive_matches")).scalar() == 9
+
+def test_batches_are_upserted(tmp_path):
+    engine = sqlite_engine(tmp_path / 'matches.db')
+    writer = BatchedMatchWriter(engine, batch_size=100)
+    writer.add(match('Team'))
+    writer.flush()
+    writer.add({**match('Team'), 'home_score': 3})
+    assert writer.flush() == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT home_score FROM comprehensive_matches")).scalars().all() == [3]
+    assert writer.rows_lost == 0
@@ -0,0 +1,45 @@
+import httpx
+from scrapers import betsapi_scraper, retry_policy
+from scrapers.betsapi_scraper import BetsAPIScraper
+from scrapers.single_flight import single_flight_run
+
+def test_failed_request_is_not_shared_within_a_run(monkeypatch):
+    responses = [httpx.ConnectError('down'), httpx.Response(200, json={'results': [1]})]
+
+    def fake_get(url, **kwargs):
+        outcome = responses.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        outcome.request = httpx.Request('GET', url)
+        return outcome
+
+    monkeypatch.setattr(betsapi_scraper.http_client, 'get', fake_get)
+    monkeypatch.setattr(betsapi_scraper.page_archive, 'store', lambda *args: None)
+    scraper = BetsAPIScraper()
+    monkeypatch.setattr(scraper, '_rate_limit', lambda url: None)
+    # A single attempt, so the first request really fails
+    scraper.retry_policy.config = {**scraper.retry_policy.config, 'max_attempts': 1}
+    with single_flight_run('test'):
+        assert scraper._make_api_request('events', {'league_id': '1'}) == {}
+        assert scraper._make_api_request('events', {'league_id': '1'}) == {'results': [1]}
+        # The successful result is what later callers share
+        assert scraper._make_api_request('events', {'league_id': '1'}) == {'results': [1]}
+    assert not responses
+
+def test_api_requests_are_retried_and_counted(monkeypatch):
+    responses = [httpx.Response(503), httpx.Response(200, json={'results': [1]})]
+
+    def fake_get(url, **kwargs):
+        outcome = responses.pop(0)
+        outcome.request = httpx.Request('GET', url)
+        return outcome
+
+    monkeypatch.setattr(betsapi_scraper.http_client, 'get', fake_get)
+    monkeypatch.setattr(betsapi_scraper.page_archive, 'store', lambda *args: None)
+    monkeypatch.setattr(retry_policy.time, 'sleep', lambda delay: None)
+    scraper = BetsAPIScraper()
+    monkeypatch.setattr(scraper, '_rate_limit', lambda url: None)
+    assert scraper._make_api_request('events', {'league_id': '1'}) == {'results': [1]}
+    assert (scraper.request_count, scraper.error_count, scraper.success_count) == (2, 1, 1)
+    assert scraper.retry_policy.retries == 1
+    assert scraper.circuit_breaker.consecutive_failures == 0
@@ -0,0 +1,84 @@
+import httpx
+import pytest
+from config.settings import CIRCUIT_BREAKER_CONFIG
+from scrapers.circuit_breaker import CircuitBreaker
+
+CONFIG = {'failure_threshold': 1, 'window': 20, 'min_requests': 10, 'min_success_rate': 0.5, 'cooldown': 60}
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker('test', CONFIG)
+    breaker.record_failure()
+    breaker.opened_at -= CONFIG['cooldown']
+    return breaker
+
+def test_only_one_probe_at_a_time():
+    breaker = half_open_breaker()
+    assert breaker.acquire() is True
+    assert breaker.acquire() is None
+
+def test_released_probe_lets_the_next_request_probe():
+    breaker = half_open_breaker()
+    assert breaker.acquire() is True
+    breaker.release_probe()
+    assert breaker.acquire() is True
+
+def test_stale_probe_is_given_up_after_the_cooldown():
+    breaker = half_open_breaker()
+    assert breaker.acquire() is True
+    breaker._probe_started -= CONFIG['cooldown']
+    assert breaker.acquire() is True
+
+def test_release_after_an_outcome_is_a_no_op():
+    breaker = half_open_breaker()
+    assert breaker.acquire() is True
+    breaker.record_failure()
+    breaker.release_probe()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.acquire() is None
+
+def test_closed_circuit_requests_are_not_probes():
+    breaker = CircuitBreaker('test', CONFIG)
+    assert breaker.acquire() is False
+    assert breaker.allow_request()
+
+def status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request('GET', 'https://example.com/page')
+    return httpx.HTTPStatusError('error', request=request, response=httpx.Response(status_code, request=request))
+
+def test_client_errors_do_not_count():
+    breaker = CircuitBreaker('test', CONFIG)
+    breaker.record_failure(status_error(404))
+    breaker.record_failure(status_error(403))
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+
+@pytest.mark.parametrize('error', [status_error(429), status_error(503), httpx.ConnectTimeout('slow')])
+def test_host_failures_count(error):
+    breaker = CircuitBreaker('test', CONFIG)
+    breaker.record_failure(error)
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_failures_while_open_do_not_extend_the_cooldown():
+    breaker = CircuitBreaker('test', CONFIG)
+    breaker.record_failure()
+    opened_at = breaker.opened_at
+    breaker.record_failure(status_error(500))
+    assert breaker.opened_at == opened_at
+    assert breaker.trips == 1
+
+def test_missing_pages_do_not_open_a_healthy_source(monkeypatch):
+    from scrapers import base_scraper
+    from scrapers.betsapi_scraper import BetsAPIScraper
+
+    def not_found(url, **kwargs):
+        return httpx.Response(404, request=httpx.Request('GET', url))
+
+    monkeypatch.setattr(base_scraper.http_client, 'get', not_found)
+    monkeypatch.setitem(base_scraper.CACHE_CONFIG, 'enabled', False)
+    scraper = BetsAPIScraper()
+    monkeypatch.setattr(scraper, '_rate_limit', lambda url: None)
+    for page in range(CIRCUIT_BREAKER_CONFIG['failure_threshold'] + 1):
+        with pytest.raises(httpx.HTTPStatusError):
+            scraper._fetch(f'https://example.com/missing/{page}')
+    assert scraper.circuit_breaker.state == CircuitBreaker.CLOSED
+    assert scraper.error_count == CIRCUIT_BREAKER_CONFIG['failure_threshold'] + 1
@@ -0,0 +1,96 @@
+import copy
+import random
+from datetime import datetime, timedelta
+import pytest
+from data_validator import DataValidator
+
+TEAMS = ['Real Madrid', 'FC Barcelona', 'Sevilla FC', 'Valencia CF', 'Villarreal', 'Getafe CF', 'Real Betis',
+         'Athletic Club', 'Girona FC', 'Osasuna', 'Liverpool', 'Arsenal', 'Chelsea', 'Juventus', 'Inter']
+SOURCES = ['laliga_official', 'promiedos', 'flashscore', 'sofascore', 'betsapi', 'transfermarkt']
+
+def sample_matches(count: int = 300, seed: int = 3):
+    """Fixtures reported by a random set of sources, with the usual defects mixed in"""
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    matches = []
+    for k in range(count):
+        home_team, away_team = rng.sample(TEAMS, 2)
+        day = now + timedelta(days=rng.randint(-3, 10), hours=rng.randint(0, 23))
+        for source in rng.sample(SOURCES, rng.randint(1, 4)):
+            match = {'id': f'{source}-{k}', 'source': source, 'home_team': home_team, 'away_team': away_team,
+                     'date': day.isoformat(), 'competition': 'La Liga',
+                     'status': rng.choice(['scheduled', 'scheduled', 'not_started', 'finished', 'postponed']),
+                     'collected_at': now.isoformat()}
+            defect = rng.random()
+            if defect < 0.05:
+                match['status'] = ''
+            elif defect < 0.08:
+                match['date'] = 'garbage'
+            elif defect < 0.11:
+                match['date'] = day.isoformat() + '+00:00'
+            elif defect < 0.14:
+                match['date'] = (day + timedelta(days=2)).isoformat()
+            matches.append(match)
+    return matches
+
+def comparable(value):
+    """Validation output without the timestamps that differ between two runs"""
+    if isinstance(value, dict):
+        return {key: comparable(item) for key, item in value.items() if key != 'validation_timestamp'}
+    if isinstance(value, list):
+        return [comparable(item) for item in value]
+    return value
+
+def run(validator: DataValidator, matches):
+    result = validator.validate_matches({'matches': copy.deepcopy(matches)})
+    return result, validator.filter_matches_for_predictions(result['valid_matches'])
+
+def test_vectorized_mode_matches_python_mode():
+    matches = sample_matches()
+    python_result, python_suitable = run(DataValidator(mode='python', incremental=False), matches)
+    vectorized_result, vectorized_suitable = run(DataValidator(mode='vectorized', incremental=False), matches)
+    assert python_result['valid_matches'] and python_result['validation_errors']
+    assert comparable(vectorized_result) == comparable(python_result)
+    assert comparable(vectorized_suitable) == comparable(python_suitable)
+
+@pytest.mark.parametrize('mode', ['python', 'vectorized'])
+def test_incremental_runs_match_full_runs(mode):
+    matches = sample_matches()
+    validator = DataValidator(mode=mode, incremental=True)
+    first, _ = run(validator, matches)
+    groups = sum(first['validation_summary']['incremental'].values())
+    assert first['validation_summary']['incremental'] == {'recomputed': groups, 'reused': 0, 'skipped': 0}
+
+    second, _ = run(validator, matches)
+    assert second['validation_summary']['incremental'] == {
+        'recomputed': 0,
+        'reused': len(first['valid_matches']),
+        'skipped': len(first['validation_errors']),
+    }
+    assert comparable(second['valid_matches']) == comparable(first['valid_matches'])
+
+    # One source record changes; only its group is validated again
+    changed = copy.deepcopy(matches)
+    changed[0]['venue'] = 'Estadio Nuevo'
+    third, third_suitable = run(validator, changed)
+    assert third['validation_summary']['incremental']['recomputed'] == 1
+    full, full_suitable = run(DataValidator(mode=mode, incremental=False), changed)
+    del third['validation_summary']['incremental']
+    assert comparable(third) == comparable(full)
+    assert comparable(third_suitable) == comparable(full_suitable)
+
+@pytest.mark.parametrize('mode', ['python', 'vectorized'])
+def test_fuzzy_linked_spellings_pass_validation(mode, tmp_path, monkeypatch):
+    from team_identity import team_index
+    monkeypatch.setattr(team_index, 'unknown_file', str(tmp_path / 'unknown.json'))
+    day = (datetime.now() + timedelta(days=2)).replace(microsecond=0).isoformat()
+    matches = [
+        {'id': 'f1', 'source': 'flashscore', 'home_team': 'Leganés Sportin', 'away_team': 'Deportivo Xyz',
+         'date': day, 'status': 'scheduled', 'competition': 'La Liga'},
+        {'id': 's1', 'source': 'sofascore', 'home_team': 'Leganés Sporting', 'away_team': 'Deportivo Xyz',
+         'date': day, 'status': 'scheduled', 'competition': 'La Liga'},
+    ]
+    result = DataValidator(mode=mode, incremental=False).validate_matches({'matches': matches})
+    assert result['validation_errors'] == []
+    assert len(result['valid_matches']) == 1
+    assert result['valid_matches'][0]['validation_metadata']['link_score'] < 1.0
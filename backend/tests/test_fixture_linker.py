@@ -0,0 +1,64 @@
+import pytest
+from fixture_linker import FixtureLinker, qualifiers
+
+DAY = '2025-03-01'
+
+def fixture(source, home_team, away_team, competition=None, day=DAY):
+    return {'source': source, 'home_team': home_team, 'away_team': away_team, 'date': day,
+            'competition': competition, 'id': f'{source}-{home_team}-{away_team}'}
+
+@pytest.fixture
+def linker():
+    return FixtureLinker()
+
+def linked_pairs(linker, matches):
+    return [sorted(cluster['sources']) for cluster in linker.link(matches) if len(cluster['sources']) > 1]
+
+@pytest.mark.parametrize('senior, other', [
+    (('Real Madrid', 'Barcelona'), ('Real Madrid Femenino', 'Barcelona Femenino')),
+    (('Manchester City', 'Chelsea'), ('Manchester City U21', 'Chelsea U21')),
+    (('Real Madrid', 'Valencia'), ('Real Madrid Castilla', 'Valencia')),
+    (('Arsenal', 'Chelsea'), ('Arsenal W', 'Chelsea W')),
+    (('Athletic Bilbao', 'Sevilla'), ('Athletic Bilbao B', 'Sevilla')),
+])
+def test_women_reserve_and_youth_sides_are_not_linked(linker, senior, other):
+    matches = [fixture('flashscore', *senior), fixture('sofascore', *other)]
+    assert linked_pairs(linker, matches) == []
+    assert linker.best_match(*senior, [{'home_team': other[0], 'away_team': other[1], 'source': 'sofascore'}]) is None
+
+def test_different_known_teams_score_zero(linker):
+    a = linker._record(fixture('flashscore', 'Manchester City', 'Chelsea'))
+    b = linker._record(fixture('sofascore', 'Manchester United', 'Chelsea'))
+    assert linker.score_pair(a, b)['home'] == 0.0
+    assert linked_pairs(linker, [a['match'], b['match']]) == []
+
+def test_same_fixture_with_different_spellings_is_linked(linker):
+    matches = [
+        fixture('flashscore', 'Real Madrid', 'FC Barcelona', 'La Liga'),
+        fixture('sofascore', 'Real Madrid CF', 'Barcelona', 'LaLiga'),
+        fixture('betsapi', 'Real Madrid Femenino', 'Barcelona Femenino', 'Liga F'),
+    ]
+    assert linked_pairs(linker, matches) == [['flashscore', 'sofascore']]
+
+def test_matching_qualifiers_still_link(linker):
+    matches = [fixture('flashscore', 'Real Madrid Femenino', 'Levante Femenino'),
+               fixture('sofascore', 'Real Madrid Femenino', 'Levante UD Femenino')]
+    assert linked_pairs(linker, matches) == [['flashscore', 'sofascore']]
+
+def test_competitions_that_differ_block_the_link(linker):
+    matches = [fixture('flashscore', 'Newcastle Jets', 'Perth Glory', 'Premier League'),
+               fixture('sofascore', 'Newcastle Jets', 'Perth Glory', "Women's Super League")]
+    assert linked_pairs(linker, matches) == []
+
+def test_qualifiers():
+    assert qualifiers('Manchester City U-21') == {'u21'}
+    assert qualifiers("Chelsea Women's") == {'women'}
+    assert qualifiers('Real Madrid Castilla') == {'reserve'}
+    assert qualifiers('Real Madrid') == frozenset()
+
+def test_scoring_candidates_does_not_record_unknown_names(linker):
+    from team_identity import team_index
+    before = dict(team_index.unknown)
+    candidates = [{'home_team': 'Totally Unknown Rovers', 'away_team': 'Nowhere Athletic', 'source': 'api_football'}]
+    linker.best_match('Real Madrid', 'Barcelona', candidates, source='api_football')
+    assert team_index.unknown == before
@@ -0,0 +1,19 @@
+import os
+from scrapers.http_cache import ResponseCache
+
+def test_cache_is_created_on_first_use(tmp_path):
+    cache_dir = tmp_path / 'http'
+    cache = ResponseCache(str(cache_dir), max_bytes=1000)
+    assert not os.path.exists(cache_dir)
+
+    cache.put('a', 'https://example.com/a', 200, {'ETag': '"1"', 'Content-Length': '3'}, b'abc')
+    cached = cache.get('a')
+    assert (cached.content, cached.etag, cached.headers) == (b'abc', '"1"', {'ETag': '"1"'})
+    assert os.path.exists(cache_dir / 'responses.sqlite')
+
+def test_reopened_cache_keeps_its_size_for_eviction(tmp_path):
+    ResponseCache(str(tmp_path), max_bytes=10).put('a', 'https://example.com/a', 200, {}, b'x' * 6)
+    cache = ResponseCache(str(tmp_path), max_bytes=10)
+    cache.put('b', 'https://example.com/b', 200, {}, b'y' * 6)
+    assert cache.get('a') is None
+    assert cache.get('b').content == b'y' * 6
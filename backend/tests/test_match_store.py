@@ -0,0 +1,32 @@
+import copy
+import pickle
+from datetime import datetime
+from match_store import BoundedDict, MatchStore
+
+CONFIG = {'max_matches': 10, 'max_team_stats': 2, 'max_h2h_records': 10, 'max_odds': 10}
+
+def test_bounded_dict_copies_keep_cap_and_counters():
+    records = BoundedDict(2)
+    for key in 'abc':
+        records[key] = {'value': key}
+    for copied in (copy.copy(records), copy.deepcopy(records), pickle.loads(pickle.dumps(records)), records.copy()):
+        assert type(copied) is BoundedDict
+        assert list(copied.items()) == list(records.items())
+        assert (copied.max_items, copied.evicted) == (2, 1)
+        copied['d'] = {'value': 'd'}
+        assert list(copied) == ['c', 'd']
+    assert list(records) == ['b', 'c']
+
+def test_export_is_not_changed_by_later_refreshes():
+    store = MatchStore(CONFIG)
+    day = datetime(2024, 5, 1)
+    store.replace_source('espn', [{'id': '1', 'source': 'espn', 'date': '2024-05-01', 'home_score': 0}], day, day)
+    store.teams['Leganés'] = {'form': 'W'}
+    exported = store.export()
+
+    store.matches()[0]['home_score'] = 2
+    store.teams['Leganés']['form'] = 'WL'
+    store.teams['Getafe'] = {'form': 'D'}
+
+    assert exported['matches'] == [{'id': '1', 'source': 'espn', 'date': '2024-05-01', 'home_score': 0}]
+    assert exported['teams'] == {'Leganés': {'form': 'W'}}
@@ -0,0 +1,37 @@
+import os
+import time
+from scrapers.page_archive import PageArchive
+
+def archive_size(archive: PageArchive) -> int:
+    blobs_dir = os.path.join(archive.archive_dir, 'blobs')
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(blobs_dir) for name in names)
+
+def test_oldest_pages_are_dropped_above_max_bytes(tmp_path):
+    archive = PageArchive(str(tmp_path), enabled=True, max_bytes=10_000, retention_days=30)
+    for page in range(20):
+        archive.store('test', f'https://example.com/{page}', None, 200, os.urandom(2_000))
+    pages = list(archive.iter_pages())
+    assert archive_size(archive) <= 10_000
+    assert archive._total_bytes == archive_size(archive)
+    assert pages[-1]['url'] == 'https://example.com/19'
+    assert len(pages) < 20
+
+def test_pages_past_retention_are_dropped(tmp_path):
+    archive = PageArchive(str(tmp_path), enabled=True, max_bytes=10**9, retention_days=1)
+    archive.store('test', 'https://example.com/old', None, 200, b'old page')
+    with archive._lock:
+        archive._connection().execute("UPDATE pages SET fetched_at = ?", (time.time() - 2 * 86400,))
+    archive._last_expired = 0.0
+    archive.store('test', 'https://example.com/new', None, 200, b'new page')
+    assert [page['url'] for page in archive.iter_pages()] == ['https://example.com/new']
+    assert archive._total_bytes == archive_size(archive)
+
+def test_shared_blob_is_kept_while_referenced(tmp_path):
+    archive = PageArchive(str(tmp_path), enabled=True, max_bytes=10**9, retention_days=30)
+    archive.store('test', 'https://example.com/a', None, 200, b'same body')
+    archive.store('test', 'https://example.com/b', None, 200, b'same body')
+    with archive._lock:
+        conn = archive._connection()
+        archive._drop_pages(conn, "url = ?", ('https://example.com/a',), "for the test")
+    page = next(archive.iter_pages())
+    assert archive.load(page['sha256'], page['codec']) == b'same body'
@@ -0,0 +1,69 @@
+import os
+import time
+from utils.snapshot_store import SnapshotStore
+
+CONFIG = {'keyframe_every': 3, 'compress_level': 1, 'compact_after_hours': 24, 'retention_days': 7,
+          'compact_interval_minutes': 60}
+
+def make_store(tmp_path) -> SnapshotStore:
+    store = SnapshotStore(str(tmp_path / 'raw'), str(tmp_path / 'processed' / 'latest.json'), CONFIG)
+    # Compaction is driven by the tests
+    store._last_compacted = time.time()
+    return store
+
+def dataset(run: int, process: str = 'a'):
+    return {
+        'matches': [{'id': str(i), 'source': process, 'home_score': run if i == 0 else 0} for i in range(5)],
+        'last_updated': f'{process}{run}',
+    }
+
+def age_files(store: SnapshotStore, days: float):
+    for name in os.listdir(store.raw_dir):
+        past = time.time() - days * 86400
+        os.utime(os.path.join(store.raw_dir, name), (past, past))
+
+def test_every_snapshot_round_trips(tmp_path):
+    store = make_store(tmp_path)
+    saved = [dataset(run) for run in range(8)]
+    for data in saved:
+        store.save(data)
+    assert [store.load_snapshot(timestamp) for timestamp in store.list_snapshots()] == saved
+    assert store.load_latest() == saved[-1]
+
+def test_interleaved_processes_keep_their_chains_intact(tmp_path):
+    first, second = make_store(tmp_path), make_store(tmp_path)
+    saved = []
+    for run in range(4):
+        for process, store in (('a', first), ('b', second), ('b', second)):
+            data = dataset(run, process)
+            store.save(data)
+            saved.append(data)
+    assert [first.load_snapshot(timestamp) for timestamp in first.list_snapshots()] == saved
+
+def test_compaction_keeps_the_last_state_and_retention_removes_old_chains(tmp_path):
+    store = make_store(tmp_path)
+    saved = [dataset(run) for run in range(7)]
+    for data in saved:
+        store.save(data)
+    last_of_first_chain = store.list_snapshots()[3]
+    age_files(store, 2)
+    store.compact()
+    assert store.load_snapshot(last_of_first_chain) == saved[3]
+    assert store.load_snapshot(store.list_snapshots()[-1]) == saved[-1]
+    age_files(store, 9)
+    store.compact()
+    # Only the chain still being appended to survives
+    assert [store.load_snapshot(timestamp) for timestamp in store.list_snapshots()] == saved[4:]
+
+def test_a_broken_chain_does_not_stop_compaction(tmp_path):
+    store = make_store(tmp_path)
+    for run in range(9):
+        store.save(dataset(run))
+    first_keyframe = sorted(name for name in os.listdir(store.raw_dir) if name.endswith('.json.gz') and '.delta' not in name)[0]
+    with open(os.path.join(store.raw_dir, first_keyframe), 'wb') as f:
+        f.write(b'not gzip')
+    age_files(store, 2)
+    store.compact()
+    # The second chain was still compacted into one snapshot
+    assert len([name for name in os.listdir(store.raw_dir) if name.startswith('data_')]) == 4 + 1 + 1
+    assert store.load_snapshot(store.list_snapshots()[4]) == dataset(7)
@@ -0,0 +1,86 @@
+import functools
+import os
+from typing import Dict, Iterable, List, Optional
+import pandas as pd
+from loguru import logger
+from config.settings import UNDERSTAT_CONFIG
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+class ColumnarStore:
+    """Local table store partitioned by league and season.
+
+    Each table lives in its own directory with one file per league/season
+    (<table>/<league>_<season>.parquet, or .csv.gz when pyarrow is not
+    installed). Writing a partition replaces it, so re-running a backfill is
+    idempotent; load() concatenates the partitions it is asked for.
+    """
+
+    def __init__(self, base_dir: str = UNDERSTAT_CONFIG['store_dir']):
+        self.base_dir = base_dir
+        self.extension = 'parquet' if PARQUET_AVAILABLE else 'csv.gz'
+
+    def _partition_path(self, table: str, league: str, season: str, extension: Optional[str] = None) -> str:
+        return os.path.join(self.base_dir, table, f"{league}_{season}.{extension or self.extension}")
+
+    def write(self, table: str, league: str, season: str, rows: List[Dict]) -> Optional[str]:
+        """Replace one league/season partition of a table"""
+        if not rows:
+            return None
+        path = self._partition_path(table, league, season)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame = pd.DataFrame(rows)
+        tmp_path = f"{path}.tmp"
+        if PARQUET_AVAILABLE:
+            frame.to_parquet(tmp_path, index=False)
+        else:
+            frame.to_csv(tmp_path, index=False, compression='gzip')
+        os.replace(tmp_path, path)
+        # A partition written by the other format would otherwise be loaded twice
+        other = self._partition_path(table, league, season, 'csv.gz' if PARQUET_AVAILABLE else 'parquet')
+        if os.path.exists(other):
+            os.remove(other)
+        return path
+
+    def write_partitions(self, table: str, rows: Iterable[Dict]) -> int:
+        """Split rows by their league/season columns and write each partition"""
+        partitions: Dict[tuple, List[Dict]] = {}
+        for row in rows:
+            partitions.setdefault((row['league'], row['season']), []).append(row)
+        for (league, season), partition_rows in partitions.items():
+            self.write(table, league, season, partition_rows)
+        return len(partitions)
+
+    def load(self, table: str, leagues: Optional[Iterable[str]] = None,
+             seasons: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Read a table, optionally limited to some leagues and/or seasons"""
+        table_dir = os.path.join(self.base_dir, table)
+        if not os.path.isdir(table_dir):
+            return pd.DataFrame()
+        leagues = set(leagues) if leagues else None
+        seasons = {str(season) for season in seasons} if seasons else None
+        frames = []
+        for filename in sorted(os.listdir(table_dir)):
+            if filename.endswith('.parquet'):
+                stem, reader = filename[:-len('.parquet')], pd.read_parquet
+            elif filename.endswith('.csv.gz'):
+                stem, reader = filename[:-len('.csv.gz')], functools.partial(pd.read_csv, dtype={'id': str, 'season': str})
+            else:
+                continue
+            league, _, season = stem.rpartition('_')
+            if (leagues and league not in leagues) or (seasons and season not in seasons):
+                continue
+            try:
+                frames.append(reader(os.path.join(table_dir, filename)))
+            except Exception as e:
+                logger.error(f"Columnar store: could not read {filename}: {e}")
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+# xG tables written by the Understat bulk backfill
+xg_store = ColumnarStore()
@@ -0,0 +1,157 @@
+import asyncio
+import atexit
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+from loguru import logger
+from config.settings import HTTP_CLIENT_CONFIG
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class SharedHTTPClient:
+    """Process-wide pooled HTTP client used by every scraper and integration.
+
+    One httpx.Client serves all threads, and one httpx.AsyncClient is kept per
+    event loop. Keep-alive connections are pooled, concurrent requests are
+    capped per host, and HTTP/2 is negotiated when the h2 package is installed.
+    New connections are counted per host through httpcore's trace hook, so
+    get_stats() can report how often connections were reused.
+    """
+
+    def __init__(self, config: Dict = HTTP_CLIENT_CONFIG):
+        self.config = config
+        self.http2 = config['http2'] and HTTP2_AVAILABLE
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._async_host_slots: Dict[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]] = {}
+        self.stats = defaultdict(lambda: {'requests': 0, 'new_connections': 0, 'http_versions': defaultdict(int)})
+
+    def _client_options(self) -> Dict:
+        return {
+            'http2': self.http2,
+            'timeout': self.config['timeout'],
+            'follow_redirects': True,
+            'limits': httpx.Limits(
+                max_connections=self.config['max_connections'],
+                max_keepalive_connections=self.config['max_keepalive_connections'],
+                keepalive_expiry=self.config['keepalive_expiry']
+            )
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(**self._client_options())
+            return self._client
+
+    def _async_client(self) -> httpx.AsyncClient:
+        """The async client of the running event loop (clients cannot be shared across loops)"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = httpx.AsyncClient(**self._client_options())
+            self._async_host_slots[loop] = {}
+        return client
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.config['max_connections_per_host'])
+            return self._host_slots[host]
+
+    def _async_host_slot(self, host: str) -> asyncio.Semaphore:
+        slots = self._async_host_slots[asyncio.get_running_loop()]
+        if host not in slots:
+            slots[host] = asyncio.Semaphore(self.config['max_connections_per_host'])
+        return slots[host]
+
+    def _count_connection(self, host: str, event_name: str):
+        if event_name == 'connection.connect_tcp.complete':
+            with self._lock:
+                self.stats[host]['new_connections'] += 1
+
+    def _count_response(self, host: str, response: httpx.Response):
+        with self._lock:
+            self.stats[host]['requests'] += 1
+            self.stats[host]['http_versions'][response.http_version] += 1
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared pool"""
+        host = urlsplit(url).netloc
+        request = self.client.build_request(method, url, **kwargs)
+        request.extensions['trace'] = lambda event_name, info: self._count_connection(host, event_name)
+        with self._host_slot(host):
+            response = self.client.send(request)
+        self._count_response(host, response)
+        return response
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request('POST', url, **kwargs)
+
+    async def request_async(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Async variant of request"""
+        host = urlsplit(url).netloc
+        client = self._async_client()
+
+        async def trace(event_name, info):
+            self._count_connection(host, event_name)
+
+        request = client.build_request(method, url, **kwargs)
+        request.extensions['trace'] = trace
+        async with self._async_host_slot(host):
+            response = await client.send(request)
+        self._count_response(host, response)
+        return response
+
+    async def get_async(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request_async('GET', url, **kwargs)
+
+    async def close_async(self):
+        """Close the running loop's async client (call before the event loop ends)"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.pop(loop, None)
+        self._async_host_slots.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def get_stats(self) -> Dict:
+        """Requests, new connections and connection reuse rate per host"""
+        with self._lock:
+            report = {}
+            for host, stats in self.stats.items():
+                requests_sent = stats['requests']
+                reused = max(0, requests_sent - stats['new_connections'])
+                report[host] = {
+                    'requests': requests_sent,
+                    'new_connections': stats['new_connections'],
+                    'reuse_rate': reused / requests_sent if requests_sent else 0.0,
+                    'http_versions': dict(stats['http_versions'])
+                }
+            return report
+
+    def log_stats(self):
+        for host, stats in self.get_stats().items():
+            logger.info(f"HTTP pool {host}: {stats['requests']} requests over {stats['new_connections']} connections "
+                        f"({stats['reuse_rate']:.0%} reused, {stats['http_versions']})")
+
+# Shared by every collector in the process
+http_client = SharedHTTPClient()
+atexit.register(http_client.close)
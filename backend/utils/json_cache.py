@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+class FrozenDict(dict):
+    """Read-only dict handed out by JsonFileCache.
+
+    It is still a dict, so jsonify/json.dumps and every reading caller work
+    unchanged; callers that need to modify the data take a copy (dict(view)).
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("cached data is read-only, copy it before modifying")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+def _freeze_list(items: list) -> tuple:
+    return tuple(_freeze_list(item) if type(item) is list else item for item in items)
+
+def _frozen_object(pairs) -> FrozenDict:
+    # json calls this bottom-up, so nested objects are already frozen
+    return FrozenDict((key, _freeze_list(value) if type(value) is list else value) for key, value in pairs)
+
+def freeze(value: Any) -> Any:
+    """Immutable copy of already loaded JSON-like data (dicts and lists)"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class JsonFileCache:
+    """Read-through cache of parsed JSON files.
+
+    A file is parsed once and served from memory until its mtime, size or
+    inode changes, or until a writer in this process bumps its version.
+    Objects come back as FrozenDicts and arrays as tuples, so one parsed
+    copy can be shared by every request without anyone changing it under
+    the others.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def bump(self, path: str):
+        """Invalidate a file this process has just rewritten"""
+        path = os.path.abspath(path)
+        with self._lock:
+            self._versions[path] = self._versions.get(path, 0) + 1
+
+    def load(self, path: str) -> Any:
+        """Parsed, read-only contents of a JSON file (FileNotFoundError if missing)"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino, self._versions.get(path, 0))
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            with self._lock:
+                self.stats['hits'] += 1
+            return entry[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            value = json.load(f, object_pairs_hook=_frozen_object)
+        if type(value) is list:
+            value = _freeze_list(value)
+        with self._lock:
+            self._entries[path] = (key, value)
+            self.stats['misses'] += 1
+        return value
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'files': len(self._entries)}
+
+# Shared by everything that serves the collected data
+json_cache = JsonFileCache()
@@ -0,0 +1,297 @@
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+from config.settings import SNAPSHOT_CONFIG
+from utils.json_cache import json_cache
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# data_<timestamp>.json.gz (full snapshot), data_<timestamp>.delta_<base>.json.gz
+# (changes since the snapshot saved at <base>), data_<timestamp>.delta.json.gz
+# (older deltas, against the snapshot before them) and data_<timestamp>.json (old
+# pretty-printed dumps)
+_TIMESTAMP = r'\d{8}_\d{6}(?:_\d+)?'
+_SNAPSHOT_FILE = re.compile(rf'^data_({_TIMESTAMP})(\.delta(?:_({_TIMESTAMP}))?)?\.json(\.gz)?$')
+
+def _encode(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+def _write_atomic(path: str, content: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def _timestamp_order(timestamp: str) -> Tuple[str, int]:
+    # Saves within the same second get a _1, _2, ... suffix
+    return timestamp[:15], int(timestamp[16:] or 0)
+
+def _item_key(item: Any) -> Optional[str]:
+    if isinstance(item, dict) and item.get('id'):
+        return f"{item.get('source', '')}|{item['id']}"
+    return None
+
+def diff(old: Any, new: Any) -> Optional[Dict]:
+    """Delta that turns old into new, or None when they are equal.
+
+    Dicts are diffed key by key and lists of records with a unique
+    (source, id) are diffed by that key; anything else is replaced whole.
+    """
+    if old == new:
+        return None
+    if isinstance(old, dict) and isinstance(new, dict):
+        delta = {'set': {}, 'patch': {}, 'del': [key for key in old if key not in new]}
+        for key, value in new.items():
+            if key not in old:
+                delta['set'][key] = value
+            else:
+                sub_delta = diff(old[key], value)
+                if sub_delta is not None:
+                    delta['patch'][key] = sub_delta
+        return {'dict': delta}
+    if isinstance(old, list) and isinstance(new, list):
+        old_keys = [_item_key(item) for item in old]
+        new_keys = [_item_key(item) for item in new]
+        if None not in old_keys and None not in new_keys and len(set(new_keys)) == len(new_keys) \
+                and len(set(old_keys)) == len(old_keys):
+            old_items = dict(zip(old_keys, old))
+            return {'list': {
+                'keys': new_keys,
+                'set': {key: item for key, item in zip(new_keys, new) if old_items.get(key) != item},
+            }}
+    return {'value': new}
+
+def apply_delta(old: Any, delta: Optional[Dict]) -> Any:
+    if delta is None:
+        return old
+    if 'dict' in delta:
+        changes = delta['dict']
+        new = {key: value for key, value in old.items() if key not in changes['del']}
+        for key, sub_delta in changes['patch'].items():
+            new[key] = apply_delta(old[key], sub_delta)
+        new.update(changes['set'])
+        return new
+    if 'list' in delta:
+        changes = delta['list']
+        old_items = {_item_key(item): item for item in old}
+        return [changes['set'][key] if key in changes['set'] else old_items[key] for key in changes['keys']]
+    return delta['value']
+
+class SnapshotStore:
+    """Where DataCollector publishes every processed dataset.
+
+    The latest dataset is written to a temporary file and renamed over
+    latest_data.json, so readers never see a half-written file; it stays
+    plain JSON (without the indentation) for the scripts that read it
+    directly. The history in data/raw is a chain per keyframe: a gzipped
+    full snapshot followed by gzipped deltas, each naming the snapshot it
+    applies to, with a new keyframe every keyframe_every saves.
+
+    Several processes (the API, the collector daemon, one-off scripts) can
+    save to the same directory: saves hold a lock file in data/raw, and a
+    process only appends a delta when the newest snapshot on disk is its
+    own. In the background, at most once per compact_interval_minutes,
+    chains older than compact_after_hours are compacted to their last state
+    and chains older than retention_days are deleted.
+    """
+
+    LOCK_FILE = '.snapshots.lock'
+
+    def __init__(self, raw_dir: str = SNAPSHOT_CONFIG['raw_dir'],
+                 latest_file: str = SNAPSHOT_CONFIG['latest_file'], config: Dict = SNAPSHOT_CONFIG):
+        self.raw_dir = raw_dir
+        self.latest_file = latest_file
+        self.keyframe_every = config['keyframe_every']
+        self.compress_level = config['compress_level']
+        self.compact_after = config['compact_after_hours'] * 3600
+        self.retention = config['retention_days'] * 86400
+        self.compact_interval = config['compact_interval_minutes'] * 60
+        self._last_state: Optional[Any] = None
+        self._last_timestamp: Optional[str] = None
+        self._deltas_since_keyframe = 0
+        self._last_compacted = 0.0
+        self._compaction: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store against other threads and, where flock exists, other processes"""
+        with self._lock:
+            os.makedirs(self.raw_dir, exist_ok=True)
+            with open(os.path.join(self.raw_dir, self.LOCK_FILE), 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _files(self) -> List[Tuple[str, str, Optional[str], bool]]:
+        """(timestamp, name, base, is_delta) of every snapshot file, oldest first"""
+        files = []
+        for name in os.listdir(self.raw_dir):
+            match = _SNAPSHOT_FILE.match(name)
+            if match:
+                files.append((match.group(1), name, match.group(3), bool(match.group(2))))
+        return sorted(files, key=lambda file: _timestamp_order(file[0]))
+
+    def _new_timestamp(self, taken: set) -> str:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        suffix = 1
+        unique = timestamp
+        while unique in taken:
+            unique = f"{timestamp}_{suffix}"
+            suffix += 1
+        return unique
+
+    def save(self, data: Dict) -> Dict:
+        """Publish a dataset as latest_data.json and append it to the history"""
+        start_time = time.perf_counter()
+        encoded = _encode(data)
+        state = json.loads(encoded)
+        with self._locked():
+            os.makedirs(os.path.dirname(self.latest_file), exist_ok=True)
+            files = self._files()
+            timestamp = self._new_timestamp({file[0] for file in files})
+            # Another process saved since our last snapshot (or it was compacted
+            # away): our state is not the newest on disk, so start a new chain
+            newest = files[-1][0] if files else None
+            if (self._last_state is None or self._deltas_since_keyframe >= self.keyframe_every
+                    or newest != self._last_timestamp):
+                raw_file = os.path.join(self.raw_dir, f"data_{timestamp}.json.gz")
+                payload = encoded
+                self._deltas_since_keyframe = 0
+            else:
+                raw_file = os.path.join(self.raw_dir, f"data_{timestamp}.delta_{self._last_timestamp}.json.gz")
+                payload = _encode(diff(self._last_state, state))
+                self._deltas_since_keyframe += 1
+            _write_atomic(raw_file, gzip.compress(payload, compresslevel=self.compress_level))
+            _write_atomic(self.latest_file, encoded)
+            json_cache.bump(self.latest_file)
+            self._last_state = state
+            self._last_timestamp = timestamp
+        self._schedule_compaction()
+        stats = {
+            'raw_file': raw_file,
+            'bytes': os.path.getsize(raw_file),
+            'dataset_bytes': len(encoded),
+            'elapsed': time.perf_counter() - start_time,
+        }
+        logger.info(f"Data saved to {raw_file} ({stats['bytes'] / 1024:.0f} KiB of {len(encoded) / 1024:.0f} KiB, "
+                    f"{stats['elapsed'] * 1000:.0f}ms) and {self.latest_file}")
+        return stats
+
+    def _schedule_compaction(self):
+        """Run compact() on a background thread when it is due and not already running"""
+        now = time.time()
+        if now - self._last_compacted < self.compact_interval or (self._compaction and self._compaction.is_alive()):
+            return
+        self._last_compacted = now
+        self._compaction = threading.Thread(target=self.compact, name='snapshot-compaction', daemon=True)
+        self._compaction.start()
+
+    def load_latest(self) -> Dict:
+        with open(self.latest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _chains(self) -> List[List[Tuple[str, str, bool]]]:
+        """Snapshot files grouped into chains, each starting at a full snapshot.
+
+        A delta belongs to the chain of the snapshot it names as its base;
+        older deltas without a base follow the file saved just before them.
+        """
+        chains = []
+        chain_of: Dict[str, List] = {}
+        previous = None
+        for timestamp, name, base, is_delta in self._files():
+            if not is_delta:
+                chain = [(timestamp, name, is_delta)]
+                chains.append(chain)
+            else:
+                chain = chain_of.get(base or previous)
+                if chain is None:
+                    logger.warning(f"Snapshot delta without a base snapshot: {name}")
+                    previous = timestamp
+                    continue
+                chain.append((timestamp, name, is_delta))
+            chain_of[timestamp] = chain
+            previous = timestamp
+        return chains
+
+    def _read(self, name: str) -> Any:
+        with open(os.path.join(self.raw_dir, name), 'rb') as f:
+            content = f.read()
+        if name.endswith('.gz'):
+            content = gzip.decompress(content)
+        return json.loads(content)
+
+    def _parents(self) -> Dict[str, Optional[str]]:
+        """Timestamp of the snapshot each file applies to (None for full snapshots)"""
+        parents = {}
+        previous = None
+        for timestamp, _, base, is_delta in self._files():
+            parents[timestamp] = (base or previous) if is_delta else None
+            previous = timestamp
+        return parents
+
+    def list_snapshots(self) -> List[str]:
+        return [timestamp for chain in self._chains() for timestamp, _, _ in chain]
+
+    def load_snapshot(self, timestamp: str) -> Dict:
+        """Rebuild the dataset saved at a timestamp from its keyframe and the deltas leading to it"""
+        names = {file[0]: file[1] for file in self._files()}
+        parents = self._parents()
+        path = []
+        current = timestamp
+        while current is not None:
+            if current not in names:
+                raise KeyError(f"No snapshot saved at {timestamp}")
+            path.append(current)
+            current = parents[current]
+        state = None
+        for step in reversed(path):
+            state = apply_delta(state, self._read(names[step])) if parents[step] else self._read(names[step])
+        return state
+
+    def compact(self):
+        """Apply retention to data/raw: old chains shrink to their last state, expired ones go"""
+        with self._locked():
+            now = time.time()
+            chains = self._chains()
+            # The newest chain is still being appended to
+            for chain in chains[:-1]:
+                try:
+                    self._compact_chain(chain, now)
+                except Exception as e:
+                    logger.error(f"Could not compact snapshots from {chain[0][0]}: {e}")
+
+    def _compact_chain(self, chain: List[Tuple[str, str, bool]], now: float):
+        paths = [os.path.join(self.raw_dir, name) for _, name, _ in chain]
+        age = now - max(os.path.getmtime(path) for path in paths)
+        if age > self.retention:
+            for path in paths:
+                os.remove(path)
+            logger.info(f"Removed {len(paths)} expired snapshot files from {chain[0][0]}")
+        elif age > self.compact_after and (len(chain) > 1 or not chain[0][1].endswith('.gz')):
+            last_timestamp = chain[-1][0]
+            state = self.load_snapshot(last_timestamp)
+            compacted = os.path.join(self.raw_dir, f"data_{last_timestamp}.json.gz")
+            _write_atomic(compacted, gzip.compress(_encode(state), compresslevel=self.compress_level))
+            for path in paths:
+                if path != compacted:
+                    os.remove(path)
+            logger.info(f"Compacted {len(paths)} snapshot files into {compacted}")
+
+# Shared by the collector and the readers of its data
+snapshot_store = SnapshotStore()